@@ -27,3 +27,10 @@ class DoesNotExist(ObjectDoesNotExist):
 class UnimplementedException(Exception):
     pass
 
+
+class InvalidQuery(ValueError):
+    pass
+
+
+class InvalidToken(Exception):
+    pass
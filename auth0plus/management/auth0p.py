@@ -1,15 +1,19 @@
+import threading
+
 from ..settings import TIMEOUT
-# from .blacklists import Blacklist
-# from .clients import Client
-# from .connections import Connection
-# from .device_credentials import DeviceCredential
+from .blacklists import Blacklist
+from .clients import Client
+from .connections import Connection, ConnectionIndex
+from .device_credentials import DeviceCredential
 # from .emails import Email
 # from .jobs import Job
-from .rest import RestClient
-# from .rules import Rule
-# from .stats import Stat
+from .logs import Log
+from .rest import RestClient, domain_url
+from .transports import Http2Transport
+from .rules import Rule
+from .stats import Stat
 # from .tenants import Tenant
-# from .tickets import Ticket
+from .tickets import Ticket
 from .users import User
 
 
@@ -17,7 +21,8 @@ class Auth0(object):
     """Provides easy access to all endpoint classes
 
     Args:
-        domain (str): Your Auth0 domain, e.g: 'username.auth0.com'
+        domain (str): Your Auth0 domain, e.g: 'username.auth0.com', or a url such as
+            'http://127.0.0.1:8000' for a local emulator
 
         token (str): An API token created with your account's global
             keys. You can create one by using the token generator in the
@@ -30,58 +35,132 @@ class Auth0(object):
         timeout (int): Optional timeout in seconds.
 
         session: Optional requests.Session instance
+
+        transport: Optional transport used instead of a requests.Session,
+            see auth0plus.management.transports
+
+        http2 (bool): Optional, multiplex concurrent calls over a single HTTP/2 connection
+            (requires httpx and h2)
+
+        max_streams (int): The most concurrent calls in flight in http2 mode
+
+        max_retries (int): Optional number of times to retry rate limited requests
+
+        hooks (list): Optional callables sent an event after each request,
+            see auth0plus.management.instrumentation
+
+        tokens: Optional auth0plus.oauth.TokenManager to get tokens from instead of token
+
+        rate_limiter: Optional auth0plus.management.ratelimit.RateLimiter for this tenant
+
+        cache: Optional cache of fetched users, e.g. auth0plus.management.cache.SharedCache
+
+        resolve_connections (bool): Optional, look up the strategy of a user's connection
+            before saving changes to their credentials so social and enterprise users are
+            sent what their identity provider accepts. Needs the read:connections scope,
+            without it or if the lookup fails the connection and client_id are sent as usual
+
+        connection_ttl (int): Seconds to keep the name, id and strategy of each connection
+            for looking up users' connections, see connections.ConnectionIndex
+
+        connection_index: Optional connections.ConnectionIndex to share, with_token passes
+            on this instance's so per request instances don't list the connections again
+
+    Each instance binds its own subclasses of the endpoint classes the first time they are
+    used, e.g. auth0.users is a User subclass using this instance's client, so instances for
+    different tenants or tokens can be used side by side from any thread and are cheap to
+    make per request, see *with_token*.
     """
     
     def __init__(self, domain, token, client_id='', default_connection='',
-                 timeout=TIMEOUT, session=None):
+                 timeout=TIMEOUT, session=None, max_retries=0, hooks=None, transport=None,
+                 http2=False, max_streams=100, tokens=None, rate_limiter=None, cache=None,
+                 resolve_connections=False, connection_ttl=300, connection_index=None):
+        if http2 and transport is None:
+            transport = Http2Transport(max_streams=max_streams)
         # set some defaults for the endpoint classes
-        self._client = RestClient(token, session=session)
-        self._base_url = 'https://%s/api/v2' % domain
+        self._client = RestClient(
+            token, session=session, max_retries=max_retries, hooks=hooks, transport=transport,
+            tokens=tokens, rate_limiter=rate_limiter)
+        self._base_url = '%s/api/v2' % domain_url(domain)
         self._default_connection = default_connection
-
-        defaults = {
+        self._defaults = {
             '_base_url': self._base_url,
             '_client': self._client,
             '_timeout': timeout,
+            '_default_connection': self._default_connection,
+            '_default_client_id': client_id,
+            '_cache': cache,
+            '_connections': None,
         }
-        
-        endpoints = [
-            # Blacklist,
-            # Client,
-            # Connection,
-            # DeviceCredential,
-            # Email,
-            # Job,
-            # Rule,
-            # Stat,
-            # Tenant,
-            # Ticket,
-            User]
-
-        setattr(User, '_default_connection', self._default_connection)
-        setattr(User, '_default_client_id', client_id)
-        # attach endpoints
-        for endpoint in endpoints:
-            _set_endpoint_attributes(self, endpoint, defaults)
-
-
-def _set_endpoint_attributes(parent, endpoint, defaults):
+        if resolve_connections and connection_index is None:
+            connection_index = ConnectionIndex(lambda: self.connections, ttl=connection_ttl)
+        if resolve_connections:
+            self._defaults['_connections'] = connection_index
+        self._options = {
+            'domain': domain, 'client_id': client_id, 'default_connection': default_connection,
+            'timeout': timeout, 'max_retries': max_retries, 'hooks': hooks,
+            'rate_limiter': rate_limiter, 'cache': cache,
+            'resolve_connections': resolve_connections, 'connection_ttl': connection_ttl,
+            'connection_index': connection_index}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # only called until an endpoint is bound, after which it's an instance attribute
+        try:
+            endpoint = _endpoints[name]
+        except KeyError:
+            raise AttributeError("'Auth0' object has no attribute '%s'" % name)
+        with self._lock:
+            bound = self.__dict__.get(name)
+            if bound is None:
+                bound = _bind_endpoint(self, endpoint, self._defaults)
+        return bound
+
+    def with_token(self, token, **kwargs):
+        """
+        Return an Auth0 for the same tenant using another token, e.g. for each request in
+        a threaded server, sharing this instance's transport and connection pool. Any other
+        arguments such as default_connection or tokens replace this instance's.
+        """
+        options = dict(self._options, token=token, transport=self._client.transport)
+        options.update(kwargs)
+        return self.__class__(**options)
+
+
+ENDPOINTS = [
+    Blacklist,
+    Client,
+    Connection,
+    DeviceCredential,
+    # Email,
+    # Job,
+    Log,
+    Rule,
+    Stat,
+    # Tenant,
+    Ticket,
+    User]
+
+
+def _attribute_name(endpoint):
+    return endpoint._path.split('/')[-1].replace('-', '_')
+
+
+_endpoints = dict((_attribute_name(endpoint), endpoint) for endpoint in ENDPOINTS)
+
+
+def _bind_endpoint(parent, endpoint, defaults):
     """
-    Walk the endpoint and their children endpoints attaching children to their parent and
-    setting default connection attributes
+    Walk the endpoint and their children endpoints attaching subclasses bound to the
+    defaults to their parent, leaving the endpoint classes themselves untouched
     """
-    url = '/'.join([defaults.get('_base_url', ''), endpoint._path])
-    setattr(endpoint, '_endpoint', url)
-    for key, value in defaults.items():
-        setattr(endpoint, key, value)
-    path = endpoint._path.split('/')[-1]
-    setattr(parent, path.replace('-', '_'), endpoint)
+    attrs = dict(defaults)
+    attrs['_endpoint'] = '/'.join([defaults.get('_base_url', ''), endpoint._path])
+    attrs['__module__'] = endpoint.__module__
+    bound = type(endpoint.__name__, (endpoint,), attrs)
+    setattr(parent, _attribute_name(endpoint), bound)
     if getattr(endpoint, '_endpoints', False):
         for child in endpoint._endpoints:
-            _set_endpoint_attributes(endpoint, child, defaults)
-
-    
-
-
-
-
+            _bind_endpoint(bound, child, defaults)
+    return bound
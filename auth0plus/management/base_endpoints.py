@@ -1,11 +1,74 @@
 from copy import deepcopy
+import json
+import sys
 
 from combomethod import combomethod
 from six.moves.urllib.parse import quote
 
 from ..exceptions import UnimplementedException
 from ..settings import AUTH0_PER_PAGE
-from .queryset import QuerySet
+from .instrumentation import traced
+from .queryset import QuerySet, _build_lucene_query
+
+
+def _invalidate(receiver, id=None):
+    """
+    Drop an endpoint instance or id from the endpoint's cache once it has been changed or
+    deleted
+    """
+    cache = getattr(receiver, '_cache', None)
+    if cache is not None:
+        cache.delete(receiver.get_url(id))
+
+
+def _importable(cls):
+    """
+    The first class of cls's mro that can be imported by name, i.e. the endpoint class an
+    Auth0 instance bound cls from
+    """
+    for klass in cls.__mro__:
+        if getattr(sys.modules.get(klass.__module__), klass.__name__, None) is klass:
+            return klass
+    raise TypeError("Can't find an importable base class of %s" % cls.__name__)
+
+
+def _restore(cls, kwargs, fetched, changed):
+    """
+    Rebuild an endpoint instance from the state of BaseEndPoint._state
+    """
+    instance = cls(**kwargs)
+    instance._fetched = fetched
+    if fetched:
+        instance._original = dict(
+            (key, value) for key, value in instance.as_dict(updatable_only=True).items()
+            if key not in changed)
+    return instance
+
+
+def _dumps(payload, format):
+    if format == 'json':
+        return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    if format == 'msgpack':
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError('The msgpack format requires the msgpack package')
+        return msgpack.packb(payload, use_bin_type=True)
+    raise ValueError('Unknown wire format %s' % format)
+
+
+def _loads(data, format):
+    if format == 'json':
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+    if format == 'msgpack':
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError('The msgpack format requires the msgpack package')
+        return msgpack.unpackb(data, raw=False)
+    raise ValueError('Unknown wire format %s' % format)
 
 
 class BaseEndPoint(object):
@@ -13,6 +76,7 @@ class BaseEndPoint(object):
     _endpoint = ''  # set by Auth0 to the base url + _path
     _client = None  # the requests.session set by Auth0 instance
     _timeout = None  # set by Auth0 instance on the subclass
+    _cache = None  # optional cache of fetched records set by Auth0, see .cache
     _path = ''  # set by the implementing subclass
     _updatable = None
 
@@ -37,6 +101,68 @@ class BaseEndPoint(object):
                self.__class__.__name__,
                self.get_id() or '')
 
+    def _init_kwargs(self):
+        """
+        The keyword arguments that construct this instance again
+        """
+        return self.as_dict()
+
+    def _state(self):
+        """
+        The public data, the fetched flag and the names of any changes not yet saved, all
+        that is needed to rebuild the instance. Private attributes, an unsaved password and
+        the bound client are left behind.
+        """
+        changed = sorted(self.get_changed()) if self._fetched else []
+        return self._init_kwargs(), self._fetched, changed
+
+    def __reduce__(self):
+        # bound endpoint classes are made per Auth0 instance so pickle the class they were
+        # bound from, see bind
+        return (_restore, (_importable(self.__class__),) + self._state())
+
+    def __copy__(self):
+        copy = self.__class__.__new__(self.__class__)
+        copy.__dict__.update(self.__dict__)
+        return copy
+
+    def __deepcopy__(self, memo):
+        copy = self.__class__.__new__(self.__class__)
+        memo[id(self)] = copy
+        copy.__dict__.update(deepcopy(self.__dict__, memo))
+        return copy
+
+    @classmethod
+    def bind(cls, instance):
+        """
+        Return an instance that was unpickled or made from the unbound endpoint class as an
+        instance of this one so it can be saved, e.g. auth0.users.bind(pickle.loads(data)).
+        """
+        if not isinstance(instance, _importable(cls)):
+            raise TypeError('%r is not a %s' % (instance, cls.__name__))
+        instance.__class__ = cls
+        return instance
+
+    def to_wire(self, format='json'):
+        """
+        Return the instance as compact json, or msgpack if the msgpack package is installed,
+        for from_wire.
+        """
+        kwargs, fetched, changed = self._state()
+        payload = {'d': kwargs, 'f': fetched}
+        if changed:
+            payload['c'] = changed
+        return _dumps(payload, format)
+
+    @classmethod
+    def from_wire(cls, data, format='json'):
+        """
+        Return an instance of this class from the bytes of to_wire, e.g.
+        auth0.users.from_wire(data).
+        """
+        payload = _loads(data, format)
+        return _restore(cls, payload['d'], payload.get('f', False), payload.get('c', ()))
+
     @combomethod
     def get_url(receiver, id=None):
         try:
@@ -88,11 +214,13 @@ class CreatableMixin(object):
     _timeout = None
     
     @classmethod
+    @traced
     def create(cls, **kwargs):
         instance = cls(**kwargs)
         instance.save()
         return instance
 
+    @traced
     def save(self):
         data = {}
         for key in self._get_public_attrs():
@@ -109,6 +237,7 @@ class UpdatableMixin(object):
 
     _updatable = None  # None = all (or not set), empty list is actually zero
     
+    @traced
     def save(self, params=None):
         data = params or {}
         if not self._fetched:
@@ -118,6 +247,8 @@ class UpdatableMixin(object):
         else:  # an empty or other list is treated as definitive
             updatable = self._updatable
         for item in updatable:
+            if item not in self.__dict__:
+                continue
             try:
                 if self.__dict__[item] != self._original[item]:
                     data[item] = self.__dict__[item]
@@ -125,16 +256,7 @@ class UpdatableMixin(object):
                 data[item] = self.__dict__[item]
         if data:
             self._client.patch(self.get_url(), data)
-
-
-def _build_lucene_query(kwargs):
-    lucene_q = []
-    for key, value in kwargs.items():
-        if '*' in value:
-            lucene_q.append(u'%s:%s' % (key, value))
-        else:
-            lucene_q.append(u'%s:"%s"' % (key, value))
-    return ' AND '.join(lucene_q)
+            _invalidate(self)
 
 
 class QueryableMixin(object):
@@ -162,6 +284,15 @@ class QueryableMixin(object):
         params['q'] = custom_q or _build_lucene_query(kwargs) or None
         return QuerySet(cls, **params)
 
+    @classmethod
+    def count(cls, **kwargs):
+        """
+        Return the number of records matching the query from a single record probe.
+        """
+        kwargs['per_page'] = 1
+        kwargs['include_totals'] = True
+        return cls.query(**kwargs).count()
+
 
 class CRUDEndPoint(UpdatableMixin, CreatableMixin, BaseEndPoint):
 
@@ -169,6 +300,7 @@ class CRUDEndPoint(UpdatableMixin, CreatableMixin, BaseEndPoint):
         BaseEndPoint.__init__(self, **kwargs)
 
     @combomethod
+    @traced
     def delete(receiver, id=None):
         try:
             id = receiver.get_id()
@@ -179,9 +311,10 @@ class CRUDEndPoint(UpdatableMixin, CreatableMixin, BaseEndPoint):
             receiver.__class__.__name__
         )
         receiver._client.delete('/'.join([receiver._endpoint, str(id)]), timeout=receiver._timeout)
+        _invalidate(receiver, id)
 
     def save(self, params=None):
         if self._fetched:
             UpdatableMixin.save(self, params=params)
         else:
-            CreatableMixin.save(self, params=params)
+            CreatableMixin.save(self)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Make one call per item for many items from a pool of threads, handing back each result as
+soon as its call finishes::
+
+    for result in run_batch(users.delete, user_ids, workers=8):
+        if result.error:
+            print(result.item, result.error)
+
+Only *window* calls are queued at once, so items can come from a generator of any size
+without it being read ahead of the workers. A failed call doesn't stop the batch, its
+exception is the result's error. A call rejected with 429 Too Many Requests pauses every
+worker, backing off exponentially, and is retried up to *max_retries* times whether or not
+the client retries itself. Calls go through the endpoint's client, which also waits on the
+tenant's rate limiter when Auth0 was given one, pass *rate_limiter* to hold the batch to a
+lower rate of its own.
+"""
+from collections import namedtuple
+from concurrent import futures
+import itertools
+import threading
+import time
+
+from ..exceptions import Auth0Error
+from .instrumentation import timer
+from .rest import MAX_RETRY_DELAY
+
+Result = namedtuple('Result', ['item', 'value', 'error'])
+
+
+class Progress(object):
+    """
+    Counts of a running batch, sent to the on_progress callback after each call.
+    """
+
+    def __init__(self, clock=timer):
+        self._clock = clock
+        self.started = clock()
+        self.done = 0
+        self.failed = 0
+
+    @property
+    def elapsed(self):
+        return self._clock() - self.started
+
+    @property
+    def rate(self):
+        """
+        Calls finished per second.
+        """
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return '<Progress %s done, %s failed, %.1f/s>' % (self.done, self.failed, self.rate)
+
+
+def _rate_limited(error):
+    return isinstance(error, Auth0Error) and getattr(error, 'status_code', None) == 429
+
+
+class _Backoff(object):
+    """
+    The pause every worker of a batch waits out after one of them is rate limited.
+    """
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._resume = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        pause = self._resume - time.time()
+        if pause > 0:
+            time.sleep(pause)
+
+    def rate_limited(self, attempt):
+        with self._lock:
+            delay = min(self.delay * 2 ** attempt, MAX_RETRY_DELAY)
+            self._resume = max(self._resume, time.time() + delay)
+
+
+def run_batch(func, items, workers=8, window=None, rate_limiter=None, on_progress=None,
+              max_retries=5, backoff=1.0):
+    """
+    Call func(item) for every item and yield a Result for each as it finishes.
+
+    Args:
+        workers (int): The most calls made at once
+
+        window (int): The most calls queued at once, twice the workers by default
+
+        rate_limiter: Optional auth0plus.management.ratelimit.RateLimiter to acquire before
+            each call
+
+        on_progress: Optional callable sent a Progress after each call
+
+        max_retries (int): How many times to retry a call rejected with 429
+
+        backoff (float): Seconds every worker pauses after the first 429, doubling with
+            each retry of the call
+    """
+    window = window or workers * 2
+    progress = Progress()
+    items = iter(items)
+    pause = _Backoff(backoff)
+
+    def call(item):
+        attempt = 0
+        while True:
+            pause.wait()
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            try:
+                return func(item)
+            except Exception as err:
+                if not _rate_limited(err) or attempt >= max_retries:
+                    raise
+                pause.rate_limited(attempt)
+                attempt += 1
+
+    executor = futures.ThreadPoolExecutor(max_workers=workers)
+    pending = {}
+    try:
+        for item in itertools.islice(items, window):
+            pending[executor.submit(call, item)] = item
+        while pending:
+            finished, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in finished:
+                item = pending.pop(future)
+                error = future.exception()
+                progress.done += 1
+                if error is not None:
+                    progress.failed += 1
+                for item_ in itertools.islice(items, 1):
+                    pending[executor.submit(call, item_)] = item_
+                if on_progress is not None:
+                    on_progress(progress)
+                yield Result(item, None if error else future.result(), error)
+    finally:
+        # a batch abandoned part way doesn't start any more calls
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from .base_endpoints import BaseEndPoint
+from .batch import run_batch
+from .instrumentation import traced
+
+
+class Blacklist(BaseEndPoint):
+    """
+    The blacklisted token ids (jti) of an api (aud), at blacklists/tokens.
+    """
+
+    _path = 'blacklists'
+
+    def get_id(self):
+        return getattr(self, 'jti', None)
+
+    @classmethod
+    @traced
+    def all(cls, aud=None):
+        """
+        Return the blacklisted tokens of the aud, or of the api of the client making the
+        call.
+        """
+        records = cls._client.get('/'.join([cls._endpoint, 'tokens']), params={'aud': aud},
+                                  timeout=cls._timeout)
+        tokens = []
+        for record in records:
+            token = cls(**record)
+            token._fetched = True
+            tokens.append(token)
+        return tokens
+
+    @classmethod
+    @traced
+    def add(cls, jti, aud=None):
+        """
+        Blacklist the token with the jti.
+        """
+        data = {'jti': jti}
+        if aud:
+            data['aud'] = aud
+        cls._client.post('/'.join([cls._endpoint, 'tokens']), data, timeout=cls._timeout)
+        token = cls(**data)
+        token._fetched = True
+        return token
+
+    @classmethod
+    def add_all(cls, jtis, aud=None, workers=8, rate_limiter=None, on_progress=None,
+                max_retries=5, backoff=1.0):
+        """
+        Blacklist many tokens concurrently, yielding a auth0plus.management.batch.Result for
+        each jti as it is added, see run_batch for the other arguments.
+        """
+        return run_batch(lambda jti: cls.add(jti, aud=aud), jtis, workers=workers,
+                         rate_limiter=rate_limiter, on_progress=on_progress,
+                         max_retries=max_retries, backoff=backoff)
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+A cache of fetched records in a memory mapped file shared by every process on the host.
+
+Pass one to Auth0 as *cache* and User.get(id) is answered from it when another process has
+already fetched the user, while saves and deletes from any process invalidate it::
+
+    cache = SharedCache()  # /dev/shm/auth0plus.cache by default
+    auth0 = Auth0(domain, token, cache=cache)
+
+The file holds a fixed number of fixed size slots grouped into sets. A key hashes to one
+set and evicts the least recently used or expired entry in that set when it is full, so no
+lookup touches more than one set. Processes lock a set with fcntl and threads with a lock
+so different sets can be used concurrently. Records too large for a slot are not cached.
+
+Requires fcntl, i.e. Linux or another unix.
+"""
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+MAGIC = b'A0PCACHE'
+VERSION = 1
+
+_header = struct.Struct('<8sIIII')  # magic, version, sets, ways, slot size
+_slot = struct.Struct('<QddHI')  # key hash, expires, last used, key length, value length
+HEADER_SIZE = 64
+
+
+def default_path():
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, 'auth0plus.cache')
+
+
+class SharedCache(object):
+    """
+    Args:
+        path (str): The file to share, processes opening the same path share entries
+
+        slots (int): The number of entries held
+
+        slot_size (int): Bytes per entry including the key and the json encoded record
+
+        ways (int): Entries per set, the candidates for eviction when a set is full
+
+        ttl (float): Seconds an entry is used for
+    """
+
+    def __init__(self, path=None, slots=4096, slot_size=4096, ways=8, ttl=300,
+                 clock=time.time):
+        self.path = path or default_path()
+        self.ways = ways
+        self.sets = max(slots // ways, 1)
+        self.slot_size = slot_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._set_size = ways * slot_size
+        self._locks = [threading.Lock() for _ in range(min(self.sets, 64))]
+        size = HEADER_SIZE + self.sets * self._set_size
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, HEADER_SIZE, 0)
+            try:
+                self._open(size)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, HEADER_SIZE, 0)
+        except Exception:
+            os.close(self._fd)
+            raise
+
+    def _open(self, size):
+        expected = _header.pack(MAGIC, VERSION, self.sets, self.ways, self.slot_size)
+        existing = os.fstat(self._fd).st_size
+        if existing and existing != size:
+            raise ValueError('%s was made with a different layout' % self.path)
+        if not existing:
+            os.ftruncate(self._fd, size)
+        self._mm = mmap.mmap(self._fd, size)
+        if not existing:
+            self._mm[:_header.size] = expected
+        elif self._mm[:_header.size] != expected:
+            self._mm.close()
+            raise ValueError('%s was made with a different layout' % self.path)
+
+    def _locate(self, key):
+        key = key.encode('utf-8')
+        digest = hashlib.sha1(key).digest()
+        number = struct.unpack('<Q', digest[:8])[0] or 1  # 0 marks an empty slot
+        return key, number, number % self.sets
+
+    def _lock(self, index):
+        return _SetLock(self, index)
+
+    def _slots(self, index):
+        start = HEADER_SIZE + index * self._set_size
+        return range(start, start + self._set_size, self.slot_size)
+
+    def _find(self, offsets, key, number):
+        for offset in offsets:
+            found, expires, used, key_length, value_length = _slot.unpack_from(
+                self._mm, offset)
+            start = offset + _slot.size
+            if found == number and self._mm[start:start + key_length] == key:
+                return offset, expires, key_length, value_length
+        return None
+
+    def get(self, key):
+        """
+        Return the record cached under key or None.
+        """
+        key, number, index = self._locate(key)
+        now = self._clock()
+        with self._lock(index):
+            found = self._find(self._slots(index), key, number)
+            value = None
+            if found:
+                offset, expires, key_length, value_length = found
+                if expires < now:
+                    _slot.pack_into(self._mm, offset, 0, 0, 0, 0, 0)
+                else:
+                    _slot.pack_into(
+                        self._mm, offset, number, expires, now, key_length, value_length)
+                    start = offset + _slot.size + key_length
+                    value = self._mm[start:start + value_length]
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value.decode('utf-8'))
+
+    def set(self, key, record, ttl=None):
+        """
+        Cache the json serializable record under key and return True, or False if it's too
+        large for a slot.
+        """
+        key, number, index = self._locate(key)
+        value = json.dumps(record, separators=(',', ':')).encode('utf-8')
+        if _slot.size + len(key) + len(value) > self.slot_size:
+            return False
+        now = self._clock()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock(index):
+            offsets = self._slots(index)
+            found = self._find(offsets, key, number)
+            if found:
+                offset = found[0]
+            else:
+                offset = self._victim(offsets, now)
+            start = offset + _slot.size
+            self._mm[start:start + len(key) + len(value)] = key + value
+            _slot.pack_into(self._mm, offset, number, expires, now, len(key), len(value))
+        return True
+
+    def _victim(self, offsets, now):
+        """
+        The first empty or expired slot, otherwise the least recently used.
+        """
+        oldest = None
+        for offset in offsets:
+            found, expires, used = _slot.unpack_from(self._mm, offset)[:3]
+            if not found or expires < now:
+                return offset
+            if oldest is None or used < oldest[0]:
+                oldest = (used, offset)
+        return oldest[1]
+
+    def delete(self, key):
+        key, number, index = self._locate(key)
+        with self._lock(index):
+            found = self._find(self._slots(index), key, number)
+            if found:
+                _slot.pack_into(self._mm, found[0], 0, 0, 0, 0, 0)
+
+    def clear(self):
+        for index in range(self.sets):
+            with self._lock(index):
+                for offset in self._slots(index):
+                    _slot.pack_into(self._mm, offset, 0, 0, 0, 0, 0)
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _SetLock(object):
+    """
+    Hold a set against other threads and then other processes.
+    """
+
+    def __init__(self, cache, index):
+        self.cache = cache
+        self.index = index
+        self.offset = HEADER_SIZE + index * cache._set_size
+        self.lock = cache._locks[index % len(cache._locks)]
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            fcntl.lockf(self.cache._fd, fcntl.LOCK_EX, self.cache._set_size, self.offset)
+        except Exception:
+            self.lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        try:
+            fcntl.lockf(self.cache._fd, fcntl.LOCK_UN, self.cache._set_size, self.offset)
+        finally:
+            self.lock.release()
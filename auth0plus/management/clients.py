@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from ..exceptions import ObjectDoesNotExist
+from ..settings import AUTH0_PER_PAGE
+from .base_endpoints import CRUDEndPoint
+from .instrumentation import traced
+from .queryset import QuerySet
+
+
+class Client(CRUDEndPoint):
+
+    _path = 'clients'
+    # client names needn't be unique, and secrets are left out, see snapshot.Snapshot
+    _snapshot_key = 'client_id'
+    _secrets = ('client_secret', 'signing_keys', 'jwt_configuration.secret_encoded')
+    _updatable = [
+        'name',
+        'description',
+        'app_type',
+        'logo_uri',
+        'callbacks',
+        'allowed_origins',
+        'web_origins',
+        'allowed_logout_urls',
+        'grant_types',
+        'jwt_configuration',
+        'token_endpoint_auth_method',
+        'is_first_party',
+        'oidc_conformant',
+        'sso',
+        'sso_disabled',
+        'cross_origin_auth',
+        'client_metadata',
+        'custom_login_page',
+        'custom_login_page_on',
+    ]
+
+    class DoesNotExist(ObjectDoesNotExist):
+        pass
+
+    def get_id(self):
+        return getattr(self, 'client_id', None)
+
+    @classmethod
+    def all(cls, per_page=AUTH0_PER_PAGE, app_type=None, is_first_party=None,
+            is_global=None, include_totals=True, fields=[], include_fields=True):
+        params = {
+            'per_page': per_page,
+            'include_totals': include_totals,
+            'app_type': app_type,
+            'is_first_party': is_first_party,
+            'is_global': is_global,
+            'fields': ','.join(fields) or None,
+            'include_fields': include_fields,
+        }
+        return QuerySet(cls, **params)
+
+    @classmethod
+    @traced
+    def get(cls, id):
+        """
+        Return the client with the client_id id.
+        """
+        try:
+            data = cls._client.get(cls.get_url(id), timeout=cls._timeout)[0]
+        except IndexError:
+            raise cls.DoesNotExist('Client Does Not Exist')
+        client = cls(**data)
+        client._fetched = True
+        return client
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from combomethod import combomethod
+
+from ..exceptions import ObjectDoesNotExist
+from ..settings import AUTH0_PER_PAGE
+from .base_endpoints import CRUDEndPoint
+from .instrumentation import traced
+from .queryset import QuerySet
+
+# strategies whose users need the connection sent with changes to their credentials
+DATABASE_STRATEGIES = ('auth0', 'sms', 'email')
+
+
+class Connection(CRUDEndPoint):
+
+    _path = 'connections'
+    _updatable = [
+        'options',
+        'enabled_clients',
+        'display_name',
+        'metadata',
+        'realms',
+        'is_domain_connection',
+        'show_as_button',
+    ]
+
+    class DoesNotExist(ObjectDoesNotExist):
+        pass
+
+    @classmethod
+    def all(cls, per_page=AUTH0_PER_PAGE, strategy=None, name=None, include_totals=True,
+            fields=[], include_fields=True):
+        params = {
+            'per_page': per_page,
+            'include_totals': include_totals,
+            'strategy': strategy,
+            'name': name,
+            'fields': ','.join(fields) or None,
+            'include_fields': include_fields,
+        }
+        return QuerySet(cls, **params)
+
+    @classmethod
+    @traced
+    def get(cls, id=None, name=None):
+        """
+        Return the connection with the id or name.
+        """
+        if id:
+            try:
+                data = cls._client.get(cls.get_url(id), timeout=cls._timeout)[0]
+            except IndexError:
+                raise cls.DoesNotExist('Connection Does Not Exist')
+            connection = cls(**data)
+            connection._fetched = True
+            return connection
+        connections = cls.all(name=name, per_page=1, include_totals=False)[:1]
+        if not connections:
+            raise cls.DoesNotExist('Connection Does Not Exist')
+        return connections[0]
+
+    def save(self, params=None):
+        super(Connection, self).save(params=params)
+        _forget(self)
+
+    @combomethod
+    def delete(receiver, id=None):
+        super(Connection, receiver).delete(id)
+        _forget(receiver)
+
+    @property
+    def is_database(self):
+        return getattr(self, 'strategy', None) in DATABASE_STRATEGIES
+
+
+def _forget(receiver):
+    index = getattr(receiver, '_connections', None)
+    if index is not None:
+        index.invalidate()
+
+
+class ConnectionIndex(object):
+    """
+    The id and strategy of a tenant's connections by name, fetched in one listing and kept
+    for *ttl* seconds so code that needs to know about a user's connection, like
+    User.save, doesn't ask Auth0 each time. A name that isn't known fetches them again at
+    most once every *refresh_interval* seconds, and a listing that failed, e.g. for a token
+    without read:connections, isn't tried again for as long, lookups raising its error.
+
+    Auth0 keeps one for its endpoints as auth0.users._connections::
+
+        auth0.users._connections['Username-Password-Authentication'].strategy  # 'auth0'
+    """
+
+    def __init__(self, endpoint, ttl=300, refresh_interval=30, clock=time.time):
+        self._endpoint = endpoint  # the Connection class or a callable returning it
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._by_name = {}
+        self._fetched = None
+        self._failed = None  # when the last listing failed
+        self._error = None
+        self._generation = 0
+
+    @property
+    def endpoint(self):
+        if isinstance(self._endpoint, type):
+            return self._endpoint
+        return self._endpoint()
+
+    def get(self, name, default=None):
+        """
+        Return the Connection named name, with its id, name and strategy, or default.
+        """
+        generation = self._generation
+        now = self._clock()
+        if self._failed is not None and now < self._failed + self.refresh_interval:
+            raise self._error
+        connection = self._by_name.get(name)
+        if self._fetched is not None and now < self._fetched + self.ttl:
+            if connection is not None:
+                return connection
+            if now < self._fetched + self.refresh_interval:
+                return default
+        self._refresh(generation)
+        return self._by_name.get(name, default)
+
+    def __getitem__(self, name):
+        connection = self.get(name)
+        if connection is None:
+            raise KeyError(name)
+        return connection
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def _refresh(self, generation):
+        with self._lock:
+            if self._generation != generation:  # another thread refreshed it meanwhile
+                return
+            now = self._clock()
+            try:
+                connections = self.endpoint.all(
+                    per_page=100, include_totals=True, fields=['id', 'name', 'strategy'])
+                by_name = dict((connection.name, connection) for connection in connections)
+            except Exception as err:
+                self._failed, self._error = now, err
+                self._generation += 1
+                raise
+            self._by_name = by_name
+            self._fetched = now
+            self._failed = self._error = None
+            self._generation += 1
+
+    def invalidate(self):
+        """
+        Fetch the connections again the next time one is looked up.
+        """
+        self._fetched = self._failed = None
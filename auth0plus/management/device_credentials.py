@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from ..settings import AUTH0_PER_PAGE
+from .base_endpoints import CRUDEndPoint
+from .batch import Result, run_batch
+from .queryset import QuerySet
+
+
+class DeviceCredential(CRUDEndPoint):
+    """
+    A user's refresh token, public key or rotating refresh token on a device. Auth0 can't
+    update them, only create and delete them.
+
+    Every refresh token of many users, e.g. during an incident, is revoked with::
+
+        for result in auth0.device_credentials.revoke(user_ids, on_progress=print):
+            ...
+    """
+
+    _path = 'device-credentials'
+    _updatable = []
+
+    @classmethod
+    def all(cls, user_id=None, client_id=None, type=None, per_page=AUTH0_PER_PAGE,
+            include_totals=False, fields=[], include_fields=True):
+        params = {
+            'per_page': per_page,
+            'include_totals': include_totals,
+            'user_id': user_id,
+            'client_id': client_id,
+            'type': type,
+            'fields': ','.join(fields) or None,
+            'include_fields': include_fields,
+        }
+        return QuerySet(cls, **params)
+
+    @classmethod
+    def revoke(cls, user_ids, type='refresh_token', client_id=None, workers=8,
+               rate_limiter=None, on_progress=None, max_retries=5, backoff=1.0):
+        """
+        Delete the device credentials of type, of the client_id if given, of each user_id.
+
+        One pool of workers takes a user at a time, lists their credentials and deletes
+        them, and a auth0plus.management.batch.Result is yielded for each credential
+        deleted, or failed, or for a user_id whose credentials couldn't be listed. A user
+        rate limited part way is backed off and picked up again where it stopped, see
+        run_batch for the other arguments. on_progress is sent the Progress of the users.
+        """
+        revoked = {}  # user_id to the results of its credentials, kept between retries
+
+        def revoke_user(user_id):
+            results = revoked.setdefault(user_id, [])
+            # read every page before deleting so the deletes don't shift the pages
+            credentials = [credential for credential in cls.all(
+                user_id=user_id, client_id=client_id, type=type, per_page=100,
+                fields=['id', 'user_id', 'type'])]
+            for credential in credentials:
+                try:
+                    credential.delete()
+                except Exception as err:
+                    if getattr(err, 'status_code', None) == 429:
+                        raise  # run_batch backs off and tries the user again
+                    results.append(Result(credential, None, err))
+                else:
+                    results.append(Result(credential, credential.get_id(), None))
+            return revoked.pop(user_id)
+
+        for result in run_batch(revoke_user, user_ids, workers=workers,
+                                rate_limiter=rate_limiter, on_progress=on_progress,
+                                max_retries=max_retries, backoff=backoff):
+            if result.error:
+                revoked.pop(result.item, None)
+                yield result
+            else:
+                for credential in result.value:
+                    yield credential
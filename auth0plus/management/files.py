@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+
+
+def write_atomic(path, text):
+    """
+    Write text to a temporary file beside path and rename it over path once it is on disk,
+    so a crash never leaves a partial file behind.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=directory, prefix='.%s' % os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'w') as fp:
+            fp.write(text)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.rename(temp, path)
+    except Exception:
+        os.unlink(temp)
+        raise
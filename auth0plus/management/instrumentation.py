@@ -0,0 +1,357 @@
+# -*- coding: utf-8 -*-
+"""
+Hooks for timing the calls made to the management api.
+
+A hook is any callable that takes an event. RestClient sends a RequestEvent after every
+request and QuerySet sends a PageEvent after every page it fetches. Register a hook on one
+client with client.add_hook(hook) or for every client in the process with add_hook(hook).
+Nothing is timed while no hooks are registered.
+
+Use *trace* to see which requests each high level operation such as User.save or a page of
+QuerySet iteration made::
+
+    with trace() as calls:
+        user.save()
+    print(calls.format())
+"""
+import functools
+import logging
+import re
+import threading
+import time
+
+from six.moves.urllib.parse import urlsplit
+
+try:
+    from time import perf_counter as timer
+except ImportError:  # pragma: no cover
+    timer = time.time
+
+logger = logging.getLogger(__name__)
+
+_hooks = []  # process wide hooks
+_traces = []  # active Trace instances
+_local = threading.local()
+_id_re = re.compile(r'[0-9|%@]')
+_version_re = re.compile(r'^v\d+$')
+
+
+def add_hook(hook):
+    """
+    Send events from every client to hook.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+def hooks_for(client):
+    """
+    Return the hooks that should receive events for client, or an empty list.
+    """
+    client_hooks = getattr(client, 'hooks', None)
+    if isinstance(client_hooks, list) and client_hooks:
+        return client_hooks + _hooks
+    return _hooks
+
+
+def notify(hooks, event):
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception:
+            # a broken metrics backend shouldn't break the call being measured
+            logger.exception('auth0plus hook %r failed', hook)
+
+
+def endpoint_template(url):
+    """
+    Reduce a url to its path with ids replaced, e.g. /api/v2/users/{id}, so it can be used
+    as a low cardinality metric label.
+    """
+    path = urlsplit(url).path
+    return '/'.join(
+        '{id}' if _id_re.search(segment) and not _version_re.match(segment) else segment
+        for segment in path.split('/'))
+
+
+def _stack():
+    try:
+        return _local.stack
+    except AttributeError:
+        _local.stack = []
+        return _local.stack
+
+
+def current_operation():
+    """
+    The name of the innermost traced operation on this thread, or None.
+    """
+    stack = getattr(_local, 'stack', None)
+    return stack[-1].name if stack else None
+
+
+class operation(object):
+    """
+    Name the requests made inside the block for any active traces, e.g.::
+
+        with operation('sync users'):
+            ...
+
+    Does nothing unless a trace is active.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.record = None
+
+    def __enter__(self):
+        if _traces:
+            stack = _stack()
+            self.record = OperationRecord(self.name, stack[-1] if stack else None)
+            stack.append(self.record)
+            for active in list(_traces):
+                active.operations.append(self.record)
+        return self.record
+
+    def __exit__(self, *exc_info):
+        if self.record is not None:
+            self.record.duration = timer() - self.record.start
+            _stack().remove(self.record)
+
+
+def traced(func):
+    """
+    Decorate an endpoint method so the requests it makes are traced as an operation named
+    after the class and method, e.g. User.save. Use beneath classmethod or combomethod.
+    """
+    @functools.wraps(func)
+    def wrapper(receiver, *args, **kwargs):
+        if not _traces:
+            return func(receiver, *args, **kwargs)
+        cls = receiver if isinstance(receiver, type) else receiver.__class__
+        with operation('%s.%s' % (cls.__name__, func.__name__)):
+            return func(receiver, *args, **kwargs)
+    return wrapper
+
+
+class OperationRecord(object):
+    """
+    A traced operation, its timing and the requests made directly inside it.
+    """
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.started = time.time()
+        self.start = timer()
+        self.duration = None
+        self.calls = []
+
+    @property
+    def depth(self):
+        return self.parent.depth + 1 if self.parent else 0
+
+    def __repr__(self):
+        return '<OperationRecord %s %s calls>' % (self.name, len(self.calls))
+
+
+class Trace(object):
+    """
+    Record every request made while active, grouped by operation. Use trace() to create
+    one as a context manager.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.operations = []
+
+    def __enter__(self):
+        _traces.append(self)
+        _hooks.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _hooks.remove(self)
+        _traces.remove(self)
+
+    def __call__(self, event):
+        if event.kind != 'request':
+            return
+        self.calls.append(event)
+        stack = _stack()
+        if stack and stack[-1] in self.operations:
+            stack[-1].calls.append(event)
+
+    def __len__(self):
+        return len(self.calls)
+
+    def count(self, method=None, endpoint=None):
+        """
+        The number of requests made, optionally only those with the method and/or the
+        endpoint template, e.g. count('PATCH', '/api/v2/users/{id}').
+        """
+        return len([
+            call for call in self.calls
+            if (method is None or call.method == method.upper()) and
+            (endpoint is None or call.endpoint == endpoint)])
+
+    def format(self):
+        """
+        A readable listing of the operations and the requests they made.
+        """
+        lines = []
+        for record in self.operations:
+            indent = '  ' * record.depth
+            duration = '' if record.duration is None else ' %.1fms' % (record.duration * 1000)
+            lines.append('%s%s%s' % (indent, record.name, duration))
+            lines.extend('%s  %s' % (indent, _format_call(call)) for call in record.calls)
+        outside = [call for call in self.calls if call.operation is None]
+        lines.extend(_format_call(call) for call in outside)
+        return '\n'.join(lines)
+
+
+def _format_call(call):
+    return '%s %s %s %.1fms' % (call.method, call.url, call.status_code, call.latency * 1000)
+
+
+def trace():
+    """
+    A context manager recording the requests made inside it from every thread::
+
+        with trace() as calls:
+            User.get_or_create(email='bon@acdc.com')
+        assert calls.count('GET') == 1
+    """
+    return Trace()
+
+
+class RequestEvent(object):
+    """
+    One management api request.
+
+    latency is the time in seconds spent waiting on the api including any retries,
+    rate_limit_remaining is taken from the X-RateLimit-Remaining header when present and
+    error is the exception raised by the transport, if any.
+    """
+    kind = 'request'
+
+    def __init__(self, method, url, status_code, size, started, latency, retries=0,
+                 rate_limit_remaining=None, error=None):
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint_template(url)
+        self.status_code = status_code
+        self.bytes = size
+        self.started = started
+        self.latency = latency
+        self.retries = retries
+        self.rate_limit_remaining = rate_limit_remaining
+        self.error = error
+        self.operation = current_operation()
+
+    def __repr__(self):
+        return '<RequestEvent %s %s %s %.1fms>' % (
+            self.method, self.endpoint, self.status_code, self.latency * 1000)
+
+
+class PageEvent(object):
+    """
+    One page of records fetched by a QuerySet.
+    """
+    kind = 'page'
+
+    def __init__(self, path, page, records, started, latency):
+        self.path = path
+        self.page = page
+        self.records = records
+        self.started = started
+        self.latency = latency
+
+    def __repr__(self):
+        return '<PageEvent %s page %s %s records %.1fms>' % (
+            self.path, self.page, self.records, self.latency * 1000)
+
+
+class PrometheusHook(object):
+    """
+    Observe request and page latencies in prometheus_client histograms labelled by method,
+    endpoint template and status, count retries and track the remaining rate limit.
+
+    Requires the prometheus_client package.
+    """
+
+    def __init__(self, namespace='auth0plus', registry=None, buckets=None):
+        try:
+            from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+        except ImportError:
+            raise ImportError('PrometheusHook requires the prometheus_client package')
+        registry = registry or REGISTRY
+        kwargs = {'registry': registry, 'namespace': namespace}
+        if buckets:
+            kwargs['buckets'] = buckets
+        self.requests = Histogram(
+            'request_seconds', 'Auth0 management api request latency',
+            ['method', 'endpoint', 'status'], **kwargs)
+        self.pages = Histogram(
+            'page_seconds', 'Auth0 QuerySet page fetch latency', ['path'], **kwargs)
+        self.retries = Counter(
+            'request_retries', 'Auth0 management api retried requests',
+            ['method', 'endpoint'], registry=registry, namespace=namespace)
+        self.rate_limit_remaining = Gauge(
+            'rate_limit_remaining', 'Auth0 management api requests left in the window',
+            registry=registry, namespace=namespace)
+
+    def __call__(self, event):
+        if event.kind == 'page':
+            self.pages.labels(event.path).observe(event.latency)
+            return
+        self.requests.labels(
+            event.method, event.endpoint, str(event.status_code)).observe(event.latency)
+        if event.retries:
+            self.retries.labels(event.method, event.endpoint).inc(event.retries)
+        if event.rate_limit_remaining is not None:
+            self.rate_limit_remaining.set(event.rate_limit_remaining)
+
+
+class OpenTelemetryHook(object):
+    """
+    Record each request and page fetch as an OpenTelemetry span.
+
+    Requires the opentelemetry-api package, tracer defaults to the global tracer provider's.
+    """
+
+    def __init__(self, tracer=None):
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            raise ImportError('OpenTelemetryHook requires the opentelemetry-api package')
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer('auth0plus')
+
+    def __call__(self, event):
+        start = int(event.started * 1e9)
+        end = start + int(event.latency * 1e9)
+        if event.kind == 'page':
+            name = 'auth0 page %s' % event.path
+            attributes = {'auth0.path': event.path, 'auth0.page': event.page,
+                          'auth0.records': event.records}
+        else:
+            name = 'auth0 %s %s' % (event.method, event.endpoint)
+            attributes = {
+                'http.method': event.method,
+                'http.url': event.url,
+                'http.status_code': event.status_code,
+                'http.response_content_length': event.bytes,
+                'auth0.endpoint': event.endpoint,
+                'auth0.retries': event.retries,
+                'auth0.rate_limit_remaining': event.rate_limit_remaining,
+            }
+        attributes = dict((k, v) for k, v in attributes.items() if v is not None)
+        span = self.tracer.start_span(
+            name, kind=self._trace.SpanKind.CLIENT, start_time=start, attributes=attributes)
+        if event.kind == 'request' and (event.error or (event.status_code or 0) >= 400):
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=end)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Log events, searched like users with Log.query or read in order with checkpoints::
+
+    failed = auth0.logs.query(q='type:f', sort='date:-1')[:10]
+
+    tail = auth0.logs.tail(FileCursor('/var/lib/siem/auth0.cursor'))
+    tail.run(ship)  # or: for batch in tail.batches(): ship(batch)
+
+A tail asks for the logs after the last one handled (the from/take checkpoint api) and
+only moves its cursor on once a batch has been handed over, so a restarted tail resumes
+where the last one stopped without gaps or duplicates. Once it has caught up it waits
+before asking again, doubling the wait up to *max_wait* while no new logs arrive.
+"""
+import threading
+
+from ..exceptions import ObjectDoesNotExist
+from .base_endpoints import BaseEndPoint, QueryableMixin
+from .files import write_atomic
+from .instrumentation import traced
+
+MAX_TAKE = 100  # the most logs a checkpoint request returns
+
+
+class Log(QueryableMixin, BaseEndPoint):
+
+    _path = 'logs'
+
+    class DoesNotExist(ObjectDoesNotExist):
+        pass
+
+    def get_id(self):
+        return getattr(self, 'log_id', None) or getattr(self, '_id', None)
+
+    @classmethod
+    @traced
+    def get(cls, id):
+        try:
+            data = cls._client.get(cls.get_url(id), timeout=cls._timeout)[0]
+        except IndexError:
+            raise cls.DoesNotExist('Log Does Not Exist')
+        log = cls(**data)
+        log._fetched = True
+        return log
+
+    @classmethod
+    @traced
+    def after(cls, log_id=None, take=MAX_TAKE):
+        """
+        Return up to take logs recorded after log_id, oldest first, or the oldest logs
+        kept when log_id is None.
+        """
+        if log_id:
+            params = {'from': log_id, 'take': take}
+        else:
+            params = {'sort': 'date:1', 'per_page': take, 'page': 0}
+        logs = []
+        for data in cls._client.get(cls._endpoint, params=params, timeout=cls._timeout):
+            log = cls(**data)
+            log._fetched = True
+            logs.append(log)
+        return logs
+
+    @classmethod
+    def tail(cls, cursor=None, **kwargs):
+        """
+        Return a LogTail reading these logs from the cursor's position onwards.
+        """
+        return LogTail(cls, cursor, **kwargs)
+
+
+class MemoryCursor(object):
+    """
+    The id of the last log handled, held for the life of the process.
+    """
+
+    def __init__(self, position=None):
+        self.position = position
+
+    def get(self):
+        return self.position
+
+    def set(self, position):
+        self.position = position
+
+
+class FileCursor(object):
+    """
+    The id of the last log handled, kept in a file so it outlives the process. Each
+    position is written to a temporary file and renamed over the last one so a crash
+    never leaves a partial id behind.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def get(self):
+        try:
+            with open(self.path) as fp:
+                return fp.read().strip() or None
+        except (IOError, OSError):
+            return None
+
+    def set(self, position):
+        write_atomic(self.path, position)
+
+
+class LogTail(object):
+    """
+    Args:
+        logs: The Log endpoint to read, e.g. auth0.logs
+
+        cursor: A MemoryCursor, FileCursor or anything with get() and set(log_id), the
+            tail starts from the oldest log kept if it has no position
+
+        take (int): The most logs asked for at once, up to 100
+
+        min_wait (float): Seconds to wait before asking again once caught up
+
+        max_wait (float): The longest wait while no new logs arrive
+
+        wait: Callable sent the seconds to wait, which returns True to stop, by default
+            it waits until then or until stop() is called
+    """
+
+    def __init__(self, logs, cursor=None, take=MAX_TAKE, min_wait=1.0, max_wait=30.0,
+                 wait=None):
+        self.logs = logs
+        self.cursor = cursor if cursor is not None else MemoryCursor()
+        self.take = min(take, MAX_TAKE)
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self._stopped = threading.Event()
+        self._wait = wait or self._stopped.wait
+
+    def batches(self, follow=True):
+        """
+        Yield lists of logs in the order they were recorded. The cursor moves past a batch
+        when the next one is asked for, so a batch abandoned part way is read again by the
+        next tail. Stops once caught up unless follow is True.
+        """
+        idle = 0  # polls in a row that found nothing new
+        while not self._stopped.is_set():
+            batch = self.logs.after(self.cursor.get(), self.take)
+            if batch:
+                yield batch
+                self.cursor.set(batch[-1].get_id())
+                idle = 0
+            else:
+                idle += 1
+            if len(batch) == self.take:
+                continue
+            if not follow or self._wait(min(self.min_wait * 2 ** idle, self.max_wait)):
+                return
+
+    def run(self, callback, follow=True):
+        """
+        Send each batch to callback until stopped, the cursor only moves past a batch once
+        callback returns.
+        """
+        for batch in self.batches(follow=follow):
+            callback(batch)
+
+    def stop(self):
+        self._stopped.set()
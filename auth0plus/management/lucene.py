@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""
+Evaluate the lucene queries sent to the user search locally, so records already held in
+memory, a cache or a UserMirror can be filtered without asking Auth0::
+
+    query = lucene.compile('email:*@acme.com AND NOT app_metadata.plan:"free"')
+    paying = [user for user in users if query.match(user)]
+    lucene.filter(users, email='*@acme.com')  # the same kwargs as User.query
+
+Supports field:value and field:"phrase" terms with * and ? wildcards, [lower TO upper]
+and {lower TO upper} ranges with * for an open end, _exists_:field, AND, OR, NOT, + and -
+prefixes, parentheses and field:(grouped OR values). Terms without an operator between
+them combine as in lucene: every + term must match, no - or NOT term may, and the other
+terms are ORed, only counting when there's no + term. Matching is case insensitive,
+dotted fields descend into nested dicts and lists like identities.connection, and dates in
+ranges compare to the day or to whatever precision the bound is given in.
+
+Records are dicts or endpoint instances such as User.
+"""
+import json
+import re
+
+from six import string_types
+
+from ..exceptions import InvalidQuery
+from .queryset import _build_lucene_query
+
+_CACHE_SIZE = 256
+
+_space_re = re.compile(r'\s*')
+_operator_re = re.compile(r'(AND|OR|NOT)(?=[\s()]|$)|(&&|\|\||!)')
+_field_re = re.compile(r'([\w.]+|_exists_):')
+_phrase_re = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_range_re = re.compile(r'([\[{])\s*("(?:[^"\\]|\\.)*"|[^\s\]}]+)\s+TO\s+'
+                       r'("(?:[^"\\]|\\.)*"|[^\s\]}]+)\s*([\]}])')
+_word_re = re.compile(r'(?:[^\s()\\]|\\.)+')
+_escape_re = re.compile(r'\\(.)')
+_date_re = re.compile(r'^\d{4}-\d{2}-\d{2}')
+_number_re = re.compile(r'^-?\d+(\.\d+)?$')
+
+
+def _unescape(text):
+    return _escape_re.sub(r'\1', text)
+
+
+def _values(record, field):
+    """
+    Yield the values at a dotted field, descending into lists like identities.connection.
+    """
+    values = [record if isinstance(record, dict) else vars(record)]
+    for key in field.split('.'):
+        found = []
+        for value in values:
+            if isinstance(value, list):
+                found.extend(item.get(key) for item in value if isinstance(item, dict))
+            elif isinstance(value, dict) and key in value:
+                found.append(value[key])
+        values = found
+    for value in values:
+        if isinstance(value, list):
+            for item in value:
+                yield item
+        elif value is not None:
+            yield value
+
+
+def _text(value):
+    return value if isinstance(value, string_types) else json.dumps(value)
+
+
+class Term(object):
+    """
+    A field:value term, *wildcard* is True when the value has unquoted * or ? wildcards.
+    """
+
+    def __init__(self, field, value, wildcard=False):
+        self.field = field
+        self.value = value
+        self.wildcard = wildcard
+        if wildcard:
+            pattern = ''.join(
+                '.*' if char == '*' else '.' if char == '?' else re.escape(char)
+                for char in value)
+            self._pattern = re.compile('^%s$' % pattern, re.IGNORECASE | re.UNICODE | re.DOTALL)
+        else:
+            self._lower = value.lower()
+
+    def match(self, record):
+        for value in _values(record, self.field):
+            if self.wildcard:
+                if self._pattern.match(_text(value)):
+                    return True
+            elif _text(value).lower() == self._lower:
+                return True
+        return False
+
+
+class Range(object):
+    """
+    A field:[lower TO upper] term, a bound of None is open and include_* are False for
+    the {} exclusive bounds. Numbers compare as numbers and dates to the precision given.
+    """
+
+    def __init__(self, field, lower, upper, include_lower=True, include_upper=True):
+        self.field = field
+        self.lower = lower
+        self.upper = upper
+        self.include_lower = include_lower
+        self.include_upper = include_upper
+
+    @staticmethod
+    def _compare(value, bound):
+        if _number_re.match(bound) and isinstance(value, (int, float)) and \
+                not isinstance(value, bool):
+            bound = float(bound)
+        else:
+            value = _text(value)
+            if _date_re.match(bound) and _date_re.match(value):
+                value = value[:len(bound)]
+            elif _number_re.match(bound) and _number_re.match(value):
+                value, bound = float(value), float(bound)
+        return (value > bound) - (value < bound)
+
+    def _within(self, value):
+        if self.lower is not None:
+            order = self._compare(value, self.lower)
+            if order < 0 or order == 0 and not self.include_lower:
+                return False
+        if self.upper is not None:
+            order = self._compare(value, self.upper)
+            if order > 0 or order == 0 and not self.include_upper:
+                return False
+        return True
+
+    def match(self, record):
+        return any(self._within(value) for value in _values(record, self.field))
+
+
+class Exists(object):
+
+    def __init__(self, field):
+        self.field = field
+
+    def match(self, record):
+        return next(_values(record, self.field), None) is not None
+
+
+class And(object):
+
+    def __init__(self, clauses):
+        self.clauses = clauses
+
+    def match(self, record):
+        return all(clause.match(record) for clause in self.clauses)
+
+
+class Or(object):
+
+    def __init__(self, clauses):
+        self.clauses = clauses
+
+    def match(self, record):
+        return any(clause.match(record) for clause in self.clauses)
+
+
+class Not(object):
+
+    def __init__(self, clause):
+        self.clause = clause
+
+    def match(self, record):
+        return not self.clause.match(record)
+
+
+class Boolean(object):
+    """
+    Clauses joined without an operator, as lucene's BooleanQuery: every required clause
+    must match and no prohibited one may, the optional clauses only count when there are
+    no required ones.
+    """
+
+    def __init__(self, required, optional, prohibited):
+        self.required = required
+        self.optional = optional
+        self.prohibited = prohibited
+
+    def match(self, record):
+        if not all(clause.match(record) for clause in self.required):
+            return False
+        if any(clause.match(record) for clause in self.prohibited):
+            return False
+        if self.required or not self.optional:
+            return True
+        return any(clause.match(record) for clause in self.optional)
+
+
+class _Required(object):
+    """
+    A + clause until the group it's in is built.
+    """
+
+    def __init__(self, clause):
+        self.clause = clause
+
+    def match(self, record):
+        return self.clause.match(record)
+
+
+class _Parser(object):
+    """
+    A recursive descent parser for::
+
+        or    := and ((OR | ) and)*
+        and   := unary (AND unary)*
+        unary := (NOT | - | !) unary | + unary | ( or ) | field:value | field:( or )
+
+    An or with + or NOT clauses is a Boolean.
+    """
+
+    def __init__(self, q):
+        self.q = q
+        self.position = 0
+
+    def error(self, message='Invalid query'):
+        return InvalidQuery('%s at %s: %s' % (message, self.position, self.q))
+
+    def skip(self):
+        self.position = _space_re.match(self.q, self.position).end()
+        return self.position < len(self.q)
+
+    def operator(self, *names):
+        self.skip()
+        match = _operator_re.match(self.q, self.position)
+        if not match:
+            return None
+        name = {'&&': 'AND', '||': 'OR', '!': 'NOT'}.get(match.group(0), match.group(0))
+        if name not in names:
+            return None
+        self.position = match.end()
+        return name
+
+    def char(self, char):
+        if self.skip() and self.q[self.position] == char:
+            self.position += 1
+            return True
+        return False
+
+    def parse(self):
+        node = self.parse_or(None)
+        if self.skip():
+            raise self.error()
+        return node
+
+    def parse_or(self, field):
+        clauses = [self.parse_and(field)]
+        while self.skip() and self.q[self.position] != ')':
+            self.operator('OR')  # an implicit operator is OR too
+            clauses.append(self.parse_and(field))
+        required = [clause.clause for clause in clauses if isinstance(clause, _Required)]
+        prohibited = [clause.clause for clause in clauses if isinstance(clause, Not)]
+        optional = [clause for clause in clauses if not isinstance(clause, (_Required, Not))]
+        if len(clauses) == 1:
+            return required[0] if required else clauses[0]
+        if not required and not prohibited:
+            return Or(optional)
+        return Boolean(required, optional, prohibited)
+
+    def parse_and(self, field):
+        clauses = [self.parse_unary(field)]
+        while self.operator('AND'):
+            clauses.append(self.parse_unary(field))
+        if len(clauses) == 1:
+            return clauses[0]
+        return And([clause.clause if isinstance(clause, _Required) else clause
+                    for clause in clauses])
+
+    def parse_unary(self, field):
+        if self.operator('NOT') or self.char('-'):
+            return Not(self.parse_unary(field))
+        if self.char('+'):
+            return _Required(self.parse_unary(field))
+        if self.char('('):
+            node = self.parse_or(field)
+            if not self.char(')'):
+                raise self.error('Unbalanced parentheses')
+            return node
+        if not self.skip():
+            raise self.error('Missing term')
+        match = _field_re.match(self.q, self.position)
+        if match:
+            self.position = match.end()
+            if match.group(1) == '_exists_':
+                return Exists(self.value())
+            if self.char('('):
+                node = self.parse_or(match.group(1))
+                if not self.char(')'):
+                    raise self.error('Unbalanced parentheses')
+                return node
+            return self.term(match.group(1))
+        if field is None:
+            raise self.error('Missing field')
+        return self.term(field)
+
+    def value(self):
+        match = _word_re.match(self.q, self.position)
+        if not match:
+            raise self.error('Missing value')
+        self.position = match.end()
+        return _unescape(match.group(0))
+
+    def term(self, field):
+        match = _phrase_re.match(self.q, self.position)
+        if match:
+            self.position = match.end()
+            return Term(field, _unescape(match.group(1)))
+        match = _range_re.match(self.q, self.position)
+        if match:
+            self.position = match.end()
+            opening, lower, upper, closing = match.groups()
+            return Range(field, _bound(lower), _bound(upper), opening == '[', closing == ']')
+        raw = _word_re.match(self.q, self.position)
+        if not raw:
+            raise self.error('Missing value')
+        wildcard = re.search(r'(?<!\\)[*?]', raw.group(0)) is not None
+        return Term(field, self.value(), wildcard)
+
+
+def _bound(text):
+    if text == '*':
+        return None
+    if text.startswith('"'):
+        return _unescape(text[1:-1])
+    return _unescape(text)
+
+
+class Query(object):
+    """
+    A parsed query, *node* is the root of its Term, Range, Exists, And, Or, Not and Boolean
+    tree.
+    """
+
+    def __init__(self, q):
+        self.q = q
+        self.node = _Parser(q).parse()
+
+    def match(self, record):
+        return self.node.match(record)
+
+    def filter(self, records):
+        return (record for record in records if self.node.match(record))
+
+    def required(self):
+        """
+        Return the terms every match must satisfy, for narrowing candidates with an index
+        before matching the whole query.
+        """
+        if isinstance(self.node, And):
+            clauses = self.node.clauses
+        elif isinstance(self.node, Boolean):
+            clauses = self.node.required
+        else:
+            clauses = [self.node]
+        return [clause for clause in clauses if isinstance(clause, (Term, Range))]
+
+    def __repr__(self):
+        return '<Query %s>' % self.q
+
+
+_compiled = {}
+
+
+def compile(q):
+    """
+    Return the Query for q, reusing queries compiled recently.
+    """
+    try:
+        return _compiled[q]
+    except KeyError:
+        pass
+    query = Query(q)
+    if len(_compiled) >= _CACHE_SIZE:
+        _compiled.clear()
+    _compiled[q] = query
+    return query
+
+
+def match(q, record):
+    return compile(q).match(record)
+
+
+def filter(records, q=None, **kwargs):
+    """
+    Yield the records matching q, or the keyword query User.query would send for kwargs.
+    """
+    q = q or _build_lucene_query(kwargs)
+    if not q:
+        return iter(records)
+    return compile(q).filter(records)
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+A local SQLite copy of a tenant's users for reads that don't need to ask Auth0::
+
+    mirror = UserMirror(auth0.users, 'users.db')
+    mirror.sync()  # everything the first time, then only users updated since
+    mirror.get(email='bon@acdc.com')
+    mirror.query(connection='db', email='*@acdc.com', sort='email:1')
+    mirror.query(q='app_metadata.plan:(gold OR silver) AND NOT blocked:true')
+
+The first sync loads every user in updated_at order and later ones pull
+updated_at:[last TO *]. The search api only pages through the first 1000 results of a
+query so each pull is read in windows of that size, querying again from the last
+updated_at seen. Incremental pulls can't see deleted users, sync(full=True) loads every
+user again and drops the rows of users that are gone.
+
+Users are returned as instances of the endpoint class so they can be saved as usual.
+Queries are the lucene queries User.query sends, evaluated with auth0plus.management.lucene.
+Terms on user_id, email and identities.connection that every match must satisfy are looked
+up in indexes first and only the records they select are matched against the rest.
+"""
+import json
+import logging
+import sqlite3
+import threading
+
+from ..exceptions import MultipleObjectsReturned
+from . import lucene
+from .queryset import _build_lucene_query
+
+logger = logging.getLogger(__name__)
+
+SEARCH_WINDOW = 1000  # the most results the search api pages through for one query
+
+_schema = [
+    'CREATE TABLE IF NOT EXISTS users (user_id TEXT PRIMARY KEY COLLATE NOCASE, '
+    'email TEXT COLLATE NOCASE, connection TEXT, updated_at TEXT, data TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS users_email ON users (email)',
+    'CREATE INDEX IF NOT EXISTS users_updated_at ON users (updated_at)',
+    'CREATE TABLE IF NOT EXISTS identities (user_id TEXT NOT NULL COLLATE NOCASE, '
+    'connection TEXT NOT NULL COLLATE NOCASE)',
+    'CREATE INDEX IF NOT EXISTS identities_connection ON identities (connection)',
+    'CREATE INDEX IF NOT EXISTS identities_user_id ON identities (user_id)',
+    'CREATE TABLE IF NOT EXISTS sync_state (key TEXT PRIMARY KEY, value TEXT)',
+]
+_indexed = {
+    'user_id': 'user_id %s',
+    'email': 'email %s',
+    'identities.connection':
+        'user_id IN (SELECT user_id FROM identities WHERE connection %s)',
+}
+_sortable = ('user_id', 'email', 'connection', 'updated_at')
+
+
+def _connections(record):
+    return [identity['connection'] for identity in record.get('identities') or []
+            if identity.get('connection')]
+
+
+def _like(value):
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped.replace('*', '%').replace('?', '_')
+
+
+def _index_lookup(term):
+    """
+    Return the sql condition and parameter selecting the rows that can match term, or None
+    when there isn't an index for it.
+    """
+    if not isinstance(term, lucene.Term) or term.field not in _indexed:
+        return None
+    if term.wildcard:
+        return _indexed[term.field] % "LIKE ? ESCAPE '\\'", _like(term.value)
+    return _indexed[term.field] % '= ?', term.value
+
+
+class UserMirror(object):
+    """
+    Args:
+        users: The User endpoint to mirror, e.g. auth0.users
+
+        path (str): The SQLite database file, the default keeps the mirror in memory
+
+        per_page (int): Users fetched with each request while syncing
+    """
+
+    def __init__(self, users, path=':memory:', per_page=100):
+        self.users = users
+        self.path = path
+        self.per_page = per_page
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._db:
+            for statement in _schema:
+                self._db.execute(statement)
+
+    @property
+    def last_updated(self):
+        """
+        The updated_at of the latest change synced, None before the first sync.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM sync_state WHERE key = 'updated_at'").fetchone()
+        return row[0] if row else None
+
+    def sync(self, full=False):
+        """
+        Pull users changed since the last sync, or every user when full or on the first
+        sync, and return the number of records written.
+        """
+        since = None if full else self.last_updated
+        seen = set() if since is None else None
+        written = 0
+        while True:
+            count, last = self._pull_window(since, seen)
+            written += count
+            if count < SEARCH_WINDOW:
+                break
+            if last == since:
+                # a whole window shares one updated_at so querying from it again can't
+                # get any further
+                logger.warning('More than %s users were updated at %s, some may not '
+                               'have been mirrored', SEARCH_WINDOW, last)
+                break
+            since = last
+        if seen is not None:
+            self._drop_missing(seen)
+        return written
+
+    def _pull_window(self, since, seen):
+        q = 'updated_at:[%s TO *]' % (since or '*')
+        users = self.users.query(
+            q=q, sort='updated_at:1', per_page=self.per_page, include_totals=False)
+        count = 0
+        last = since
+        rows = []
+        identities = []
+        for user in users:
+            record = user.as_dict()
+            last = record.get('updated_at') or last
+            connections = _connections(record)
+            rows.append((record['user_id'], record.get('email'),
+                         connections[0] if connections else None,
+                         record.get('updated_at'), json.dumps(record)))
+            identities.extend((record['user_id'], connection) for connection in connections)
+            if seen is not None:
+                seen.add(record['user_id'])
+            count += 1
+            if count == SEARCH_WINDOW:
+                break
+        with self._lock, self._db:
+            self._db.executemany('INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)', rows)
+            self._db.executemany('DELETE FROM identities WHERE user_id = ?',
+                                 [row[:1] for row in rows])
+            self._db.executemany('INSERT INTO identities VALUES (?, ?)', identities)
+            if last:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sync_state VALUES ('updated_at', ?)", (last,))
+        return count, last
+
+    def _drop_missing(self, seen):
+        with self._lock, self._db:
+            stored = [row[0] for row in self._db.execute('SELECT user_id FROM users')]
+            gone = [(user_id,) for user_id in stored if user_id not in seen]
+            self._db.executemany('DELETE FROM users WHERE user_id = ?', gone)
+            self._db.executemany('DELETE FROM identities WHERE user_id = ?', gone)
+
+    def _user(self, data):
+        user = self.users(**json.loads(data))
+        user._fetched = True
+        return user
+
+    def _select(self, q, sort=None):
+        """
+        Yield the stored records matching the lucene query q, or every record if it's None.
+        """
+        query = lucene.compile(q) if q else None
+        where = []
+        params = []
+        required = query.required() if query else []
+        for term in required:
+            lookup = _index_lookup(term)
+            if lookup:
+                where.append(lookup[0])
+                params.append(lookup[1])
+        # the indexes answer the whole query when it's nothing but indexed terms
+        covered = query is None
+        if query is not None:
+            node = query.node
+            clauses = node.clauses if isinstance(node, lucene.And) else [node]
+            covered = len(where) == len(clauses) and all(
+                isinstance(clause, (lucene.Term, lucene.Range)) for clause in clauses)
+        sql = 'SELECT data FROM users'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        if sort:
+            field, _, direction = sort.partition(':')
+            if field not in _sortable:
+                raise ValueError('The mirror can only sort by %s' % ', '.join(_sortable))
+            sql += ' ORDER BY %s %s' % (field, 'DESC' if direction == '-1' else 'ASC')
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        for (data,) in rows:
+            if covered or query.match(json.loads(data)):
+                yield data
+
+    @staticmethod
+    def _q(q, kwargs):
+        """
+        The lucene query User.query would send for q or the keywords.
+        """
+        if 'connection' in kwargs:
+            kwargs['identities.connection'] = kwargs.pop('connection')
+        return q or _build_lucene_query(kwargs) or None
+
+    def query(self, q=None, sort=None, **kwargs):
+        """
+        Return a list of the mirrored users matching the lucene query q or every keyword,
+        e.g. query(email='*@acdc.com', connection='db'), sorted by one of user_id, email,
+        connection or updated_at as field:1 or field:-1.
+        """
+        return [self._user(data) for data in self._select(self._q(q, kwargs), sort)]
+
+    def get(self, id=None, **kwargs):
+        """
+        Return the single mirrored user with the id or matching the keywords.
+        """
+        if id:
+            kwargs['user_id'] = id
+        found = []
+        for data in self._select(self._q(None, kwargs)):
+            found.append(data)
+            if len(found) > 1:
+                raise MultipleObjectsReturned('UserMirror.get returned multiple users')
+        if not found:
+            raise self.users.DoesNotExist('User Does Not Exist')
+        return self._user(found[0])
+
+    def count(self, q=None, **kwargs):
+        q = self._q(q, kwargs)
+        if not q:
+            return len(self)
+        return sum(1 for _ in self._select(q))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM users').fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,43 +1,144 @@
 # -*- coding: utf-8 -*-
+import time
+
 from ..exceptions import UnimplementedException
+from .instrumentation import PageEvent, hooks_for, notify, operation, timer
+
+
+def _build_lucene_query(kwargs):
+    lucene_q = []
+    for key, value in kwargs.items():
+        if '*' in value:
+            lucene_q.append(u'%s:%s' % (key, value))
+        else:
+            lucene_q.append(u'%s:"%s"' % (key, value))
+    return ' AND '.join(lucene_q)
 
 
 class QuerySet(object):
     """
     Generate an iterator over the response and cache the result for slicing like a list.
+
+    Like a django queryset nothing is requested from the endpoint until it is evaluated by
+    iterating, indexing, count() or bool(), so *filter*, *order_by* and *per_page*
+    can be chained without any network calls. There's deliberately no len(), which list()
+    calls first: it would cost a probe, raise without include_totals, or read a streamed
+    query through before list() iterates it, so use count().
+
+    *stream* decodes each page record by record as it arrives rather than all at once.
     """
 
     def __init__(self, cls, **params):
+        self._query = dict(params)  # the unevaluated params for chaining
         self._per_page = params.get('per_page', 0)
         self._page = params.get('page', 0)
+        self._start_page = self._page
         self._len = 0
         self._count = 0
         self._cls = cls
         self._cached = []
+        self._pages = {}  # raw pages fetched out of sequence by page
+        self._random = {}  # records hydrated out of sequence by page then offset
+        self._hydrated = {}  # the current page's records hydrated out of sequence by offset
+        self._response = []
+        self._total = -1
+        self._limit = 0
+        self._params = params
+        self._evaluated = False
+        self._stream = False
+
+    def _evaluate(self):
+        if self._evaluated:
+            return
+        self._evaluated = True
+        params = self._params
+        if self._page in self._pages and (self._total > -1 or not params.get('include_totals')):
+            # a slice already fetched the first page
+            params.pop('include_totals', None)
+            records = self._pages.pop(self._page)
+            self._hydrated = self._random.pop(self._page, {})
+            self._response = iter(records) if self._stream else list(records)
+            self._len = self._per_page if self._stream else len(records)
+            return
+        if self._stream:
+            self._response = self._get_page(params)
+            self._len = self._per_page
+            return
         # get an initial response
-        response = cls._client.get(cls._endpoint, params)
+        response = self._get_page(params)
         # get totals
         try:
             self._total = response[0]['total']
             self._limit = response[0]['limit']
             del params['include_totals']  # we only want to get the totals once
-            self._response = response[0][cls._path]
+            self._response = response[0][self._cls._path]
         except (IndexError, KeyError):  # response not wrapped in include_totals summary
-            self._total = -1
             self._limit = 0
             self._response = response
         self._len = len(self._response)
-        self._params = params
+
+    def _clone(self, **params):
+        query = dict(self._query)
+        query.update(params)
+        clone = self.__class__(self._cls, **query)
+        clone._stream = self._stream
+        return clone
+
+    def filter(self, **kwargs):
+        """
+        Return a new QuerySet with the lucene keyword query ANDed to any existing q.
+        """
+        if self._query.get('search_engine') == 'v1':
+            raise UnimplementedException('v1 search engine does not allow q')
+        q = self._query.get('q')
+        lucene_q = _build_lucene_query(kwargs)
+        if q and lucene_q:
+            if ' OR ' in q:
+                q = u'(%s)' % q
+            lucene_q = u' AND '.join([q, lucene_q])
+        return self._clone(q=lucene_q or q)
+
+    def order_by(self, field):
+        """
+        Return a new QuerySet sorted by field, descending if it is prefixed with '-'.
+        """
+        if field.startswith('-'):
+            sort = '%s:-1' % field[1:]
+        else:
+            sort = '%s:1' % field
+        return self._clone(sort=sort)
+
+    def per_page(self, per_page):
+        """
+        Return a new QuerySet fetching per_page records with each request.
+        """
+        return self._clone(per_page=per_page)
+
+    def stream(self):
+        """
+        Return a new QuerySet that hands over each record as soon as it has been read from
+        the response instead of waiting for the whole page to download and parse. The
+        total of a streamed page is only known once it has been read through, so count()
+        before then probes for it.
+        """
+        clone = self._clone()
+        clone._stream = True
+        return clone
 
     def __getitem__(self, index):
         if isinstance(index, slice):
             stop = index.stop
         elif isinstance(index, int):
-            stop = index
+            stop = index + 1 if index > -1 else None
         else:
             raise TypeError
+        positions = self._positions(index)
+        if positions is not None and not self._in_reach(positions):
+            return self._get_by_page(index, positions)
         if stop is not None and stop > -1:
-            iterations = stop - len(self._cached) + 1
+            # only pull as many records as the index needs so a short slice
+            # never triggers a request for the following page
+            iterations = stop - len(self._cached)
             try:
                 for i in range(iterations):
                     self.__next__()
@@ -51,9 +152,137 @@ class QuerySet(object):
                     break
         return self._cached[index]
 
+    def _available(self):
+        """
+        The number of records from the starting page onwards or -1 if it isn't known.
+        """
+        if self._total < 0 and not self._evaluated and self._params.get('include_totals'):
+            self._total = self._probe_total()
+        if self._total < 0:
+            return -1
+        return max(self._total - self._start_page * self._per_page, 0)
+
+    def _positions(self, index):
+        """
+        Resolve index to the record positions it covers, or None if that can't be done
+        without iterating through every record.
+        """
+        if not self._per_page:
+            return None
+        if isinstance(index, slice):
+            bounded = (
+                (index.start or 0) >= 0 and index.stop is not None and index.stop >= 0 and
+                (index.step or 1) > 0)
+            if bounded:  # no need to know the total
+                return range(index.start or 0, index.stop, index.step or 1)
+            available = self._available()
+            if available < 0:
+                return None
+            return range(*index.indices(available))
+        if index < 0:
+            available = self._available()
+            if available < 0:
+                return None
+            index += available
+            if index < 0:
+                raise IndexError('QuerySet index out of range')
+        return [index]
+
+    def _in_reach(self, positions):
+        """
+        True if iterating to the positions costs no more requests than fetching their pages,
+        which is the case when they fall on or before the next unfetched page.
+        """
+        if not positions:
+            return True
+        stop = max(positions) + 1
+        if not self._evaluated:
+            return stop <= self._per_page
+        return stop <= len(self._cached) + self._len - self._count + self._per_page
+
+    def _get_by_page(self, index, positions):
+        records = []
+        for position in positions:
+            record = self._record_at(position)
+            if record is None:
+                break
+            records.append(record)
+        if isinstance(index, slice):
+            return records
+        if not records:
+            raise IndexError('QuerySet index out of range')
+        return records[0]
+
+    def _record_at(self, position):
+        if position < len(self._cached):
+            return self._cached[position]
+        page, offset = divmod(position, self._per_page)
+        page += self._start_page
+        if self._evaluated and page == self._page:  # the rest of the page being iterated
+            hydrated = self._hydrated
+            records, index = self._unread(), offset - self._count
+        else:
+            hydrated = self._random.setdefault(page, {})
+            records, index = None, offset
+        try:
+            return hydrated[offset]
+        except KeyError:
+            pass
+        try:
+            item = (self._fetch_page(page) if records is None else records)[index]
+        except IndexError:
+            return None
+        instance = self._cls(**item)
+        instance._fetched = True
+        hydrated[offset] = instance
+        return instance
+
+    def _unread(self):
+        """
+        The records of the current page not yet iterated, reading a streamed page through.
+        """
+        if not self._stream:
+            return self._response
+        records = list(self._response)
+        summary = getattr(self._response, 'summary', {})
+        if self._total < 0 and 'total' in summary:
+            self._total = summary['total']
+            self._params.pop('include_totals', None)
+        self._response = iter(records)
+        return records
+
+    def _hydrate(self, item):
+        """
+        The instance for the next record of the current page, hydrated once.
+        """
+        instance = self._hydrated.pop(self._count, None)
+        if instance is None:
+            instance = self._cls(**item)
+            instance._fetched = True
+        return instance
+
+    def _fetch_page(self, page):
+        try:
+            return self._pages[page]
+        except KeyError:
+            pass
+        params = dict(self._params, page=page)
+        params.pop('include_totals', None)
+        self._pages[page] = list(self._get_page(params))
+        return self._pages[page]
+
     def __iter__(self):
         return self
 
+    def __bool__(self):
+        try:
+            self[0]
+        except IndexError:
+            return False
+        return True
+
+    __nonzero__ = __bool__
+
     def __next__(self):
         record = self.next()
         self._cached.append(record)
@@ -62,6 +291,25 @@ class QuerySet(object):
     def count(self):
         if self._total > -1:
             return self._total
+        if (not self._evaluated or self._stream) and self._params.get('include_totals'):
+            # nothing has been fetched yet so don't download a page just to read the total
+            self._total = self._probe_total()
+            if self._total > -1:
+                return self._total
+        self._evaluate()
+        if self._total > -1:
+            return self._total
+        elif self._per_page and self._len == self._per_page:
+            # a full page came back without totals so there may be more records;
+            # ask for a single record with include_totals rather than paging through
+            self._total = self._probe_total()
+            if self._total > -1:
+                return self._total
+        elif self._stream:
+            self[:]  # read through to the end of the stream
+            if self._total > -1:
+                return self._total
+            return len(self._cached)
         # in the simple case if the code hasn't tried to get per_page or include_totals then we'll
         # assume we've received all the records because we can't make any assumptions about
         # how many records the endpoint actually returns by default
@@ -69,20 +317,130 @@ class QuerySet(object):
             return len(self._response)
         raise UnimplementedException("include_totals is not implemented on this endpoint")
 
+    def _get_page(self, params):
+        with operation('%s.query' % self._cls.__name__):
+            if self._stream:
+                return self._timed_stream(params)
+            return self._timed_get(params)
+
+    def _timed_stream(self, params):
+        client = self._cls._client
+        hooks = hooks_for(client)
+        if not hooks:
+            return client.stream(self._cls._endpoint, params, self._cls._path)
+        started = time.time()
+        start = timer()
+        records = client.stream(self._cls._endpoint, params, self._cls._path)
+        return _TimedStream(records, hooks, self._cls._path, params.get('page', 0), started,
+                            start)
+
+    def _timed_get(self, params):
+        client = self._cls._client
+        hooks = hooks_for(client)
+        if not hooks:
+            return client.get(self._cls._endpoint, params)
+        started = time.time()
+        start = timer()
+        response = client.get(self._cls._endpoint, params)
+        try:
+            records = len(response[0][self._cls._path])
+        except (IndexError, KeyError, TypeError):
+            records = len(response)
+        notify(hooks, PageEvent(
+            self._cls._path, params.get('page', 0), records, started, timer() - start))
+        return response
+
+    def _probe_total(self):
+        params = dict(self._params, page=0, per_page=1, include_totals=True)
+        with operation('%s.count' % self._cls.__name__):
+            response = self._cls._client.get(self._cls._endpoint, params)
+        try:
+            return response[0]['total']
+        except (IndexError, KeyError, TypeError):
+            return -1
+
+    def _next_streamed(self):
+        try:
+            item = next(self._response)
+        except StopIteration:
+            summary = getattr(self._response, 'summary', {})
+            if self._total < 0 and 'total' in summary:
+                self._total = summary['total']
+                self._params.pop('include_totals', None)
+            if self._per_page and self._count == self._per_page:
+                self._page += 1
+                self._count = 0
+                self._params['page'] = self._page
+                try:  # a slice may have already fetched this page
+                    self._response = iter(self._pages.pop(self._page))
+                    self._hydrated = self._random.pop(self._page, {})
+                except KeyError:
+                    self._response = self._get_page(self._params)
+                return self._next_streamed()
+            raise
+        if self._per_page and self._count >= self._per_page:
+            raise UnimplementedException("per_page is not implemented on this endpoint")
+        instance = self._hydrate(item)
+        self._count += 1
+        return instance
+
     def next(self):
+        self._evaluate()
+        if self._stream:
+            return self._next_streamed()
         if self._count < self._len:
-            item = self._response.pop(0)
-            instance = self._cls(**item)
-            instance._fetched = True
+            instance = self._hydrate(self._response.pop(0))
             self._count += 1
             return instance
         elif self._per_page and self._count == self._per_page:
             self._page += 1
             self._count = 0
             self._params['page'] = self._page
-            self._response = self._cls._client.get(self._cls._endpoint, self._params)
+            try:  # a slice may have already fetched this page
+                self._response = list(self._pages.pop(self._page))
+                self._hydrated = self._random.pop(self._page, {})
+            except KeyError:
+                self._response = self._get_page(self._params)
             self._len = len(self._response)
             return self.next()
         elif self._per_page and self._count > self._per_page:
             raise UnimplementedException("per_page is not implemented on this endpoint")
         raise StopIteration()
+
+
+class _TimedStream(object):
+    """
+    A streamed page that sends its PageEvent once it has been read through, its latency
+    the time from the request until the last record was decoded.
+    """
+
+    def __init__(self, records, hooks, path, page, started, start):
+        self._records = records
+        self._hooks = hooks
+        self._path = path
+        self._page = page
+        self._started = started
+        self._start = start
+        self._read = 0
+        self._done = False
+
+    @property
+    def summary(self):
+        return getattr(self._records, 'summary', {})
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            record = next(self._records)
+        except StopIteration:
+            if not self._done:
+                self._done = True
+                notify(self._hooks, PageEvent(self._path, self._page, self._read,
+                                              self._started, timer() - self._start))
+            raise
+        self._read += 1
+        return record
+
+    next = __next__
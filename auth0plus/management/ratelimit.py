@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+
+from .instrumentation import timer
+from .rest import _retry_delay
+
+
+class RateLimiter(object):
+    """
+    A token bucket shared by every thread calling one tenant, so a worker serving many
+    tenants spends each tenant's rate limit evenly instead of bursting into 429s.
+
+    Args:
+        rate (float): Requests allowed per second
+
+        burst (int): Optional number of requests allowed at once after a quiet spell,
+            defaults to rate
+
+    RestClient calls *acquire* before each request and *update* with each response, which
+    holds every caller until the limit resets once the api says it has been spent.
+    """
+
+    def __init__(self, rate, burst=None, clock=timer, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = burst or max(int(rate), 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._blocked_until = 0
+
+    def acquire(self):
+        """
+        Wait until a request may be made.
+        """
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def update(self, response):
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            spent = int(headers['X-RateLimit-Remaining']) <= 0
+        except (KeyError, TypeError, ValueError):
+            spent = False
+        if spent or response.status_code == 429:
+            with self._lock:
+                self._blocked_until = max(
+                    self._blocked_until, self._clock() + _retry_delay(response))
+                self._tokens = 0
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..oauth import TokenManager
+from .auth0p import Auth0
+from .ratelimit import RateLimiter
+from .transports import RequestsTransport
+
+
+class TenantRegistry(object):
+    """
+    Auth0 instances for many tenants sharing one bounded connection pool, each with its own
+    endpoint classes, token and rate limiter, so one worker can serve every tenant from
+    any number of threads::
+
+        tenants = TenantRegistry(pool_maxsize=10)
+        tenants.register('acme', 'acme.auth0.com', client_id='...', client_secret='...',
+                         default_connection='db', rate=10)
+        tenants['acme'].users.get(email='bon@acdc.com')
+
+    Args:
+        pool_connections (int): The number of tenant domains to keep connections open to
+
+        pool_maxsize (int): The most connections open to each domain, threads wait for a
+            free connection rather than opening more
+
+        transport: Optional transport to share instead of the pooled requests transport
+
+    Any other keyword arguments such as max_retries, hooks or timeout are used for every
+    tenant unless register is given its own.
+    """
+
+    def __init__(self, pool_connections=50, pool_maxsize=10, transport=None, **defaults):
+        if transport is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=True)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            transport = RequestsTransport(session)
+        self.transport = transport
+        self.defaults = defaults
+        self._tenants = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, domain, token=None, client_id='', client_secret=None,
+                 default_connection='', rate=None, burst=None, **kwargs):
+        """
+        Add a tenant and return its Auth0 instance.
+
+        Args:
+            token (str): A management api token, or None to get and renew tokens with the
+                client_id and client_secret
+
+            rate (float): Optional requests per second to allow this tenant, see
+                auth0plus.management.ratelimit.RateLimiter
+
+            burst (int): Optional requests allowed at once for the rate limiter
+        """
+        tokens = None
+        if token is None:
+            if client_secret is None:
+                raise ValueError('A token or client_secret is required for %s' % name)
+            tokens = TokenManager(domain, client_id, client_secret, transport=self.transport)
+        options = dict(self.defaults)
+        options.update(kwargs)
+        auth0 = Auth0(
+            domain, token, client_id=client_id, default_connection=default_connection,
+            transport=self.transport, tokens=tokens,
+            rate_limiter=RateLimiter(rate, burst) if rate else None, **options)
+        with self._lock:
+            self._tenants[name] = auth0
+        return auth0
+
+    def unregister(self, name):
+        with self._lock:
+            del self._tenants[name]
+
+    def __getitem__(self, name):
+        return self._tenants[name]
+
+    def get(self, name, default=None):
+        return self._tenants.get(name, default)
+
+    def __contains__(self, name):
+        return name in self._tenants
+
+    def __iter__(self):
+        return iter(list(self._tenants))
+
+    def __len__(self):
+        return len(self._tenants)
+
+    def close(self):
+        """
+        Close the shared connections.
+        """
+        self.transport.close()
@@ -1,29 +1,105 @@
+import io
 import json
 import sys
-
-import requests
+import time
 
 from ..exceptions import Auth0Error
 from ..settings import TIMEOUT
+from .instrumentation import RequestEvent, _hooks, notify, timer
+from .streaming import RecordStream
+from .transports import RequestsTransport, TransportResponse
+
+MAX_RETRY_DELAY = 60
+
+try:  # requests and urllib3 decode brotli responses when it is installed
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+
+def domain_url(domain):
+    """
+    Return the https url for an Auth0 domain, or the domain itself if it already has a
+    scheme such as a local emulator's http://127.0.0.1:8000.
+    """
+    if '://' in domain:
+        return domain.rstrip('/')
+    return 'https://%s' % domain
+
+
+def _retry_delay(response):
+    """
+    Seconds to wait before retrying a rate limited response.
+    """
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return min(float(headers['Retry-After']), MAX_RETRY_DELAY)
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        return min(max(float(headers['X-RateLimit-Reset']) - time.time(), 0), MAX_RETRY_DELAY)
+    except (KeyError, TypeError, ValueError):
+        return 1
 
 
 class RestClient(object):
-    def __init__(self, jwt=None, telemetry=True, session=None):
+    """
+    Args:
+        jwt (str): Optional bearer token
+
+        telemetry (bool): Send a User-Agent header
+
+        session: Optional requests.Session instance
+
+        transport: Optional transport to send requests with instead of a requests.Session,
+            see auth0plus.management.transports
+
+        max_retries (int): How many times to retry a request rejected with 429 Too Many
+            Requests, waiting for the rate limit to reset in between
+
+        hooks (list): Optional callables sent a RequestEvent after each request, see
+            auth0plus.management.instrumentation
+
+        tokens: Optional auth0plus.oauth.TokenManager supplying the bearer token for each
+            request instead of jwt
+
+        rate_limiter: Optional auth0plus.management.ratelimit.RateLimiter to wait on before
+            each request
+
+    The client's headers are set on the transport it creates. A transport that is passed in
+    is left alone and the headers are sent with each request instead, so clients for
+    different tenants can share one transport and its connection pool.
+    """
+
+    def __init__(self, jwt=None, telemetry=True, session=None, max_retries=0, hooks=None,
+                 transport=None, tokens=None, rate_limiter=None):
         self.jwt = jwt
-        self.requests = session or requests.Session()
-        base_headers = {
-            'Content-Type': 'application/json'
+        self.max_retries = max_retries
+        self.hooks = list(hooks or [])
+        self.tokens = tokens
+        self.rate_limiter = rate_limiter
+        self.transport = transport or RequestsTransport(session)
+        # the underlying requests.Session when there is one
+        self.requests = getattr(self.transport, 'session', None)
+        self.headers = {
+            'Content-Type': 'application/json',
+            'Accept-Encoding': ACCEPT_ENCODING,
         }
         if self.jwt:
-            base_headers['Authorization'] = 'Bearer %s' % self.jwt
+            self.headers['Authorization'] = 'Bearer %s' % self.jwt
         if telemetry:  # we don't want to pretend to be the official Auth0 client
             py_version = '%i.%i.%i' % (sys.version_info.major,
                                        sys.version_info.minor,
                                        sys.version_info.micro)
 
-            base_headers['User-Agent'] = 'Python/%s' % py_version
+            self.headers['User-Agent'] = 'Python/%s' % py_version
 
-        self.requests.headers.update(base_headers)
+        if transport is None:
+            self.transport.headers.update(self.headers)
+            self._request_headers = {}
+        else:
+            self._request_headers = self.headers
 
     def get(self, url, params={}, timeout=TIMEOUT):
         """
@@ -33,14 +109,9 @@ class RestClient(object):
         :return: list of dict responses
         :rtype: list
         """
-        for kw, value in list(params.items()):
-            if type(value) == bool:
-                params[kw] = json.dumps(value)
-            elif value is None:
-                del params[kw]
-
-        response = self.requests.get(
-            url, params=params, headers={'Content-Type': None}, timeout=timeout)
+        self._encode_params(params)
+        response = self._request(
+            'get', url, params=params, headers={'Content-Type': None}, timeout=timeout)
         text = self._process_response(response)
         if not text:
             text = []
@@ -48,23 +119,118 @@ class RestClient(object):
             text = [text]
         return text
 
+    def stream(self, url, params={}, path=None, timeout=TIMEOUT):
+        """
+        :param str url: The url of a list endpoint
+        :param dict params:
+        :param str path: The key of the records in an include_totals response, e.g. users
+
+        :return: the records, decoded one at a time as the response arrives
+        :rtype: RecordStream
+        """
+        self._encode_params(params)
+        response = self._request(
+            'get', url, stream=True, params=params, headers={'Content-Type': None},
+            timeout=timeout)
+        if response.status_code >= 400:
+            response = TransportResponse(
+                response.status_code, response.headers, response.raw.read())
+            self._process_response(response)
+            return RecordStream(io.BytesIO(response.content), path)
+        return RecordStream(response.raw, path, response=response)
+
     def post(self, url, data={}, timeout=TIMEOUT):
-        response = self.requests.post(url, data=json.dumps(data), timeout=timeout)
+        response = self._request('post', url, data=json.dumps(data), timeout=timeout)
         return self._process_response(response)
 
     def file_post(self, url, data={}, files={}, timeout=TIMEOUT):
-        response = self.requests.post(
-            url, data=data, files=files, headers={'Content-Type': None}, timeout=timeout)
+        response = self._request(
+            'post', url, data=data, files=files, headers={'Content-Type': None}, timeout=timeout)
         return self._process_response(response)
 
     def patch(self, url, data={}, timeout=TIMEOUT):
-        response = self.requests.patch(url, data=json.dumps(data), timeout=timeout)
+        response = self._request('patch', url, data=json.dumps(data), timeout=timeout)
         return self._process_response(response)
 
     def delete(self, url, timeout=TIMEOUT):
-        response = self.requests.delete(url, headers={'Content-Type': None}, timeout=timeout)
+        response = self._request(
+            'delete', url, headers={'Content-Type': None}, timeout=timeout)
         return self._process_response(response)
 
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def _encode_params(self, params):
+        for kw, value in list(params.items()):
+            if type(value) == bool:
+                params[kw] = json.dumps(value)
+            elif value is None:
+                del params[kw]
+
+    def _send(self, method, url, stream=False, **kwargs):
+        """
+        Return the response and the number of times it was retried after a 429.
+        """
+        send = self.transport.stream if stream else self.transport.request
+        if self._request_headers or self.tokens is not None:
+            headers = dict(self._request_headers)
+            headers.update(kwargs.get('headers') or {})
+            kwargs['headers'] = headers
+        retries = 0
+        refreshed = self.tokens is None
+        while True:
+            if self.tokens is not None:
+                headers['Authorization'] = 'Bearer %s' % self.tokens.token
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            response = send(method, url, **kwargs)
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(response)
+            if response.status_code == 401 and not refreshed:
+                # the token may have been revoked or rotated before it expired
+                if stream and hasattr(response, 'close'):
+                    response.close()
+                self.tokens.invalidate()
+                refreshed = True
+                continue
+            if response.status_code != 429 or retries >= self.max_retries:
+                return response, retries
+            if stream and hasattr(response, 'close'):
+                response.close()
+            time.sleep(_retry_delay(response))
+            retries += 1
+
+    def _request(self, method, url, stream=False, **kwargs):
+        if not self.hooks and not _hooks:
+            return self._send(method, url, stream, **kwargs)[0]
+        hooks = self.hooks + _hooks
+        started = time.time()
+        start = timer()
+        try:
+            response, retries = self._send(method, url, stream, **kwargs)
+        except Exception as err:
+            notify(hooks, RequestEvent(
+                method.upper(), url, None, None, started, timer() - start, error=err))
+            raise
+        latency = timer() - start
+        headers = getattr(response, 'headers', None) or {}
+        try:
+            remaining = int(headers['X-RateLimit-Remaining'])
+        except (KeyError, TypeError, ValueError):
+            remaining = None
+        try:
+            # a streamed body hasn't been read yet
+            size = None if stream else len(response.content)
+        except (AttributeError, TypeError):
+            size = None
+        notify(hooks, RequestEvent(
+            method.upper(), url, response.status_code, size, started, latency,
+            retries=retries, rate_limit_remaining=remaining))
+        return response
+
     def _process_response(self, response):
         text = json.loads(response.text) if response.text else {}
         if isinstance(text, dict):  # otherwise it's a list response which is not an error
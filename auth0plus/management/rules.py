@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+from ..exceptions import ObjectDoesNotExist
+from ..settings import AUTH0_PER_PAGE
+from .base_endpoints import CRUDEndPoint
+from .instrumentation import traced
+from .queryset import QuerySet
+
+
+class Rule(CRUDEndPoint):
+
+    _path = 'rules'
+    _updatable = [
+        'name',
+        'script',
+        'order',
+        'enabled',
+    ]
+
+    class DoesNotExist(ObjectDoesNotExist):
+        pass
+
+    @classmethod
+    def all(cls, per_page=AUTH0_PER_PAGE, enabled=None, stage=None, include_totals=True,
+            fields=[], include_fields=True):
+        params = {
+            'per_page': per_page,
+            'include_totals': include_totals,
+            'enabled': enabled,
+            'stage': stage,
+            'fields': ','.join(fields) or None,
+            'include_fields': include_fields,
+        }
+        return QuerySet(cls, **params)
+
+    @classmethod
+    @traced
+    def get(cls, id):
+        """
+        Return the rule with the id.
+        """
+        try:
+            data = cls._client.get(cls.get_url(id), timeout=cls._timeout)[0]
+        except IndexError:
+            raise cls.DoesNotExist('Rule Does Not Exist')
+        rule = cls(**data)
+        rule._fetched = True
+        return rule
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Every object of an endpoint such as auth0.clients or auth0.rules, fetched in one paged
+listing and compared locally, so checking a tenant's configuration for drift costs one pass
+instead of a GET per object::
+
+    snapshot = Snapshot(auth0.rules, path='rules.snapshot.json', max_age=600)
+    snapshot.refresh()  # only lists the rules if the snapshot is older than max_age
+    diff = snapshot.diff([{'name': 'add-roles', 'script': script, 'enabled': True}])
+    for name, changes in diff.changed:
+        ...
+
+Records are stored by the sha256 of their content and the snapshot's version is a hash of
+every record's, so two snapshots with the same version hold the same objects. Given a path
+the snapshot is kept in that file between runs. Clients are known by client_id rather than
+name as their names needn't be unique.
+"""
+from collections import namedtuple
+import hashlib
+import json
+import threading
+import time
+
+from .base_endpoints import _restore
+from .files import write_atomic
+
+
+def content_hash(record):
+    """
+    The sha256 of a record's canonical json.
+    """
+    text = json.dumps(record, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _without(record, fields):
+    """
+    A copy of the record without the fields, a.b for the field b of a.
+    """
+    record = dict(record)
+    for field in fields:
+        name, _, rest = field.partition('.')
+        if rest and isinstance(record.get(name), dict):
+            record[name] = _without(record[name], [rest])
+        elif not rest:
+            record.pop(name, None)
+    return record
+
+
+class Diff(namedtuple('Diff', ['added', 'changed', 'removed', 'unchanged'])):
+    """
+    added: the desired records missing from the snapshot
+
+    changed: (key, {field: (current, desired)}) for each record that differs
+
+    removed: the keys of records in the snapshot but not the desired state
+
+    unchanged: the keys of records that match
+    """
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    __nonzero__ = __bool__
+
+
+class Snapshot(object):
+    """
+    Args:
+        endpoint: The endpoint to list, e.g. auth0.clients
+
+        key (str): The field objects are known by in diffs and lookups, the endpoint's
+            _snapshot_key or name by default. refresh raises ValueError if two objects
+            share a key.
+
+        max_age (int): Seconds refresh keeps a snapshot before listing the objects again
+
+        path (str): Optional file the snapshot is loaded from and saved to
+
+        ignore: Fields left out of the snapshot, a.b for the field b of a, by default the
+            endpoint's _secrets, e.g. a client's client_secret and signing_keys, so they
+            are never written to the file. Pass () to keep them.
+    """
+
+    def __init__(self, endpoint, key=None, max_age=300, path=None, ignore=None,
+                 clock=time.time):
+        self.endpoint = endpoint
+        self.key = key or getattr(endpoint, '_snapshot_key', 'name')
+        self.max_age = max_age
+        self.path = path
+        if ignore is None:
+            ignore = getattr(endpoint, '_secrets', ())
+        self.ignore = frozenset(ignore)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._records = {}  # by content hash
+        self._keys = {}  # key to content hash
+        self.version = None
+        self.fetched = None
+        if path:
+            self._load()
+
+    @property
+    def age(self):
+        if self.fetched is None:
+            return None
+        return self._clock() - self.fetched
+
+    def refresh(self, max_age=None):
+        """
+        List the objects again if the snapshot is older than max_age, the snapshot's own by
+        default, or 0 to always. Return True if their content changed.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._lock:
+            if self.fetched is not None and self._clock() - self.fetched < max_age:
+                return False
+            records, keys = {}, {}
+            for instance in self.endpoint.all(per_page=100, include_totals=True):
+                record = _without(instance.as_dict(), self.ignore)
+                digest = content_hash(record)
+                key = record.get(self.key)
+                if key in keys:
+                    raise ValueError('More than one %s has the %s %r' % (
+                        self.endpoint.__name__, self.key, key))
+                records[digest] = record
+                keys[key] = digest
+            version = content_hash(sorted(records))
+            changed = version != self.version
+            self._records, self._keys = records, keys
+            self.version = version
+            self.fetched = self._clock()
+            if self.path:
+                self._save()
+            return changed
+
+    def invalidate(self):
+        """
+        List the objects again on the next refresh.
+        """
+        self.fetched = None
+
+    def get(self, key, default=None):
+        """
+        Return a copy of the record for key, or default.
+        """
+        digest = self._keys.get(key)
+        if digest is None:
+            return default
+        return dict(self._records[digest])
+
+    def __getitem__(self, key):
+        """
+        Return the object for key as a fetched instance of the endpoint, saving only the
+        fields changed since.
+        """
+        record = self.get(key)
+        if record is None:
+            raise KeyError(key)
+        return _restore(self.endpoint, record, True, [])
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(sorted(self._keys, key=str))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def hash(self, key):
+        """
+        Return the content hash of the record for key or None.
+        """
+        return self._keys.get(key)
+
+    def diff(self, desired, partial=False):
+        """
+        Return a Diff of the snapshot against the desired records, a list of dicts with the
+        key field or a dict of them by key. Only the fields a desired record has are
+        compared. With partial the desired records are a subset, so none are removed.
+        """
+        if isinstance(desired, dict):
+            desired = [dict(record, **{self.key: key}) for key, record in desired.items()]
+        added, changed, unchanged, seen = [], [], [], set()
+        for record in desired:
+            key = record[self.key]
+            seen.add(key)
+            current = self.get(key)
+            if current is None:
+                added.append(record)
+                continue
+            changes = dict((field, (current.get(field), value))
+                           for field, value in record.items() if current.get(field) != value)
+            if changes:
+                changed.append((key, changes))
+            else:
+                unchanged.append(key)
+        removed = [] if partial else [key for key in self if key not in seen]
+        return Diff(added, changed, removed, unchanged)
+
+    def _load(self):
+        try:
+            with open(self.path) as fp:
+                state = json.load(fp)
+        except (IOError, OSError, ValueError):
+            return
+        if state.get('key') != self.key:  # saved for another key, list again
+            return
+        self._records = state['records']
+        self._keys = dict((key, digest) for key, digest in state['keys'])
+        self.version = state['version']
+        self.fetched = state['fetched']
+
+    def _save(self):
+        state = {
+            'key': self.key,
+            'version': self.version,
+            'fetched': self.fetched,
+            'records': self._records,
+            'keys': sorted(self._keys.items(), key=lambda item: str(item[0])),
+        }
+        write_atomic(self.path, json.dumps(state))
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+The Stat endpoint and DailyStats, a local history of the daily stats for dashboards::
+
+    history = DailyStats(auth0.stats)
+    logins = history.series('logins', date.today() - timedelta(days=90))
+    logins.weekly().values, logins.moving_average(7).values
+
+DailyStats keeps every day it has fetched and only asks Auth0 for the ranges of days it
+doesn't have. Days within *settle* days of today are still being counted by Auth0 so they
+are fetched again each time. Series are backed by the stdlib array, to_numpy() hands one to
+numpy if it is installed.
+"""
+from array import array
+from datetime import date, datetime, timedelta, tzinfo
+import threading
+import time
+
+from .base_endpoints import BaseEndPoint
+from .instrumentation import traced
+
+FIELDS = ('logins', 'signups', 'leaked_passwords')
+
+
+class _UTC(tzinfo):
+    """
+    datetime.timezone.utc for python 2.
+    """
+
+    def utcoffset(self, dt):
+        return timedelta(0)
+
+    def tzname(self, dt):
+        return 'UTC'
+
+    def dst(self, dt):
+        return timedelta(0)
+
+
+try:
+    from datetime import timezone
+    UTC = timezone.utc
+except ImportError:  # python 2
+    UTC = _UTC()
+
+
+def _day(value):
+    """
+    The YYYYMMDD Auth0 expects for a date, datetime or string.
+    """
+    if value is None or not isinstance(value, (date, datetime)):
+        return value
+    return value.strftime('%Y%m%d')
+
+
+def _date(value):
+    """
+    The date of an Auth0 date string, e.g. 2017-06-01T00:00:00.000Z
+    """
+    return datetime.strptime(value[:10], '%Y-%m-%d').date()
+
+
+class Stat(BaseEndPoint):
+
+    _path = 'stats'
+
+    def get_id(self):
+        return getattr(self, 'date', None)
+
+    @classmethod
+    @traced
+    def active_users(cls):
+        """
+        Return the number of users that have logged in during the last 30 days.
+        """
+        response = cls._client.get('/'.join([cls._endpoint, 'active-users']),
+                                   timeout=cls._timeout)
+        return response[0] if response else 0
+
+    @classmethod
+    @traced
+    def daily(cls, start=None, end=None):
+        """
+        Return a Stat for each day from start to end inclusive, dates or YYYYMMDD strings,
+        with logins, signups and leaked_passwords.
+        """
+        params = {'from': _day(start), 'to': _day(end)}
+        records = cls._client.get('/'.join([cls._endpoint, 'daily']), params=params,
+                                  timeout=cls._timeout)
+        stats = []
+        for record in records:
+            stat = cls(**record)
+            stat._fetched = True
+            stats.append(stat)
+        return stats
+
+
+class Series(object):
+    """
+    Values by date, oldest first, in an array of doubles.
+    """
+
+    def __init__(self, dates, values):
+        self.dates = list(dates)
+        self.values = array('d', values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(zip(self.dates, self.values))
+
+    def __repr__(self):
+        if not self.dates:
+            return '<Series>'
+        return '<Series %s to %s>' % (self.dates[0], self.dates[-1])
+
+    def total(self):
+        return sum(self.values)
+
+    def mean(self):
+        return self.total() / len(self.values) if self.values else 0.0
+
+    def _rollup(self, period):
+        dates, values = [], array('d')
+        for day, value in self:
+            start = period(day)
+            if dates and dates[-1] == start:
+                values[-1] += value
+            else:
+                dates.append(start)
+                values.append(value)
+        return Series(dates, values)
+
+    def weekly(self):
+        """
+        Return the totals of each week by the monday it starts on.
+        """
+        return self._rollup(lambda day: day - timedelta(days=day.weekday()))
+
+    def monthly(self):
+        """
+        Return the totals of each month by its first day.
+        """
+        return self._rollup(lambda day: day.replace(day=1))
+
+    def moving_average(self, window):
+        """
+        Return the mean of each window days up to and including each day, from the first
+        day with a full window.
+        """
+        if window < 1:
+            raise ValueError('window must be at least 1 day, not %r' % (window,))
+        values = array('d')
+        running = 0.0
+        for index, value in enumerate(self.values):
+            running += value
+            if index >= window:
+                running -= self.values[index - window]
+            if index >= window - 1:
+                values.append(running / window)
+        return Series(self.dates[window - 1:], values)
+
+    def to_numpy(self):
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError('Series.to_numpy requires the numpy package')
+        return numpy.frombuffer(self.values, dtype=numpy.float64).copy()
+
+
+class DailyStats(object):
+    """
+    Args:
+        stats: The Stat endpoint, e.g. auth0.stats
+
+        settle (int): Days before today that are fetched again each time as Auth0 may
+            still be counting them
+
+        clock: callable returning the current time in seconds, time.time by default
+    """
+
+    def __init__(self, stats, settle=1, clock=time.time):
+        self.stats = stats
+        self.settle = settle
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._days = {}  # date to the values of FIELDS
+
+    def today(self):
+        return datetime.fromtimestamp(self._clock(), UTC).date()
+
+    def _missing(self, start, end):
+        """
+        The (start, end) ranges of days from start to end that need fetching.
+        """
+        settled = self.today() - timedelta(days=self.settle)
+        ranges = []
+        day = start
+        while day <= end:
+            if day not in self._days or day >= settled:
+                if ranges and ranges[-1][1] == day - timedelta(days=1):
+                    ranges[-1] = (ranges[-1][0], day)
+                else:
+                    ranges.append((day, day))
+            day += timedelta(days=1)
+        return ranges
+
+    def fetch(self, start, end=None):
+        """
+        Fetch the days from start to end, today by default, that haven't been fetched.
+        """
+        end = end or self.today()
+        with self._lock:
+            for first, last in self._missing(start, end):
+                fetched = dict((_date(stat.date), tuple(getattr(stat, field, 0) or 0
+                                                        for field in FIELDS))
+                               for stat in self.stats.daily(first, last))
+                day = first
+                while day <= last:  # days Auth0 has nothing for had no activity
+                    self._days[day] = fetched.get(day, (0,) * len(FIELDS))
+                    day += timedelta(days=1)
+
+    def series(self, field, start, end=None):
+        """
+        Return a Series of field, one of FIELDS, for every day from start to end.
+        """
+        end = end or self.today()
+        self.fetch(start, end)
+        index = FIELDS.index(field)
+        dates = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+        return Series(dates, (self._days[day][index] for day in dates))
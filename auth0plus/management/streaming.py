@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Decode list responses record by record as the body arrives instead of reading the whole
+body and then parsing it.
+
+RecordStream parses with ijson when it is installed and otherwise with a small incremental
+reader over the standard json decoder, which decodes each record as soon as its text has
+arrived.
+"""
+import codecs
+import json
+import re
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+CHUNK_SIZE = 64 * 1024
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+class RecordStream(object):
+    """
+    Iterate over the records of a list response, either a bare list or an include_totals
+    summary with the records under *path*. The other top level fields such as total are
+    collected in *summary* as they are read, so a total sent after the records is only
+    there once they have all been consumed.
+    """
+
+    def __init__(self, fp, path=None, chunk_size=CHUNK_SIZE, response=None):
+        self.path = path
+        self.summary = {}
+        self.response = response
+        if ijson is not None:
+            self._records = _ijson_records(fp, path, self.summary)
+        else:
+            self._records = _json_records(_Buffer(fp, chunk_size), path, self.summary)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._records)
+        except StopIteration:
+            self.close()
+            raise
+
+    next = __next__
+
+    def close(self):
+        if self.response is not None and hasattr(self.response, 'close'):
+            self.response.close()
+        self.response = None
+
+
+def _ijson_records(fp, path, summary):
+    item = None
+    builder = None
+    for prefix, event, value in ijson.parse(fp, use_float=True):
+        if item is None:  # the first event tells a bare list from a summary
+            item = 'item' if event == 'start_array' else '%s.item' % path
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == item and event in ('end_map', 'end_array'):
+                yield builder.value
+                builder = None
+        elif prefix == item:
+            if event in ('start_map', 'start_array'):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+            else:
+                yield value
+        elif prefix and '.' not in prefix and event in (
+                'null', 'boolean', 'integer', 'double', 'number', 'string'):
+            summary[prefix] = value
+
+
+def _json_records(buf, path, summary):
+    if buf.skip() == '[':
+        for record in _json_array(buf):
+            yield record
+        return
+    buf.expect('{')
+    if buf.skip() == '}':
+        return
+    while True:
+        key = buf.value()
+        buf.expect(':')
+        if key == path and buf.skip() == '[':
+            for record in _json_array(buf):
+                yield record
+        else:
+            summary[key] = buf.value()
+        if buf.expect(',}') == '}':
+            return
+
+
+def _json_array(buf):
+    buf.expect('[')
+    if buf.skip() == ']':
+        buf.pos += 1
+        return
+    while True:
+        yield buf.value()
+        if buf.expect(',]') == ']':
+            return
+
+
+class _Buffer(object):
+    """
+    The unparsed text of a response read a chunk at a time.
+    """
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.text = u''
+        self.pos = 0
+        self.eof = False
+        self._decode = codecs.getincrementaldecoder('utf-8')().decode
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        self.eof = not chunk
+        self.text = self.text[self.pos:] + self._decode(chunk or b'', self.eof)
+        self.pos = 0
+        return True
+
+    def skip(self):
+        """
+        Move past whitespace and return the next character, or '' at the end of the body.
+        """
+        while True:
+            self.pos = _whitespace.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.skip()
+        if not char or char not in chars:
+            raise ValueError('Expected %r at %r' % (chars, self.text[self.pos:self.pos + 20]))
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.skip()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except ValueError:
+                # the value hasn't fully arrived yet
+                if not self.fill():
+                    raise
+                continue
+            if end == len(self.text) and self.fill():
+                continue  # a number may carry on in the next chunk
+            self.pos = end
+            return value
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from .base_endpoints import BaseEndPoint
+from .batch import run_batch
+from .instrumentation import traced
+
+
+class Ticket(BaseEndPoint):
+    """
+    A link to send a user to verify their email or change their password, the url is
+    the ticket attribute::
+
+        auth0.tickets.email_verification('auth0|123').ticket
+
+    Tickets for many users are made concurrently, each yielded as it's issued::
+
+        for result in auth0.tickets.email_verifications(user_ids, result_url=url):
+            send(result.item, result.value.ticket)
+    """
+
+    _path = 'tickets'
+
+    def get_id(self):
+        return getattr(self, 'ticket', None)
+
+    @classmethod
+    def _issue(cls, kind, data):
+        data = dict((key, value) for key, value in data.items() if value is not None)
+        response = cls._client.post('/'.join([cls._endpoint, kind]), data,
+                                    timeout=cls._timeout)
+        ticket = cls(**response)
+        ticket._fetched = True
+        return ticket
+
+    @classmethod
+    @traced
+    def email_verification(cls, user_id, result_url=None, ttl_sec=None, **kwargs):
+        return cls._issue('email-verification', dict(
+            kwargs, user_id=user_id, result_url=result_url, ttl_sec=ttl_sec))
+
+    @classmethod
+    @traced
+    def password_change(cls, user_id=None, email=None, connection_id=None, result_url=None,
+                        ttl_sec=None, **kwargs):
+        """
+        Return a ticket for the user_id, or the email of a user of the connection_id.
+        """
+        return cls._issue('password-change', dict(
+            kwargs, user_id=user_id, email=email, connection_id=connection_id,
+            result_url=result_url, ttl_sec=ttl_sec))
+
+    @classmethod
+    def email_verifications(cls, user_ids, workers=8, rate_limiter=None, on_progress=None,
+                            max_retries=5, backoff=1.0, **kwargs):
+        """
+        Yield a auth0plus.management.batch.Result for each user_id as its ticket is issued,
+        see run_batch for the other arguments.
+        """
+        return run_batch(lambda user_id: cls.email_verification(user_id, **kwargs),
+                         user_ids, workers=workers, rate_limiter=rate_limiter,
+                         on_progress=on_progress, max_retries=max_retries, backoff=backoff)
+
+    @classmethod
+    def password_changes(cls, user_ids, workers=8, rate_limiter=None, on_progress=None,
+                         max_retries=5, backoff=1.0, **kwargs):
+        """
+        Yield a auth0plus.management.batch.Result for each user_id as its ticket is issued,
+        see run_batch for the other arguments.
+        """
+        return run_batch(lambda user_id: cls.password_change(user_id, **kwargs),
+                         user_ids, workers=workers, rate_limiter=rate_limiter,
+                         on_progress=on_progress, max_retries=max_retries, backoff=backoff)
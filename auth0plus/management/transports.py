@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+Transports send RestClient's requests over http.
+
+A transport has a *headers* dict sent with every request and a *request* method::
+
+    transport.request(method, url, params=None, data=None, files=None, headers=None,
+                      timeout=None)
+
+which returns a response with status_code, headers, text and content attributes. Per request
+headers override the transport headers and a value of None removes the header, as with
+requests. *stream* takes the same arguments and returns a response with a file-like *raw*
+attribute that reads the decompressed body as it arrives; transports that can't stream
+fall back to reading the whole body. RequestsTransport is the default; urllib3 and httpx
+transports avoid the requests overhead, Http2Transport multiplexes concurrent calls over one
+connection and InMemoryTransport answers from a function for tests.
+"""
+import io
+import threading
+
+from six.moves.urllib.parse import urlencode
+
+import requests
+
+from ..settings import TIMEOUT
+
+
+class Transport(object):
+
+    def __init__(self, headers=None):
+        self.headers = dict(headers or {})
+
+    def request(self, method, url, params=None, data=None, files=None, headers=None,
+                timeout=TIMEOUT):
+        raise NotImplementedError
+
+    def stream(self, method, url, **kwargs):
+        response = self.request(method, url, **kwargs)
+        response.raw = io.BytesIO(response.content)
+        return response
+
+    def close(self):
+        pass
+
+    def _merge_headers(self, headers):
+        merged = dict(self.headers)
+        merged.update(headers or {})
+        return dict((key, value) for key, value in merged.items() if value is not None)
+
+
+class TransportResponse(object):
+    """
+    A minimal response for transports whose client doesn't provide a compatible one.
+    """
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content or b''
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+
+class RequestsTransport(Transport):
+    """
+    Send requests through a requests.Session, whose headers are the transport headers.
+    """
+
+    def __init__(self, session=None):
+        self.session = session or requests.Session()
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def request(self, method, url, **kwargs):
+        kwargs = dict((key, value) for key, value in kwargs.items() if value is not None)
+        return getattr(self.session, method.lower())(url, **kwargs)
+
+    def stream(self, method, url, **kwargs):
+        response = self.request(method, url, stream=True, **kwargs)
+        response.raw.decode_content = True
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    Send requests straight through a urllib3.PoolManager, skipping the requests layer.
+    """
+
+    def __init__(self, pool=None, headers=None, **pool_kwargs):
+        super(Urllib3Transport, self).__init__(headers)
+        import urllib3
+        self._urllib3 = urllib3
+        self.pool = pool or urllib3.PoolManager(**pool_kwargs)
+
+    def request(self, method, url, params=None, data=None, files=None, headers=None,
+                timeout=TIMEOUT, stream=False):
+        headers = self._merge_headers(headers)
+        if params:
+            url = '%s?%s' % (url, urlencode(params))
+        body = data
+        if files:
+            fields = dict(data or {})
+            for name, upload in files.items():
+                if isinstance(upload, tuple):
+                    upload = (upload[0], _read(upload[1])) + tuple(upload[2:])
+                else:
+                    upload = (getattr(upload, 'name', name), _read(upload))
+                fields[name] = upload
+            body, headers['Content-Type'] = self._urllib3.encode_multipart_formdata(fields)
+        response = self.pool.request(
+            method.upper(), url, body=body, headers=headers, retries=False, redirect=False,
+            timeout=self._urllib3.Timeout(total=timeout) if timeout else None,
+            preload_content=not stream)
+        if stream:
+            wrapped = TransportResponse(response.status, _headers(response), None)
+            wrapped.raw = response
+            wrapped.close = response.release_conn
+            return wrapped
+        return TransportResponse(response.status, _headers(response), response.data)
+
+    def stream(self, method, url, **kwargs):
+        return self.request(method, url, stream=True, **kwargs)
+
+    def close(self):
+        self.pool.clear()
+
+
+class HttpxTransport(Transport):
+    """
+    Send requests through an httpx.Client, which can negotiate HTTP/2 with http2=True
+    (requires the h2 package).
+    """
+
+    def __init__(self, client=None, headers=None, http2=False, **client_kwargs):
+        super(HttpxTransport, self).__init__(headers)
+        import httpx
+        self.client = client or httpx.Client(http2=http2, **client_kwargs)
+
+    def request(self, method, url, params=None, data=None, files=None, headers=None,
+                timeout=TIMEOUT):
+        kwargs = {'params': params, 'headers': self._merge_headers(headers),
+                  'timeout': timeout}
+        if files:
+            kwargs['data'] = data
+            kwargs['files'] = files
+        elif data is not None:
+            kwargs['content'] = data
+        return self.client.request(method.upper(), url, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+class Http2Transport(HttpxTransport):
+    """
+    Multiplex concurrent requests over one HTTP/2 connection per domain instead of a pooled
+    connection per in-flight request.
+
+    Args:
+        max_streams (int): The most requests in flight at once, callers beyond that wait
+            for a stream to finish. Servers also advertise their own limit which httpx
+            respects.
+
+        prior_knowledge (bool): Speak HTTP/2 without negotiating it, for cleartext http://
+            servers such as auth0plus.testing.EmulatorH2Server.
+
+    Requires the httpx and h2 packages.
+    """
+
+    def __init__(self, max_streams=100, prior_knowledge=False, headers=None, **client_kwargs):
+        import httpx
+        client_kwargs.setdefault('limits', httpx.Limits(max_keepalive_connections=None))
+        client = httpx.Client(http1=not prior_knowledge, http2=True, **client_kwargs)
+        super(Http2Transport, self).__init__(client, headers)
+        self.max_streams = max_streams
+        self._streams = threading.BoundedSemaphore(max_streams)
+
+    def request(self, *args, **kwargs):
+        with self._streams:
+            return super(Http2Transport, self).request(*args, **kwargs)
+
+
+class InMemoryTransport(Transport):
+    """
+    Answer requests from handler(method, url, params=, data=, files=, headers=), which
+    returns a response, e.g. Auth0Emulator.handle.
+    """
+
+    def __init__(self, handler, headers=None):
+        super(InMemoryTransport, self).__init__(headers)
+        self.handler = handler
+
+    def request(self, method, url, params=None, data=None, files=None, headers=None,
+                timeout=TIMEOUT):
+        return self.handler(method.upper(), url, params=params, data=data, files=files,
+                            headers=self._merge_headers(headers))
+
+
+def _headers(response):
+    """
+    The response headers looked up in any case, as Auth0 sends x-ratelimit-remaining.
+    """
+    return requests.structures.CaseInsensitiveDict(response.headers)
+
+
+def _read(upload):
+    return upload.read() if hasattr(upload, 'read') else upload
@@ -6,7 +6,8 @@ from ..exceptions import (
     ObjectDoesNotExist)
 
 from ..settings import AUTH0_PER_PAGE
-from .base_endpoints import CRUDEndPoint, QueryableMixin
+from .base_endpoints import CRUDEndPoint, QueryableMixin, _invalidate
+from .instrumentation import traced
 from .queryset import QuerySet
 
 
@@ -14,6 +15,7 @@ class User(QueryableMixin, CRUDEndPoint):
 
     _default_connection = ''  # set by Auth0
     _default_client_id = ''
+    _connections = None  # a ConnectionIndex set by Auth0
     _path = 'users'
     _updatable = [
         'blocked',
@@ -37,9 +39,13 @@ class User(QueryableMixin, CRUDEndPoint):
             self.password = kwargs.pop('password')
         except KeyError:
             pass
-        self._connection = kwargs.pop('connection', self._default_connection)
+        self._connection = kwargs.pop('connection', None)
         self._client_id = kwargs.pop('client_id', self._default_client_id)
         super(User, self).__init__(**kwargs)
+        if self._connection is None:
+            # a fetched user belongs to the connection of its primary identity
+            identities = getattr(self, 'identities', None) or [{}]
+            self._connection = identities[0].get('connection') or self._default_connection
 
     @classmethod
     def all(cls, per_page=AUTH0_PER_PAGE, sort=None, connection='', include_totals=True,
@@ -56,33 +62,45 @@ class User(QueryableMixin, CRUDEndPoint):
         return QuerySet(cls, **params)
 
     @classmethod
+    @traced
     def create(cls, **kwargs):
         instance = cls(**kwargs)
         instance.save()
         return instance
 
     @classmethod
+    @traced
     def get(cls, id=None, **kwargs):
         if id:
-            try:
-                data = cls._client.get(cls.get_url(id), params=kwargs, timeout=cls._timeout)[0]
-                user = cls(**data)
-                user._fetched = True
-                return user
-            except IndexError:
-                raise User.DoesNotExist("User Does Not Exist")
+            # only whole records are cached
+            cache = None if kwargs else cls._cache
+            data = cache.get(cls.get_url(id)) if cache is not None else None
+            if data is None:
+                try:
+                    data = cls._client.get(
+                        cls.get_url(id), params=kwargs, timeout=cls._timeout)[0]
+                except IndexError:
+                    raise User.DoesNotExist("User Does Not Exist")
+                if cache is not None:
+                    cache.set(cls.get_url(id), data)
+            user = cls(**data)
+            user._fetched = True
+            return user
         else:
-            kwargs['per_page'] = 1
-            kwargs['include_totals'] = True
-            qs = cls.query(**kwargs)
-            if qs.count() > 1:
+            # two records are enough to tell a single match from many
+            # without asking the endpoint to total the whole search
+            kwargs['per_page'] = 2
+            kwargs['include_totals'] = False
+            users = cls.query(**kwargs)[:2]
+            if len(users) > 1:
                 raise MultipleObjectsReturned("User.get returned multiple users")  # replace
             try:
-                return qs[0]
+                return users[0]
             except IndexError:
                 raise User.DoesNotExist("User Does Not Exist")
 
     @classmethod
+    @traced
     def get_or_create(cls, defaults=None, **kwargs):
         defaults = defaults or {}
         if kwargs:
@@ -139,37 +157,78 @@ class User(QueryableMixin, CRUDEndPoint):
     def get_id(self):
         return getattr(self, 'user_id', None)
 
+    def _init_kwargs(self):
+        kwargs = super(User, self)._init_kwargs()
+        kwargs['connection'] = self._connection
+        if self._client_id != self._default_client_id:
+            kwargs['client_id'] = self._client_id
+        return kwargs
+
+    def get_connection(self):
+        """
+        Return the user's Connection, with its id, name and strategy, from the connection
+        index without asking Auth0 while the index is fresh, or None if it isn't known,
+        can't be looked up or Auth0 wasn't made with resolve_connections.
+        """
+        if self._connections is None or not self._connection:
+            return None
+        try:
+            return self._connections.get(self._connection)
+        except Exception:  # e.g. a token without read:connections, save as if unknown
+            return None
+
+    def _patch(self, data):
+        """
+        Send changed attributes to the endpoint, split into as many requests as Auth0
+        needs to accept them
+        """
+        attrs = data.keys()
+        credentials = set(['email', 'email_verified', 'phone_number', 'phone_verified',
+                           'username', 'password'])
+        connection = self.get_connection() if credentials.intersection(attrs) else None
+        if connection is not None and not connection.is_database:
+            # the identity provider holds the credentials so there's no connection to send
+            if 'password' in attrs or 'username' in attrs:
+                raise UnimplementedException(
+                    'Users of %s connections have no password or username to change' %
+                    connection.strategy)
+            self._client.patch(self.get_url(), data, timeout=self._timeout)
+            _invalidate(self)
+            return
+        # Cannot update password and email simultaneously
+        # Cannot update password and email_verified simultaneously
+        # Cannot update username and password simultaneously
+        if 'password' in attrs and \
+                ('email' in attrs or 'username' in attrs or 'email_verified' in attrs):
+            patch_pass = {'password': data.pop('password'), 'connection': self._connection}
+            self._client.patch(self.get_url(), patch_pass, timeout=self._timeout)
+        # Cannot update username and email simultaneously
+        # Cannot update username and email_verified simultaneously
+        if 'username' in attrs and ('email' in attrs or 'email_verified' in attrs):
+            patch_user = {'username': data.pop('username'), 'connection': self._connection}
+            self._client.patch(self.get_url(), patch_user, timeout=self._timeout)
+        if data:
+            # supply connection if any of these are to be updated
+            conn_set = set(['email_verified', 'phone_verified', 'username', 'password'])
+            attr_set = set(data.keys())
+            conn_set.intersection_update(attr_set)
+            if conn_set:
+                data['connection'] = self._connection
+            # also supply client_id if any of these are to be updated
+            client_id_set = set(['email', 'phone_number'])
+            client_id_set.intersection_update(attr_set)
+            if client_id_set:
+                data['client_id'] = self._client_id
+                data['connection'] = self._connection
+            self._client.patch(self.get_url(), data, timeout=self._timeout)
+        _invalidate(self)
+
+    @traced
     def save(self):
         data = self.get_changed()
         if self._fetched:
             changed = deepcopy(data)
-            attrs = data.keys()
-            # Cannot update password and email simultaneously
-            # Cannot update password and email_verified simultaneously
-            # Cannot update username and password simultaneously
-            if 'password' in attrs and \
-                    ('email' in attrs or 'username' in attrs or 'email_verified' in attrs):
-                patch_pass = {'password': data.pop('password'), 'connection': self._connection}
-                self._client.patch(self.get_url(), patch_pass, timeout=self._timeout)
-            # Cannot update username and email simultaneously
-            # Cannot update username and email_verified simultaneously
-            if 'username' in attrs and ('email' in attrs or 'email_verified' in attrs):
-                patch_user = {'username': data.pop('username'), 'connection': self._connection}
-                self._client.patch(self.get_url(), patch_user, timeout=self._timeout)
-            if data:
-                # supply connection if any of these are to be updated
-                conn_set = set(['email_verified', 'phone_verified', 'username', 'password'])
-                attr_set = set(data.keys())
-                conn_set.intersection_update(attr_set)
-                if conn_set:
-                    data['connection'] = self._connection
-                # also supply client_id if any of these are to be updated
-                client_id_set = set(['email', 'phone_number'])
-                client_id_set.intersection_update(attr_set)
-                if client_id_set:
-                    data['client_id'] = self._client_id
-                    data['connection'] = self._connection
-                self._client.patch(self.get_url(), data, timeout=self._timeout)
+            self._patch(data)
             self._original.update(changed)
         else:
             data['connection'] = self._connection
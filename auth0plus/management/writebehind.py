@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Queue changes to users and send them later, merging every change made to a user in the
+meantime into a single save::
+
+    with WriteBehindQueue(interval=5) as queue:
+        for event in events:
+            user = users[event.user_id]
+            user.app_metadata['last_seen'] = event.time
+            queue.save(user)
+
+Changes are sent every *interval* seconds, once *max_pending* users have changes waiting
+and on flush or close. A user's changes are only sent once the previous save for that user
+has finished, so they arrive in order.
+"""
+import logging
+import threading
+from concurrent import futures
+
+from .instrumentation import operation
+
+logger = logging.getLogger(__name__)
+
+
+def log_error(user, changes, err):
+    logger.error('Saving %r changes to %r failed: %s', sorted(changes), user, err)
+
+
+class WriteBehindQueue(object):
+    """
+    Args:
+        interval (float): Seconds between sending queued changes, or None to only send
+            them on flush, close or when max_pending is reached
+
+        max_pending (int): The number of users with waiting changes that triggers a flush
+
+        workers (int): The most saves sent at once
+
+        on_error: Callable sent the user, the changes that failed and the exception when a
+            save fails, the changes are logged by default. The failed changes are marked as
+            unsaved on the user so a later save tries them again.
+    """
+
+    def __init__(self, interval=1.0, max_pending=100, workers=4, on_error=log_error):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.on_error = on_error
+        self._pending = {}  # user_id: (user, merged changes)
+        self._inflight = set()
+        self._futures = set()
+        self._lock = threading.RLock()
+        self._executor = futures.ThreadPoolExecutor(max_workers=workers)
+        self._closed = threading.Event()
+        self._timer = None
+        if interval:
+            self._timer = threading.Thread(target=self._run, name='auth0plus-write-behind')
+            self._timer.daemon = True
+            self._timer.start()
+
+    def save(self, user):
+        """
+        Queue the user's unsaved changes. Users that haven't been created yet are saved
+        straight away.
+        """
+        if self._closed.is_set():
+            raise RuntimeError('save on a closed WriteBehindQueue')
+        if not user._fetched:
+            user.save()
+            return
+        changes = user.get_changed()
+        if not changes:
+            return
+        # the changes are now the queue's to send so the user only reports newer ones
+        user._original.update(changes)
+        try:
+            del user.password
+        except AttributeError:
+            pass
+        with self._lock:
+            queued = self._pending.get(user.get_id())
+            if queued:
+                queued[1].update(changes)
+                changes = queued[1]
+            self._pending[user.get_id()] = (user, changes)
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self.flush(wait=False)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def flush(self, wait=True):
+        """
+        Send the queued changes, waiting for every save to finish unless wait is False.
+        """
+        with self._lock:
+            ready = [user_id for user_id in self._pending if user_id not in self._inflight]
+            batch = [self._pending.pop(user_id) for user_id in ready]
+            self._inflight.update(ready)
+            for user, changes in batch:
+                future = self._executor.submit(self._send, user, changes)
+                self._futures.add(future)
+                future.add_done_callback(self._done)
+        if wait:
+            self._wait()
+
+    def _wait(self):
+        # saves held back behind ones in flight are sent as those finish
+        while True:
+            with self._lock:
+                running = list(self._futures)
+            if not running:
+                return
+            futures.wait(running)
+
+    def _done(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _send(self, user, changes):
+        try:
+            with operation('%s.write_behind' % user.__class__.__name__):
+                user._patch(dict(changes))
+        except Exception as err:
+            for key in changes:
+                user._original.pop(key, None)
+            try:
+                self.on_error(user, changes, err)
+            except Exception:
+                logger.exception('WriteBehindQueue on_error failed')
+        finally:
+            with self._lock:
+                self._inflight.discard(user.get_id())
+                held = user.get_id() in self._pending
+            if held:
+                self.flush(wait=False)
+
+    def _run(self):
+        while not self._closed.wait(self.interval):
+            try:
+                self.flush(wait=False)
+            except RuntimeError:  # the executor shut down
+                return
+
+    def close(self):
+        """
+        Send everything queued and stop.
+        """
+        if self._closed.is_set():
+            return
+        self.flush()
+        self._closed.set()
+        if self._timer is not None:
+            self._timer.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,10 +1,17 @@
-from .management.rest import RestClient
+import threading
+import time
 
+from .management.rest import RestClient, domain_url
 
-def get_token(domain, client_id, client_secret, grant_type="client_credentials"):
+
+def get_token(domain, client_id, client_secret, grant_type="client_credentials", session=None,
+              transport=None):
     """
     Get an auth0 client_credentials token
     https://auth0.com/docs/api/management/v2/tokens
+
+    session is an optional requests.Session instance and transport an optional
+    auth0plus.management.transports transport to use instead
     """
 
     payload = {
@@ -12,6 +19,50 @@ def get_token(domain, client_id, client_secret, grant_type="client_credentials")
         "client_id": client_id,
         "client_secret": client_secret,
         "audience": "https://%s/api/v2/" % domain}
-    url = 'https://%s/oauth/token' % domain
-    client = RestClient()
+    url = '%s/oauth/token' % domain_url(domain)
+    client = RestClient(session=session, transport=transport)
     return client.post(url, payload)
+
+
+class TokenManager(object):
+    """
+    Hold a client_credentials token for a tenant, getting a new one with get_token shortly
+    before the current one expires. Threads share the token and only one fetches a new one.
+
+    Pass it to Auth0 or RestClient as *tokens* instead of a fixed token.
+
+    Args:
+        leeway (int): Seconds before expiry to replace the token
+    """
+
+    def __init__(self, domain, client_id, client_secret, leeway=60, session=None,
+                 transport=None, clock=time.time):
+        self.domain = domain
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.leeway = leeway
+        self.session = session
+        self.transport = transport
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires = 0
+
+    @property
+    def token(self):
+        if self._clock() < self._expires:
+            return self._token
+        with self._lock:
+            if self._clock() >= self._expires:  # another thread may have just refreshed it
+                now = self._clock()
+                response = get_token(self.domain, self.client_id, self.client_secret,
+                                     session=self.session, transport=self.transport)
+                self._token = response['access_token']
+                self._expires = now + int(response.get('expires_in', 86400)) - self.leeway
+        return self._token
+
+    def invalidate(self):
+        """
+        Get a new token on the next request, e.g. after the api rejected the current one.
+        """
+        self._expires = 0
@@ -0,0 +1,2 @@
+from .assertions import CallBudgetExceeded, CallBudgetMixin, assert_max_calls, assert_num_calls
+from .emulator import Auth0Emulator, EmulatorH2Server, EmulatorServer, EmulatorSession
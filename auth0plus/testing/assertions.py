@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Assert how many management api calls a block of code makes, like django's
+assertNumQueries, to catch N+1 patterns such as calling User.get for every row::
+
+    with assert_max_calls(1, 'GET'):
+        users = list(auth0.users.query(email='*@acdc.com'))
+
+Calls are counted from RestClient's hooks so any session or transport can sit underneath.
+"""
+from collections import Counter
+
+from ..management.instrumentation import trace
+
+
+class CallBudgetExceeded(AssertionError):
+    pass
+
+
+class _CallBudget(object):
+
+    def __init__(self, num, method=None, endpoint=None, exact=False):
+        self.num = num
+        self.method = method
+        self.endpoint = endpoint
+        self.exact = exact
+        self.trace = None
+
+    def __enter__(self):
+        self.trace = trace().__enter__()
+        return self.trace
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.trace.__exit__(exc_type, exc_value, tb)
+        if exc_type is not None:
+            return
+        made = self.trace.count(self.method, self.endpoint)
+        if made == self.num or (made < self.num and not self.exact):
+            return
+        raise CallBudgetExceeded(self._message(made))
+
+    def _message(self, made):
+        scope = ' '.join(part for part in [self.method, self.endpoint] if part) or 'api'
+        expected = 'exactly' if self.exact else 'at most'
+        lines = ['%s %s calls were made, expected %s %s' % (made, scope, expected, self.num)]
+        totals = Counter((call.method, call.endpoint) for call in self.trace.calls)
+        lines.extend('  %s x %s %s' % (count, method, endpoint)
+                     for (method, endpoint), count in sorted(totals.items()))
+        lines.append(self.trace.format())
+        return '\n'.join(lines)
+
+
+def assert_num_calls(num, method=None, endpoint=None):
+    """
+    Fail if the block doesn't make exactly num calls, optionally only counting those with
+    the method and/or endpoint template such as '/api/v2/users/{id}'.
+    """
+    return _CallBudget(num, method, endpoint, exact=True)
+
+
+def assert_max_calls(num, method=None, endpoint=None):
+    """
+    Fail if the block makes more than num calls, optionally only counting those with the
+    method and/or endpoint template.
+    """
+    return _CallBudget(num, method, endpoint)
+
+
+class CallBudgetMixin(object):
+    """
+    unittest.TestCase mixin providing assertNumCalls and assertMaxCalls context managers.
+    """
+
+    def assertNumCalls(self, num, method=None, endpoint=None):
+        return assert_num_calls(num, method, endpoint)
+
+    def assertMaxCalls(self, num, method=None, endpoint=None):
+        return assert_max_calls(num, method, endpoint)
@@ -0,0 +1,860 @@
+# -*- coding: utf-8 -*-
+"""
+A local stand-in for the parts of the Auth0 management api that auth0plus uses.
+
+The emulator keeps users, logs, connections, clients, rules, stats, device credentials,
+blacklisted tokens, tickets and jobs in memory and answers /oauth/token,
+/.well-known/jwks.json and the /api/v2 endpoints for each with paging, include_totals,
+lucene queries (see auth0plus.management.lucene), rate limit headers and optional latency.
+Use it in-process through *session* or *transport* or over http with *EmulatorServer*::
+
+    emulator = Auth0Emulator()
+    auth0 = Auth0('example.auth0.com', 'token', session=emulator.session())
+    auth0 = Auth0('example.auth0.com', 'token', transport=emulator.transport())
+
+
+HTTP/2 clients can be tested against *EmulatorH2Server*, which needs the h2 package.
+"""
+import gzip
+import io
+import itertools
+import json
+import socket
+import threading
+import time
+from datetime import datetime
+
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import parse_qsl, unquote, urlsplit
+
+from ..exceptions import InvalidQuery
+from ..management import lucene
+from ..management.stats import UTC
+from ..management.transports import InMemoryTransport
+from ..settings import AUTH0_PER_PAGE
+from .keys import TEST_KEYS
+
+
+class EmulatorResponse(object):
+    """
+    Just enough of a requests.Response for RestClient.
+    """
+
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = '' if body is None else json.dumps(body)
+
+    @property
+    def content(self):
+        return self.text.encode('utf-8')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class EmulatorError(Exception):
+
+    def __init__(self, status_code, error, message, error_code=None):
+        self.status_code = status_code
+        self.error = error
+        self.message = message
+        self.error_code = error_code
+
+    def as_body(self):
+        body = {'statusCode': self.status_code, 'error': self.error, 'message': self.message}
+        if self.error_code:
+            body['errorCode'] = self.error_code
+        return body
+
+
+class Auth0Emulator(object):
+    """
+    An in-memory Auth0 tenant.
+
+    Args:
+        latency: seconds (or a callable returning seconds) to wait before each response
+
+        rate_limit: optional (limit, window_seconds) applied across all requests with
+            X-RateLimit-* headers and a 429 response once the limit is reached
+
+        clients: optional dict of client_id to client_secret accepted by /oauth/token,
+            any credentials are accepted if not supplied
+
+        clock: callable returning the current time in seconds, time.time by default
+
+        sleep: callable used to apply latency, time.sleep by default
+    """
+
+    def __init__(self, latency=0, rate_limit=None, clients=None, clock=time.time,
+                 sleep=time.sleep):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.clients = clients
+        self.clock = clock
+        self.sleep = sleep
+        self.users = {}
+        self.passwords = {}
+        self.jobs = {}
+        self.logs = []  # oldest first, see add_log
+        self.connections = {}  # by id, see add_connection
+        self.tickets = []  # the body and url of every ticket issued
+        self.applications = {}  # the /api/v2/clients by client_id, see add_client
+        self.rules = {}  # by id, see add_rule
+        self.daily_stats = {}  # by YYYYMMDD, see add_daily_stats
+        self.device_credentials = {}  # by id, see add_device_credential
+        self.blacklist = []  # the aud and jti of each blacklisted token
+        self.tokens = set()
+        self.signing_keys = [TEST_KEYS[0]]  # published at /.well-known/jwks.json
+        self.requests = []  # (method, path) of every request handled
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._window_start = None
+        self._window_count = 0
+
+    def session(self):
+        return EmulatorSession(self)
+
+    def transport(self):
+        return InMemoryTransport(self.handle)
+
+    def _now(self, ago=0):
+        now = datetime.fromtimestamp(self.clock() - ago, UTC)
+        return now.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+    def _next_id(self):
+        return '%024x' % next(self._ids)
+
+    def add_log(self, type='s', **fields):
+        """
+        Record a log event, e.g. add_log('f', user_id='auth0|1'), and return it.
+        """
+        with self._lock:
+            log_id = self._next_id()
+            log = {'_id': log_id, 'log_id': log_id, 'date': self._now(), 'type': type}
+            log.update(fields)
+            self.logs.append(log)
+        return log
+
+    def add_connection(self, name, strategy='auth0', **fields):
+        """
+        Add a connection, e.g. add_connection('google-oauth2', 'google-oauth2'), and return it.
+        """
+        with self._lock:
+            return self._create_connection(dict(fields, name=name, strategy=strategy))[1]
+
+    def add_client(self, name, **fields):
+        """
+        Add a client (application), e.g. add_client('web', app_type='spa'), and return it.
+        """
+        with self._lock:
+            return self._create_client(dict(fields, name=name))[1]
+
+    def add_rule(self, name, script='function (user, context, callback) {}', **fields):
+        """
+        Add a rule, e.g. add_rule('add-roles', enabled=False), and return it.
+        """
+        with self._lock:
+            return self._create_rule(dict(fields, name=name, script=script))[1]
+
+    def add_daily_stats(self, day, logins=0, signups=0, leaked_passwords=0):
+        """
+        Set the stats for a day, a date, e.g. add_daily_stats(date(2017, 6, 1), logins=5).
+        """
+        stamp = '%sT00:00:00.000Z' % day.isoformat()
+        record = {'date': stamp, 'logins': logins, 'signups': signups,
+                  'leaked_passwords': leaked_passwords, 'created_at': stamp,
+                  'updated_at': self._now()}
+        with self._lock:
+            self.daily_stats[day.strftime('%Y%m%d')] = record
+        return record
+
+    def add_device_credential(self, user_id, type='refresh_token', **fields):
+        """
+        Add a device credential of a user, e.g. add_device_credential('auth0|1'), and return
+        it.
+        """
+        with self._lock:
+            credential = {'id': 'dcr_%s' % self._next_id(), 'user_id': user_id, 'type': type,
+                          'device_name': 'emulator', 'client_id': 'emulator'}
+            credential.update(fields)
+            self.device_credentials[credential['id']] = credential
+        return credential
+
+    def sign(self, claims, key=None):
+        """
+        Return a RS256 token of the claims signed with key, by default the first of the
+        signing keys, for testing auth0plus.verify.TokenVerifier.
+        """
+        return (key or self.signing_keys[0]).token(claims)
+
+    def _rate_limit_headers(self):
+        if not self.rate_limit:
+            return {}, False
+        limit, window = self.rate_limit
+        now = self.clock()
+        if self._window_start is None or now >= self._window_start + window:
+            self._window_start = now
+            self._window_count = 0
+        self._window_count += 1
+        exceeded = self._window_count > limit
+        headers = {
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(max(limit - self._window_count, 0)),
+            'X-RateLimit-Reset': str(int(self._window_start + window)),
+        }
+        return headers, exceeded
+
+    def handle(self, method, url, params=None, data=None, files=None, headers=None):
+        """
+        Answer a request and return an EmulatorResponse.
+        """
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            self.sleep(latency)
+        parts = urlsplit(url)
+        path = parts.path.rstrip('/')
+        query = dict(parse_qsl(parts.query))
+        query.update(params or {})
+        with self._lock:
+            self.requests.append((method.upper(), path))
+            response_headers, exceeded = self._rate_limit_headers()
+            try:
+                if exceeded:
+                    raise EmulatorError(
+                        429, 'Too Many Requests', 'Global limit has been reached',
+                        'too_many_requests')
+                if data and not isinstance(data, dict):
+                    data = json.loads(data)
+                status, body = self._route(method.upper(), path, query, data or {}, files,
+                                           headers or {})
+            except EmulatorError as err:
+                status, body = err.status_code, err.as_body()
+        return EmulatorResponse(status, body, response_headers)
+
+    def _route(self, method, path, query, data, files, headers):
+        if path == '/oauth/token' and method == 'POST':
+            return self._token(data)
+        if path == '/.well-known/jwks.json' and method == 'GET':
+            return 200, {'keys': [key.jwk() for key in self.signing_keys]}
+        if not path.startswith('/api/v2/'):
+            raise EmulatorError(404, 'Not Found', 'Not Found')
+        self._authorize(headers)
+        segments = [unquote(segment) for segment in path[len('/api/v2/'):].split('/')]
+        resource, rest = segments[0], segments[1:]
+        if resource == 'users' and not rest:
+            if method == 'GET':
+                return self._list_users(query)
+            if method == 'POST':
+                return self._create_user(data)
+        elif resource == 'users' and len(rest) == 1:
+            user = self._get_user(rest[0])
+            if method == 'GET':
+                return 200, _select_fields(user, query)
+            if method == 'PATCH':
+                return self._update_user(user, data)
+            if method == 'DELETE':
+                del self.users[user['user_id']]
+                self.passwords.pop(user['user_id'], None)
+                return 204, None
+        elif resource == 'logs' and method == 'GET':
+            if not rest:
+                return self._list_logs(query)
+            for log in self.logs:
+                if log['log_id'] == rest[0]:
+                    return 200, log
+            raise EmulatorError(404, 'Not Found', 'Log not found', 'inexistent_log')
+        elif resource == 'connections' and not rest:
+            if method == 'GET':
+                connections = [connection for connection in self.connections.values()
+                               if all(connection.get(key) == query[key]
+                                      for key in ('name', 'strategy') if query.get(key))]
+                return 200, _page(connections, query, 'connections')
+            if method == 'POST':
+                return self._create_connection(data)
+        elif resource == 'connections' and len(rest) == 1:
+            try:
+                connection = self.connections[rest[0]]
+            except KeyError:
+                raise EmulatorError(404, 'Not Found', 'The connection does not exist',
+                                    'inexistent_connection')
+            if method == 'GET':
+                return 200, _select_fields(connection, query)
+            if method == 'PATCH':
+                connection.update(data)
+                return 200, connection
+            if method == 'DELETE':
+                del self.connections[rest[0]]
+                return 204, None
+        elif resource == 'stats' and rest == ['daily'] and method == 'GET':
+            first, last = query.get('from') or '', query.get('to') or '99999999'
+            return 200, [self.daily_stats[day] for day in sorted(self.daily_stats)
+                         if first <= day <= last]
+        elif resource == 'stats' and rest == ['active-users'] and method == 'GET':
+            since = self._now(ago=30 * 86400)
+            return 200, len([user for user in self.users.values()
+                             if user.get('last_login', '') >= since])
+        elif resource == 'device-credentials' and not rest and method == 'GET':
+            credentials = [credential for credential in self.device_credentials.values()
+                           if all(credential.get(key) == query[key] for key in
+                                  ('user_id', 'client_id', 'type') if query.get(key))]
+            return 200, _page(credentials, query, 'device-credentials')
+        elif resource == 'device-credentials' and len(rest) == 1 and method == 'DELETE':
+            if self.device_credentials.pop(rest[0], None) is None:
+                raise EmulatorError(404, 'Not Found', 'The device credential does not exist',
+                                    'inexistent_device_credential')
+            return 204, None
+        elif resource == 'blacklists' and rest == ['tokens']:
+            if method == 'GET':
+                return 200, [token for token in self.blacklist
+                             if not query.get('aud') or token.get('aud') == query['aud']]
+            if method == 'POST':
+                if not data.get('jti'):
+                    raise EmulatorError(400, 'Bad Request',
+                                        'Payload validation error: Missing required property: '
+                                        'jti', 'invalid_body')
+                self.blacklist.append(dict(data))
+                return 201, None
+        elif resource in ('clients', 'rules'):
+            return self._configuration(resource, method, rest, query, data)
+        elif resource == 'tickets' and len(rest) == 1 and method == 'POST':
+            if rest[0] == 'email-verification':
+                self._get_user(data.get('user_id', ''))
+                return self._create_ticket('verify', data)
+            if rest[0] == 'password-change':
+                if data.get('user_id'):
+                    self._get_user(data['user_id'])
+                elif not (data.get('email') and data.get('connection_id')):
+                    raise EmulatorError(400, 'Bad Request',
+                                        'user_id or email and connection_id are required',
+                                        'invalid_body')
+                return self._create_ticket('reset', data)
+        elif resource == 'jobs' and len(rest) == 1:
+            if method == 'GET':
+                try:
+                    return 200, self.jobs[rest[0]]
+                except KeyError:
+                    raise EmulatorError(404, 'Not Found', 'The job does not exist.',
+                                        'inexistent_job')
+            if method == 'POST' and rest[0] == 'verification-email':
+                self._get_user(data.get('user_id', ''))
+                return 201, self._create_job('verification_email')
+            if method == 'POST' and rest[0] == 'users-imports':
+                return 202, self._import_users(query, data, files)
+            if method == 'POST' and rest[0] == 'users-exports':
+                job = self._create_job('users_export')
+                job['location'] = 'emulator://exports/%s.json' % job['id']
+                job['users'] = list(self.users.values())
+                return 201, job
+        raise EmulatorError(404, 'Not Found', 'Not Found')
+
+    def _token(self, data):
+        client_id = data.get('client_id')
+        if self.clients is not None and self.clients.get(client_id) != data.get('client_secret'):
+            raise EmulatorError(401, 'access_denied', 'Unauthorized')
+        if data.get('grant_type') != 'client_credentials':
+            raise EmulatorError(403, 'unauthorized_client', 'Grant type not allowed')
+        token = 'emulator.%s' % self._next_id()
+        self.tokens.add(token)
+        return 200, {'access_token': token, 'token_type': 'Bearer', 'expires_in': 86400,
+                     'scope': 'read:users update:users delete:users create:users'}
+
+    def _authorize(self, headers):
+        if not self.tokens:  # accept anything until a token has been issued or added
+            return
+        auth = dict((k.lower(), v) for k, v in headers.items()).get('authorization') or ''
+        if auth[len('Bearer '):] not in self.tokens:
+            raise EmulatorError(401, 'Unauthorized', 'Invalid token', 'invalid_token')
+
+    def _get_user(self, user_id):
+        try:
+            return self.users[user_id]
+        except KeyError:
+            raise EmulatorError(404, 'Not Found', 'The user does not exist.', 'inexistent_user')
+
+    def _list_users(self, query):
+        q = query.get('q')
+        if not q and query.get('connection'):
+            matcher = lucene.Term('identities.connection', query['connection'])
+        else:
+            matcher = _matcher(q)
+        users = [user for user in self.users.values()
+                 if matcher is None or matcher.match(user)]
+        users.sort(key=lambda user: user['created_at'])
+        return 200, _page(users, query, 'users')
+
+    def _list_logs(self, query):
+        if 'from' in query or 'take' in query:
+            # checkpoint paging, the logs after from in the order they were recorded
+            take = min(int(query.get('take', 50)), 100)
+            start = 0
+            if query.get('from'):
+                ids = [log['log_id'] for log in self.logs]
+                if query['from'] not in ids:
+                    raise EmulatorError(400, 'Bad Request', 'Invalid from', 'invalid_query')
+                start = ids.index(query['from']) + 1
+            return 200, self.logs[start:start + take]
+        matcher = _matcher(query.get('q'))
+        logs = [log for log in self.logs if matcher is None or matcher.match(log)]
+        if not query.get('sort'):
+            logs.reverse()  # newest first
+        return 200, _page(logs, query, 'logs')
+
+    def _create_connection(self, data):
+        if not data.get('name') or not data.get('strategy'):
+            raise EmulatorError(400, 'Bad Request',
+                                'Payload validation error: Missing required property: name',
+                                'invalid_body')
+        if any(c['name'] == data['name'] for c in self.connections.values()):
+            raise EmulatorError(409, 'Conflict', 'A connection with the same name already exists',
+                                'connection_exists')
+        connection = {'id': 'con_%s' % self._next_id(), 'options': {}, 'enabled_clients': []}
+        connection.update(data)
+        self.connections[connection['id']] = connection
+        return 201, connection
+
+    def _configuration(self, resource, method, rest, query, data):
+        store = self.applications if resource == 'clients' else self.rules
+        filters = (('app_type', 'is_first_party', 'is_global') if resource == 'clients'
+                   else ('enabled', 'stage'))
+        if not rest:
+            if method == 'GET':
+                records = [record for record in store.values()
+                           if all(str(record.get(key)).lower() == str(query[key]).lower()
+                                  for key in filters if query.get(key) is not None)]
+                return 200, _page(records, query, resource)
+            if method == 'POST':
+                if resource == 'clients':
+                    return self._create_client(data)
+                return self._create_rule(data)
+        elif len(rest) == 1:
+            try:
+                record = store[rest[0]]
+            except KeyError:
+                raise EmulatorError(404, 'Not Found', 'The %s does not exist' % resource[:-1],
+                                    'inexistent_%s' % resource[:-1])
+            if method == 'GET':
+                return 200, _select_fields(record, query)
+            if method == 'PATCH':
+                record.update(data)
+                return 200, record
+            if method == 'DELETE':
+                del store[rest[0]]
+                return 204, None
+        raise EmulatorError(404, 'Not Found', 'Not Found')
+
+    def _create_client(self, data):
+        if not data.get('name'):
+            raise EmulatorError(400, 'Bad Request',
+                                'Payload validation error: Missing required property: name',
+                                'invalid_body')
+        client_id = 'cli%s' % self._next_id()
+        client = {'client_id': client_id, 'client_secret': 'secret-%s' % client_id,
+                  'app_type': 'regular_web', 'is_first_party': True, 'callbacks': []}
+        client.update(data)
+        self.applications[client_id] = client
+        return 201, client
+
+    def _create_rule(self, data):
+        if not data.get('name') or not data.get('script'):
+            raise EmulatorError(400, 'Bad Request',
+                                'Payload validation error: Missing required property: script',
+                                'invalid_body')
+        if any(rule['name'] == data['name'] for rule in self.rules.values()):
+            raise EmulatorError(409, 'Conflict', 'A rule with the same name already exists',
+                                'rule_conflict')
+        rule = {'id': 'rul_%s' % self._next_id(), 'enabled': True, 'stage': 'login_success',
+                'order': max([r['order'] for r in self.rules.values()] or [0]) + 1}
+        rule.update(data)
+        self.rules[rule['id']] = rule
+        return 201, rule
+
+    def _create_ticket(self, kind, data):
+        url = 'https://example.com/lo/%s?ticket=%s#' % (kind, self._next_id())
+        self.tickets.append(dict(data, ticket=url))
+        return 201, {'ticket': url}
+
+    def _create_user(self, data):
+        connection = data.get('connection')
+        if not connection:
+            raise EmulatorError(400, 'Bad Request',
+                                'Payload validation error: Missing required property: connection',
+                                'invalid_body')
+        email = data.get('email')
+        for user in self.users.values():
+            if email and user.get('email') == email and \
+                    connection in [i['connection'] for i in user['identities']]:
+                raise EmulatorError(400, 'Bad Request', 'The user already exists.',
+                                    'auth0_idp_error')
+        identity = self._next_id()
+        now = self._now()
+        user = {
+            'user_id': 'auth0|%s' % identity,
+            'email_verified': False,
+            'created_at': now,
+            'updated_at': now,
+            'identities': [{'connection': connection, 'provider': 'auth0',
+                            'user_id': identity, 'isSocial': False}],
+        }
+        if email:
+            user['nickname'] = email.split('@')[0]
+        for key, value in data.items():
+            if key not in ('connection', 'password', 'client_id', 'verify_email'):
+                user[key] = value
+        self.users[user['user_id']] = user
+        if 'password' in data:
+            self.passwords[user['user_id']] = data['password']
+        return 201, user
+
+    def _update_user(self, user, data):
+        keys = set(data)
+        if 'password' in keys and keys & set(['email', 'email_verified', 'username']):
+            raise EmulatorError(400, 'Bad Request',
+                                'Cannot update password and email simultaneously',
+                                'invalid_body')
+        if 'username' in keys and keys & set(['email', 'email_verified']):
+            raise EmulatorError(400, 'Bad Request',
+                                'Cannot update username and email simultaneously',
+                                'invalid_body')
+        for key, value in data.items():
+            if key in ('connection', 'client_id', 'verify_email', 'verify_password'):
+                continue
+            if key == 'password':
+                self.passwords[user['user_id']] = value
+            elif key in ('user_metadata', 'app_metadata') and isinstance(value, dict):
+                # metadata is merged at the top level like the real endpoint
+                merged = dict(user.get(key, {}))
+                merged.update(value)
+                user[key] = dict((k, v) for k, v in merged.items() if v is not None)
+            else:
+                user[key] = value
+        user['updated_at'] = self._now()
+        return 200, user
+
+    def _create_job(self, job_type):
+        job = {'id': 'job_%s' % self._next_id(), 'type': job_type, 'status': 'completed',
+               'created_at': self._now()}
+        self.jobs[job['id']] = job
+        return job
+
+    def _import_users(self, query, data, files):
+        fields = dict(query)
+        fields.update(data or {})
+        connection_id = fields.get('connection_id')
+        try:
+            upload = (files or {})['users']
+        except KeyError:
+            raise EmulatorError(400, 'Bad Request', 'Missing users file', 'invalid_body')
+        if isinstance(upload, tuple):  # requests style (name, fileobj[, content_type])
+            upload = upload[1]
+        content = upload.read() if hasattr(upload, 'read') else upload
+        if isinstance(content, bytes):
+            content = content.decode('utf-8')
+        job = self._create_job('users_import')
+        job['connection_id'] = connection_id
+        created = 0
+        for record in json.loads(content):
+            record.setdefault('connection', connection_id)
+            try:
+                self._create_user(record)
+                created += 1
+            except EmulatorError:
+                continue
+        job['summary'] = {'inserted': created}
+        return job
+
+
+def _matcher(q):
+    if not q:
+        return None
+    try:
+        return lucene.compile(q)
+    except InvalidQuery:
+        raise EmulatorError(400, 'Bad Request', 'Invalid query: %s' % q)
+
+
+def _page(records, query, path):
+    """
+    Sort and page listed records like the list endpoints, wrapped with the totals if asked.
+    """
+    sort = query.get('sort')
+    if sort:
+        field, _, direction = sort.partition(':')
+        records.sort(key=lambda record: str(next(lucene._values(record, field), '')),
+                     reverse=direction == '-1')
+    per_page = int(query.get('per_page', AUTH0_PER_PAGE))
+    page = int(query.get('page', 0))
+    start = page * per_page
+    selected = [_select_fields(record, query) for record in records[start:start + per_page]]
+    if _is_true(query.get('include_totals')):
+        return {'start': start, 'limit': per_page, 'length': len(selected),
+                'total': len(records), path: selected}
+    return selected
+
+
+def _is_true(value):
+    return value in (True, 'true', 'True', '1')
+
+
+def _select_fields(user, query):
+    fields = query.get('fields')
+    if not fields:
+        return dict(user)
+    fields = set(fields.split(','))
+    if _is_true(query.get('include_fields', True)):
+        return dict((k, v) for k, v in user.items() if k in fields)
+    return dict((k, v) for k, v in user.items() if k not in fields)
+
+
+class EmulatorSession(object):
+    """
+    A requests.Session look-alike that answers from an Auth0Emulator without any sockets.
+    """
+
+    def __init__(self, emulator):
+        self.emulator = emulator
+        self.headers = {}
+
+    def request(self, method, url, params=None, data=None, files=None, headers=None,
+                timeout=None, stream=False):
+        merged = dict(self.headers)
+        merged.update(headers or {})
+        merged = dict((k, v) for k, v in merged.items() if v is not None)
+        response = self.emulator.handle(method, url, params=params, data=data, files=files,
+                                        headers=merged)
+        if stream:
+            response.raw = io.BytesIO(response.content)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+class _Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        response = self.server.emulator.handle(
+            self.command, self.path, data=body.decode('utf-8') if body else None,
+            headers=dict(self.headers))
+        payload = response.content
+        self.send_response(response.status_code)
+        for key, value in response.headers.items():
+            self.send_header(key, value)
+        if payload:
+            self.send_header('Content-Type', 'application/json')
+        if payload and 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            payload = _gzip(payload)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _gzip(payload):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode='wb') as compressed:
+        compressed.write(payload)
+    return buf.getvalue()
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class EmulatorServer(object):
+    """
+    Serve an Auth0Emulator over http on a local port, e.g. for load tests from other
+    processes. Responses are gzipped for clients that accept it. Use as a context manager
+    or call start and stop. Job imports need a file upload so they are only available
+    in-process.
+    """
+
+    def __init__(self, emulator=None, host='127.0.0.1', port=0):
+        self.emulator = emulator or Auth0Emulator()
+        self._server = _ThreadingHTTPServer((host, port), _Handler)
+        self._server.emulator = self.emulator
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%s' % (host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,))
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class EmulatorH2Server(object):
+    """
+    Serve an Auth0Emulator over cleartext HTTP/2 with prior knowledge, e.g. for
+    Http2Transport(prior_knowledge=True). Streams are answered concurrently and
+    *connections*, *streams* and *max_concurrent* count what the clients did.
+
+    Requires the h2 package.
+    """
+
+    def __init__(self, emulator=None, host='127.0.0.1', port=0, max_concurrent_streams=100):
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.settings
+        self._h2 = h2
+        self.emulator = emulator or Auth0Emulator()
+        self.max_concurrent_streams = max_concurrent_streams
+        self.connections = 0
+        self.streams = 0
+        self.max_concurrent = 0
+        self._active = 0
+        self._count_lock = threading.Lock()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(16)
+        self._running = False
+
+    @property
+    def url(self):
+        host, port = self._sock.getsockname()[:2]
+        return 'http://%s:%s' % (host, port)
+
+    def start(self):
+        self._running = True
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._sock.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _accept(self):
+        while self._running:
+            try:
+                sock, _ = self._sock.accept()
+            except (OSError, socket.error):
+                return
+            with self._count_lock:
+                self.connections += 1
+            thread = threading.Thread(target=self._serve, args=(sock,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, sock):
+        h2 = self._h2
+        conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        lock = threading.Lock()
+        pending = {}  # stream id to unsent response data waiting on flow control
+        requests = {}
+        conn.initiate_connection()
+        conn.update_settings(
+            {h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: self.max_concurrent_streams})
+        sock.sendall(conn.data_to_send())
+        try:
+            while True:
+                data = sock.recv(65535)
+                if not data:
+                    return
+                with lock:
+                    events = conn.receive_data(data)
+                    for event in events:
+                        if isinstance(event, h2.events.RequestReceived):
+                            requests[event.stream_id] = [dict(event.headers), b'']
+                        elif isinstance(event, h2.events.DataReceived):
+                            requests[event.stream_id][1] += event.data
+                            conn.acknowledge_received_data(
+                                event.flow_controlled_length, event.stream_id)
+                        elif isinstance(event, h2.events.StreamEnded):
+                            headers, body = requests.pop(event.stream_id)
+                            thread = threading.Thread(
+                                target=self._respond,
+                                args=(conn, sock, lock, pending, event.stream_id, headers, body))
+                            thread.daemon = True
+                            thread.start()
+                        elif isinstance(event, h2.events.WindowUpdated):
+                            self._flush(conn, pending)
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                    sock.sendall(conn.data_to_send())
+        except (OSError, socket.error):
+            return
+        finally:
+            sock.close()
+
+    def _respond(self, conn, sock, lock, pending, stream_id, headers, body):
+        with self._count_lock:
+            self.streams += 1
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+        try:
+            response = self.emulator.handle(
+                headers[':method'], headers[':path'],
+                data=body.decode('utf-8') if body else None, headers=headers)
+        finally:
+            with self._count_lock:
+                self._active -= 1
+        response_headers = [(':status', str(response.status_code)),
+                            ('content-length', str(len(response.content))),
+                            ('content-type', 'application/json')]
+        response_headers.extend((k.lower(), v) for k, v in response.headers.items())
+        with lock:
+            conn.send_headers(stream_id, response_headers, end_stream=not response.content)
+            if response.content:
+                pending[stream_id] = response.content
+                self._flush(conn, pending)
+            try:
+                sock.sendall(conn.data_to_send())
+            except (OSError, socket.error):
+                pass
+
+    def _flush(self, conn, pending):
+        for stream_id, data in list(pending.items()):
+            while data:
+                size = min(conn.local_flow_control_window(stream_id), len(data),
+                           conn.max_outbound_frame_size)
+                if size <= 0:
+                    break
+                conn.send_data(stream_id, data[:size])
+                data = data[size:]
+            if data:
+                pending[stream_id] = data
+            else:
+                del pending[stream_id]
+                conn.end_stream(stream_id)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Fixed RSA keys for signing tokens in tests, see Auth0Emulator.sign. Never use them for
+anything else, the private halves are published right here.
+"""
+import base64
+import hashlib
+import json
+
+from ..verify import SHA256_PREFIX, RSAPublicKey, _bytes, _int
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _inverse(a, m):
+    x0, x1, r0, r1 = 0, 1, m, a
+    while r1:
+        q = r0 // r1
+        x0, x1, r0, r1 = x1, x0 - q * x1, r1, r0 - q * r1
+    return x0 % m
+
+
+class RSAPrivateKey(object):
+
+    def __init__(self, p, q, kid, e=65537):
+        self.n = p * q
+        self.e = e
+        self.d = _inverse(e, (p - 1) * (q - 1))
+        self.kid = kid
+        self.size = (self.n.bit_length() + 7) // 8
+
+    def public_key(self):
+        return RSAPublicKey(self.n, self.e, self.kid)
+
+    def jwk(self):
+        return {'kty': 'RSA', 'use': 'sig', 'alg': 'RS256', 'kid': self.kid,
+                'n': _b64encode(_bytes(self.n, self.size)),
+                'e': _b64encode(_bytes(self.e, 3))}
+
+    def sign(self, message):
+        digest_info = SHA256_PREFIX + hashlib.sha256(message).digest()
+        padded = (b'\x00\x01' + b'\xff' * (self.size - len(digest_info) - 3) + b'\x00' +
+                  digest_info)
+        return _bytes(pow(_int(padded), self.d, self.n), self.size)
+
+    def token(self, claims, **header):
+        """
+        Return a RS256 JWT of the claims.
+        """
+        header = dict({'typ': 'JWT', 'alg': 'RS256', 'kid': self.kid}, **header)
+        signing_input = '.'.join(
+            _b64encode(json.dumps(part, sort_keys=True).encode('utf-8'))
+            for part in (header, claims))
+        signature = self.sign(signing_input.encode('ascii'))
+        return '%s.%s' % (signing_input, _b64encode(signature))
+
+
+TEST_KEYS = [
+    RSAPrivateKey(
+        int('f3ae5048ddc1f9a20c3312962539d8110355c1589fca7a97b26a4763e68c95dc0392c556119e477b'
+            '0d717cb92cc207a69149843467f288ca35011c89bc367faa2d445995df5deb4f1d6d0b5fb4086d97'
+            '884686871c6f5aea8697a8f02e9b10111c52f43860185b21f6261378bbc9a7f5f103600903f99cfb'
+            '6dcba2baca8f8bb7', 16),
+        int('e23ed531ed14180466dee840bea8d4c5e2012001ba728694e0b84d7272d157c8c1647ae090c2e679'
+            '043a47879171e5008a800348f6d1eb3fc9d6b6e134c85468f7604d13119fb7761085ec0bd1425456'
+            '98d8f12c57de67a188f98668e6bfb83ee82fd91fa52caa4143585688d689d5fd418fe6ea05a2b144'
+            'c3ad2c00c67867e3', 16),
+        kid='emulator-1'),
+    RSAPrivateKey(
+        int('f1285301819f705a2552c820c3c0ec4bbdaf0ee9651f2488cd3fb1eb0686ad716413c2b32563d84a'
+            '2287a4895ef63bcf24dfb8e0dd0fc567cfd4cc317125996de1e7765ab8bf967db7a90d05fd4535c5'
+            '9a32ecf39c56fedecb53ebf9f098e721b8af131bea4a2db83e1bd1e06ebf8742a9a7dc9f0f9279a2'
+            'c6041fb2b9e80511', 16),
+        int('fbe05eb441565e56772358fea9e8b1b292436c332d88ada26eaf306d99b9af0008efc94247f58f3e'
+            '2f70f7faf3f7414f46c87eb343da340c50921538c20212d7dd9c47f9933dcf27f181a54c8a4c97e1'
+            'ea0349bb222057533992913659c98919e5ae9b5f10be324878b62d677250eabed89c9ce1025fd665'
+            '73211af1091966db', 16),
+        kid='emulator-2'),
+]
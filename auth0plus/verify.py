@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Verify RS256 tokens issued by a tenant without calling Auth0 for each one::
+
+    verifier = TokenVerifier('example.auth0.com', audience='https://api.example.com')
+    claims = verifier.verify(token)  # raises InvalidToken
+
+The tenant's signing keys are fetched from /.well-known/jwks.json once and kept for *ttl*
+seconds. A token signed with a key that isn't known yet, e.g. after a key rotation,
+fetches the keys again, with only one thread fetching at a time and at most once every
+*refresh_interval* seconds however many unknown keys arrive. The claims of tokens that
+verify are remembered until they expire so a token used again is only checked for expiry.
+
+RS256 signatures are checked with the cryptography package. Without it they fall back to
+a PKCS#1 v1.5 check in pure python, which is slower and not constant time in the modular
+exponentiation, so install cryptography where tokens are verified in production.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import numbers
+import threading
+import time
+from collections import OrderedDict
+
+from .exceptions import InvalidToken
+from .management.rest import RestClient, domain_url
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+    from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
+    from cryptography.hazmat.primitives.hashes import SHA256
+except ImportError:  # pragma: no cover
+    RSAPublicNumbers = None
+
+# the DER encoded DigestInfo prefix of a sha256 hash in a PKCS#1 v1.5 signature
+SHA256_PREFIX = binascii.unhexlify('3031300d060960864801650304020105000420')
+
+
+def _b64decode(text):
+    if not isinstance(text, bytes):
+        text = text.encode('ascii')
+    return base64.urlsafe_b64decode(text + b'=' * (-len(text) % 4))
+
+
+def _int(data):
+    return int(binascii.hexlify(data), 16) if data else 0
+
+
+def _bytes(number, length):
+    return binascii.unhexlify('%0*x' % (length * 2, number))
+
+
+class RSAPublicKey(object):
+    """
+    The modulus and exponent of a JWK with kty RSA.
+    """
+
+    def __init__(self, n, e, kid=None):
+        self.n = n
+        self.e = e
+        self.kid = kid
+        self.size = (n.bit_length() + 7) // 8
+        self._key = None
+        if RSAPublicNumbers is not None:
+            self._key = RSAPublicNumbers(e, n).public_key(default_backend())
+
+    @classmethod
+    def from_jwk(cls, jwk):
+        return cls(_int(_b64decode(jwk['n'])), _int(_b64decode(jwk['e'])), jwk.get('kid'))
+
+    def verify(self, message, signature):
+        """
+        Return True if signature is the RS256 signature of message.
+        """
+        if self._key is None:
+            return self._verify_python(message, signature)
+        try:
+            self._key.verify(signature, message, PKCS1v15(), SHA256())
+        except InvalidSignature:
+            return False
+        return True
+
+    def _verify_python(self, message, signature):
+        """
+        The fallback when cryptography isn't installed.
+        """
+        if len(signature) != self.size:
+            return False
+        number = _int(signature)
+        if number >= self.n:
+            return False
+        digest_info = SHA256_PREFIX + hashlib.sha256(message).digest()
+        expected = (b'\x00\x01' + b'\xff' * (self.size - len(digest_info) - 3) + b'\x00' +
+                    digest_info)
+        return hmac.compare_digest(_bytes(pow(number, self.e, self.n), self.size), expected)
+
+
+class JWKS(object):
+    """
+    The signing keys of a tenant by kid.
+
+    Args:
+        ttl (float): Seconds to use fetched keys for
+
+        refresh_interval (float): The least seconds between fetches for unknown keys, and
+            after a failed fetch, during which stale keys are still used
+    """
+
+    def __init__(self, domain, ttl=600, refresh_interval=30, session=None, transport=None,
+                 clock=time.time):
+        self.url = '%s/.well-known/jwks.json' % domain_url(domain)
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self._client = RestClient(session=session, transport=transport)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._fetched = None  # when the keys were last fetched
+        self._failed = None  # when fetching them last failed
+        self._generation = 0
+
+    def get(self, kid):
+        """
+        Return the RSAPublicKey for kid, fetching the keys if they are stale or don't have
+        it, or raise InvalidToken. A key already known is used while the keys can't be
+        fetched.
+        """
+        generation = self._generation
+        key = self._keys.get(kid)
+        now = self._clock()
+        if key is not None and (now < self._fetched + self.ttl or self._failed is not None and
+                                now < self._failed + self.refresh_interval):
+            return key
+        try:
+            self._refresh(generation, key is None)
+        except InvalidToken:
+            if key is None:
+                raise
+            return key
+        try:
+            return self._keys[kid]
+        except KeyError:
+            raise InvalidToken('Unknown signing key %s' % kid)
+
+    def _refresh(self, generation, unknown):
+        with self._lock:
+            if self._generation != generation:  # another thread fetched them meanwhile
+                return
+            now = self._clock()
+            if self._fetched is not None and unknown and \
+                    now < self._fetched + self.refresh_interval and \
+                    now < self._fetched + self.ttl:
+                return
+            if self._failed is not None and now < self._failed + self.refresh_interval:
+                raise InvalidToken('Unable to fetch the signing keys')
+            try:
+                response = self._client.get(self.url)
+            except Exception as err:  # Auth0Error, a transport error or a bad response
+                self._failed = now
+                raise InvalidToken('Unable to fetch the signing keys: %s' % err)
+            keys = {}
+            for jwk in (response[0] if response else {}).get('keys', []):
+                if jwk.get('kty') == 'RSA' and jwk.get('use', 'sig') == 'sig':
+                    keys[jwk.get('kid')] = RSAPublicKey.from_jwk(jwk)
+            self._keys = keys
+            self._fetched = now
+            self._failed = None
+            self._generation += 1
+
+
+class TokenVerifier(object):
+    """
+    Args:
+        domain (str): The tenant's domain, e.g. 'example.auth0.com'
+
+        audience (str): The audience tokens must be issued for, e.g. an api identifier or
+            a client id
+
+        issuer (str): The issuer tokens must have, https://domain/ by default
+
+        leeway (int): Seconds of clock skew allowed when checking exp and nbf
+
+        jwks: Optional JWKS to share between verifiers, one for the domain by default
+
+        cache_size (int): The most verified tokens to remember
+    """
+
+    def __init__(self, domain, audience, issuer=None, leeway=0, jwks=None, cache_size=1024,
+                 session=None, transport=None, clock=time.time):
+        self.audience = audience
+        self.issuer = issuer or '%s/' % domain_url(domain)
+        self.leeway = leeway
+        self.jwks = jwks or JWKS(domain, session=session, transport=transport, clock=clock)
+        self.cache_size = cache_size
+        self._clock = clock
+        self._verified = OrderedDict()
+        self._lock = threading.Lock()
+
+    def verify(self, token):
+        """
+        Return the claims of a valid token or raise InvalidToken.
+        """
+        with self._lock:  # a hit moves the token to the end so the least recent is evicted
+            claims = self._verified.pop(token, None)
+            if claims is not None:
+                self._verified[token] = claims
+        if claims is not None:
+            self._check_times(claims)
+            return dict(claims)  # a copy so callers can't change what later ones see
+        claims = self._verify(token)
+        with self._lock:
+            self._verified[token] = claims
+            while len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return dict(claims)
+
+    def _verify(self, token):
+        try:
+            header, payload, signature = token.split('.')
+            message = ('%s.%s' % (header, payload)).encode('ascii')
+            header = json.loads(_b64decode(header).decode('utf-8'))
+            claims = json.loads(_b64decode(payload).decode('utf-8'))
+            signature = _b64decode(signature)
+        except (AttributeError, ValueError, TypeError, UnicodeError, binascii.Error):
+            raise InvalidToken('Malformed token')
+        if not isinstance(header, dict) or not isinstance(claims, dict):
+            raise InvalidToken('Malformed token')
+        if header.get('alg') != 'RS256':
+            raise InvalidToken('Unsupported algorithm %s' % header.get('alg'))
+        key = self.jwks.get(header.get('kid'))
+        if not key.verify(message, signature):
+            raise InvalidToken('Invalid signature')
+        if claims.get('iss') != self.issuer:
+            raise InvalidToken('Invalid issuer %s' % claims.get('iss'))
+        audience = claims.get('aud')
+        if self.audience != audience and self.audience not in (
+                audience if isinstance(audience, list) else []):
+            raise InvalidToken('Invalid audience %s' % audience)
+        self._check_times(claims)
+        return claims
+
+    def _check_times(self, claims):
+        now = self._clock()
+        expires = claims.get('exp')
+        if not isinstance(expires, numbers.Real) or now >= expires + self.leeway:
+            raise InvalidToken('Token has expired')
+        not_before = claims.get('nbf', now)
+        if not isinstance(not_before, numbers.Real) or now < not_before - self.leeway:
+            raise InvalidToken('Token is not valid yet')
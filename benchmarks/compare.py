@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Keep the benchmark baseline in the repository and compare runs against it.
+
+    python benchmarks/compare.py save current.json benchmarks/baseline.json
+    python benchmarks/compare.py check current.json benchmarks/baseline.json --threshold 10
+
+current.json is the --benchmark-json output of a pytest run. The baseline only keeps the
+timings of each benchmark, not pytest-benchmark's raw data, so it stays small enough to
+commit and review. check exits non zero if any benchmark's fastest round is more than
+threshold percent slower than the baseline's, the min being far steadier between runs on a
+busy machine than the mean.
+"""
+import argparse
+import json
+import sys
+
+STATS = ('min', 'median', 'mean', 'stddev', 'rounds')
+
+
+def load_run(path):
+    with open(path) as fp:
+        run = json.load(fp)
+    return dict((benchmark['fullname'],
+                 dict((stat, benchmark['stats'][stat]) for stat in STATS))
+                for benchmark in run['benchmarks'])
+
+
+def save(current, baseline):
+    timings = load_run(current)
+    with open(baseline, 'w') as fp:
+        json.dump({'benchmarks': timings}, fp, indent=2, sort_keys=True)
+        fp.write('\n')
+    print('saved %s benchmarks to %s' % (len(timings), baseline))
+    return 0
+
+
+def check(current, baseline, threshold):
+    timings = load_run(current)
+    with open(baseline) as fp:
+        saved = json.load(fp)['benchmarks']
+    failed = []
+    for name in sorted(timings):
+        if name not in saved:
+            print('%-60s new' % name)
+            continue
+        change = (timings[name]['min'] / saved[name]['min'] - 1) * 100
+        slower = change > threshold
+        print('%-60s %+7.1f%%%s' % (name, change, ' SLOWER' if slower else ''))
+        if slower:
+            failed.append(name)
+    if failed:
+        print('%s benchmarks are more than %s%% slower than the baseline' % (
+            len(failed), threshold))
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=['save', 'check'])
+    parser.add_argument('current')
+    parser.add_argument('baseline')
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help='the percent slower a min may be, 10 by default')
+    args = parser.parse_args(argv)
+    if args.command == 'save':
+        return save(args.current, args.baseline)
+    return check(args.current, args.baseline, args.threshold)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures for the benchmark suite, run with make bench.
+
+Everything is served from memory, either as recorded pages of users or from the local
+Auth0 emulator, so timings reflect auth0plus rather than the network.
+"""
+import json
+
+import pytest
+
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.users import User
+from auth0plus.testing.emulator import Auth0Emulator
+
+pytest.importorskip('pytest_benchmark')
+
+PER_PAGE = 50
+
+
+def make_user(n):
+    """
+    A user document shaped like the management api returns, with the nested identities
+    and metadata that make hydration and diffing expensive.
+    """
+    return {
+        'user_id': 'auth0|%024x' % n,
+        'email': u'user%05d@äcdc.com' % n,
+        'email_verified': True,
+        'username': 'user%05d' % n,
+        'nickname': 'user%05d' % n,
+        'picture': 'https://s.gravatar.com/avatar/%032x.png' % n,
+        'created_at': '2017-05-09T00:00:00.000Z',
+        'updated_at': '2017-05-09T00:00:00.000Z',
+        'last_login': '2017-05-09T00:00:00.000Z',
+        'logins_count': n,
+        'identities': [
+            {'connection': 'db', 'provider': 'auth0', 'user_id': '%024x' % n,
+             'isSocial': False}],
+        'user_metadata': {'family_name': 'Young', 'preferences': {'theme': 'dark'}},
+        'app_metadata': {'roles': ['admin', 'editor'], 'plan': 'gold',
+                         'counters': dict(('c%d' % i, i) for i in range(10))},
+    }
+
+
+class RecordedClient(object):
+    """
+    Replay pages of recorded users like RestClient.get without any http.
+    """
+
+    def __init__(self, count):
+        self.records = [make_user(n) for n in range(count)]
+
+    def get(self, url, params={}, timeout=None):
+        per_page = params.get('per_page') or len(self.records)
+        start = params.get('page', 0) * per_page
+        page = [dict(r) for r in self.records[start:start + per_page]]
+        if params.get('include_totals'):
+            return [{'start': start, 'limit': per_page, 'length': len(page),
+                     'total': len(self.records), 'users': page}]
+        return page
+
+    def post(self, url, data={}, timeout=None):
+        return data
+
+    def patch(self, url, data={}, timeout=None):
+        return data
+
+
+class RecordedResponse(object):
+
+    def __init__(self, body):
+        self.status_code = 200
+        self.headers = {}
+        self.text = json.dumps(body)
+
+
+@pytest.fixture
+def users_page():
+    return [make_user(n) for n in range(PER_PAGE)]
+
+
+@pytest.fixture
+def page_response(users_page):
+    return RecordedResponse({'start': 0, 'limit': PER_PAGE, 'length': PER_PAGE,
+                             'total': 1000, 'users': users_page})
+
+
+@pytest.fixture
+def recorded_users():
+    """
+    A User endpoint bound to 1000 recorded users.
+    """
+    return type('User', (User,), {
+        '_client': RecordedClient(1000), '_endpoint': 'https://example.com/api/v2/users'})
+
+
+@pytest.fixture
+def emulated_auth0():
+    """
+    An Auth0 instance talking to an emulator holding 500 users.
+    """
+    emulator = Auth0Emulator()
+    for n in range(500):
+        record = make_user(n)
+        record['connection'] = 'db'
+        emulator._create_user(record)
+    return Auth0('example.com', '123', default_connection='db', session=emulator.session())
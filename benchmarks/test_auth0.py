@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+from auth0plus.management.auth0p import Auth0
+
+
+def test_construct(benchmark):
+    auth0 = benchmark(Auth0, 'example.com', '123')
+    assert auth0._base_url == 'https://example.com/api/v2'
+
+
+def test_with_token_per_request(benchmark, emulated_auth0):
+    def per_request():
+        return emulated_auth0.with_token('456').users
+    assert benchmark(per_request)._client.headers['Authorization'] == 'Bearer 456'
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from auth0plus.management.queryset import QuerySet
+
+
+def test_iterate(benchmark, recorded_users):
+    def iterate():
+        return list(QuerySet(recorded_users, per_page=50, include_totals=True))
+    assert len(benchmark(iterate)) == 1000
+
+
+def test_slice_deep(benchmark, recorded_users):
+    def deep_slice():
+        return QuerySet(recorded_users, per_page=50, include_totals=True)[900:910]
+    assert len(benchmark(deep_slice)) == 10
+
+
+def test_negative_index(benchmark, recorded_users):
+    def last():
+        return QuerySet(recorded_users, per_page=50, include_totals=True)[-1]
+    assert benchmark(last).logins_count == 999
+
+
+def test_count(benchmark, recorded_users):
+    def count():
+        return QuerySet(recorded_users, per_page=50, include_totals=True).count()
+    assert benchmark(count) == 1000
+
+
+def test_iterate_emulated(benchmark, emulated_auth0):
+    def iterate():
+        return list(emulated_auth0.users.query(per_page=100))
+    assert len(benchmark(iterate)) == 500
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from auth0plus.management.rest import RestClient
+
+
+def test_process_response_page(benchmark, page_response):
+    client = RestClient('123')
+    result = benchmark(client._process_response, page_response)
+    assert len(result['users']) == 50
+
+
+class StubSession(object):
+    headers = {}
+
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def test_get_without_hooks(benchmark, page_response):
+    client = RestClient('123', session=StubSession(page_response))
+    benchmark(client.get, 'https://example.com/api/v2/users')
+
+
+def test_get_with_hook(benchmark, page_response):
+    client = RestClient('123', session=StubSession(page_response), hooks=[lambda event: None])
+    benchmark(client.get, 'https://example.com/api/v2/users')
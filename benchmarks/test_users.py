@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from auth0plus.management.base_endpoints import _build_lucene_query
+from auth0plus.management.users import User
+
+from .conftest import make_user
+
+
+def fetched_user(cls=User):
+    user = cls(**make_user(1))
+    user._fetched = True
+    user._original.update(user.as_dict(updatable_only=True))
+    return user
+
+
+def test_hydrate_page(benchmark, users_page):
+    def hydrate():
+        return [User(**record) for record in users_page]
+    assert len(benchmark(hydrate)) == 50
+
+
+def test_get_changed(benchmark):
+    user = fetched_user()
+    user.app_metadata = dict(user.app_metadata, plan='silver')
+    assert benchmark(user.get_changed) == {'app_metadata': user.app_metadata}
+
+
+def test_as_dict(benchmark):
+    user = fetched_user()
+    assert benchmark(user.as_dict)['email'] == user.email
+
+
+def test_save_payload(benchmark, recorded_users):
+    user = fetched_user(recorded_users)
+
+    def save():
+        user.email = u'bon@äcdc.com'
+        user.password = 'HighwayToHell'
+        user.save()
+        user._original['email'] = None
+    benchmark(save)
+
+
+def test_build_lucene_query(benchmark):
+    kwargs = {'email': u'*@äcdc.com', 'user_metadata.family_name': 'Young',
+              'identities.connection': 'db', 'app_metadata.plan': 'gold'}
+    assert ' AND ' in benchmark(_build_lucene_query, kwargs)
@@ -16,7 +16,8 @@ with open('HISTORY.rst') as history_file:
 
 requirements = [
     'requests',
-    'combomethod'
+    'combomethod',
+    'futures; python_version < "3"',
 ]
 
 test_requirements = [
@@ -33,7 +34,8 @@ setup(
     url='https://github.com/bretth/auth0plus',
     packages=[
         'auth0plus',
-        'auth0plus.management'
+        'auth0plus.management',
+        'auth0plus.testing'
     ],
     package_dir={'auth0plus':
                  'auth0plus'},
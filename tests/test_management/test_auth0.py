@@ -8,13 +8,16 @@ test_auth0
 Tests for `management.auth0` module.
 """
 
+import threading
 import unittest
 
-from auth0plus.management.auth0p import Auth0, _set_endpoint_attributes
+from auth0plus.management.auth0p import Auth0, _bind_endpoint
+from auth0plus.management.transports import InMemoryTransport
 from auth0plus.management.users import User
+from auth0plus.testing.emulator import Auth0Emulator
 
 
-class Test_configure_endpoint(unittest.TestCase):
+class Test_bind_endpoint(unittest.TestCase):
 
     def setUp(self):
         class Parent(object):
@@ -37,25 +40,85 @@ class Test_configure_endpoint(unittest.TestCase):
         self.childendpoint = ChildEndpoint
 
     def test_endpoint_has_attribute(self):
-        _set_endpoint_attributes(self.parent, self.endpoint, self.defaults)
-        self.assertEqual(self.endpoint.attribute, 'value')
+        bound = _bind_endpoint(self.parent, self.endpoint, self.defaults)
+        self.assertEqual(bound.attribute, 'value')
+        self.assertFalse(hasattr(self.endpoint, 'attribute'))
 
     def test_endpoint_is_attached_to_parent(self):
-        _set_endpoint_attributes(self.parent, self.endpoint, self.defaults)
-        self.assertIs(self.parent.an_endpoint, self.endpoint)
+        bound = _bind_endpoint(self.parent, self.endpoint, self.defaults)
+        self.assertIs(self.parent.an_endpoint, bound)
+        self.assertTrue(issubclass(bound, self.endpoint))
+        self.assertEqual(bound.__name__, 'Endpoint')
 
     def test_parent_with_kid(self):
-        _set_endpoint_attributes(self.parentwithkids, self.childendpoint, self.defaults)
-        self.assertIs(self.parentwithkids.child_endpoint, self.childendpoint)
+        bound = _bind_endpoint(self.parent, self.parentwithkids, self.defaults)
+        self.assertTrue(issubclass(bound.child_endpoint, self.childendpoint))
+        self.assertEqual(bound.child_endpoint.attribute, 'value')
 
     def test__endpoint_url(self):
         defaults = {'_base_url': 'https://example.com/api/v2'}
-        _set_endpoint_attributes(self.parent, self.endpoint, defaults)
-        self.assertEqual(self.endpoint._endpoint, 'https://example.com/api/v2/an-endpoint')
+        bound = _bind_endpoint(self.parent, self.endpoint, defaults)
+        self.assertEqual(bound._endpoint, 'https://example.com/api/v2/an-endpoint')
 
 
 class TestAuth0(unittest.TestCase):
 
     def test_init(self):
         auth0 = Auth0('example.com', '123')
-        self.assertIs(auth0.users, User)
+        self.assertTrue(issubclass(auth0.users, User))
+        self.assertIs(auth0.users._client, auth0._client)
+
+    def test_instances_are_independent(self):
+        acme = Auth0('acme.auth0.com', '123', default_connection='acme-db')
+        other = Auth0('other.auth0.com', '456', client_id='abc')
+        self.assertEqual(acme.users._endpoint, 'https://acme.auth0.com/api/v2/users')
+        self.assertEqual(other.users._endpoint, 'https://other.auth0.com/api/v2/users')
+        self.assertEqual(acme.users._default_connection, 'acme-db')
+        self.assertEqual(other.users._default_connection, '')
+        self.assertEqual(other.users(email='bon@acdc.com')._client_id, 'abc')
+        self.assertEqual(User._endpoint, '')
+        self.assertIsNone(User._client)
+
+    def test_endpoints_are_bound_when_first_used(self):
+        auth0 = Auth0('example.com', '123')
+        self.assertNotIn('users', auth0.__dict__)
+        self.assertIs(auth0.users, auth0.users)
+        self.assertIn('users', auth0.__dict__)
+        with self.assertRaises(AttributeError):
+            auth0.not_an_endpoint
+
+    def test_with_token(self):
+        emulator = Auth0Emulator()
+        auth0 = Auth0('example.com', '123', default_connection='db', max_retries=2,
+                      transport=emulator.transport())
+        rotated = auth0.with_token('456')
+        self.assertIs(rotated._client.transport, auth0._client.transport)
+        self.assertEqual(rotated._client.headers['Authorization'], 'Bearer 456')
+        self.assertEqual(rotated._client.max_retries, 2)
+        self.assertEqual(rotated.users._default_connection, 'db')
+        self.assertEqual(auth0.with_token('456', default_connection='other').users
+                         ._default_connection, 'other')
+
+    def test_concurrent_tokens(self):
+        seen = []
+        emulator = Auth0Emulator()
+
+        def handler(method, url, headers=None, **kwargs):
+            seen.append((threading.current_thread().name, headers['Authorization']))
+            return emulator.handle(method, url, headers=headers, **kwargs)
+
+        auth0 = Auth0('example.com', None, transport=InMemoryTransport(handler))
+
+        def request(token):
+            for n in range(10):
+                auth0.with_token(token).users.count()
+
+        threads = [threading.Thread(target=request, args=('token%s' % n,), name='token%s' % n)
+                   for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(seen), 80)
+        for name, authorization in seen:
+            self.assertEqual(authorization, 'Bearer %s' % name)
@@ -221,6 +221,14 @@ class TestQueryableMixin(TestCase):
         args, kwargs = self.mock_blq.call_args
         self.assertEqual(args[0], {'email': u"bonscott@äcdc.com"})
 
+    def test_count(self):
+        with patch.object(QueryableMixin, 'query') as mock_query:
+            mock_query.return_value.count.return_value = 3
+            self.assertEqual(QueryableMixin.count(email='b*'), 3)
+        args, kwargs = mock_query.call_args
+        self.assertEqual(kwargs['per_page'], 1)
+        self.assertTrue(kwargs['include_totals'])
+
     def test_with_custom_q_str(self):
         mockqs = QueryableMixin.query(q=u'email:"bonscott@äcdc.com"')
         # _build_lucene_query not called
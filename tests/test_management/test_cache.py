@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+
+from auth0plus.exceptions import Auth0Error
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.cache import SharedCache
+from auth0plus.management.instrumentation import trace
+from auth0plus.testing.emulator import Auth0Emulator
+
+
+class Clock(object):
+    now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fill(path, count):
+    with SharedCache(path, slots=64, slot_size=512) as cache:
+        for n in range(count):
+            cache.set('user%s' % n, {'user_id': 'auth0|%s' % n})
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'users.cache')
+
+    def cache(self, **kwargs):
+        kwargs.setdefault('slots', 64)
+        kwargs.setdefault('slot_size', 512)
+        cache = SharedCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+
+class TestSharedCache(CacheTestCase):
+
+    def test_get_set_delete(self):
+        cache = self.cache()
+        self.assertIsNone(cache.get('auth0|1'))
+        self.assertTrue(cache.set('auth0|1', {'email': u'bon@äcdc.com'}))
+        self.assertEqual(cache.get('auth0|1'), {'email': u'bon@äcdc.com'})
+        cache.set('auth0|1', {'email': u'brian@äcdc.com'})
+        self.assertEqual(cache.get('auth0|1'), {'email': u'brian@äcdc.com'})
+        cache.delete('auth0|1')
+        self.assertIsNone(cache.get('auth0|1'))
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+
+    def test_ttl(self):
+        clock = Clock()
+        cache = self.cache(ttl=10, clock=clock)
+        cache.set('auth0|1', {})
+        cache.set('auth0|2', {}, ttl=100)
+        clock.now += 11
+        self.assertIsNone(cache.get('auth0|1'))
+        self.assertEqual(cache.get('auth0|2'), {})
+
+    def test_least_recently_used_is_evicted(self):
+        clock = Clock()
+        cache = self.cache(slots=2, ways=2, clock=clock)
+        cache.set('a', 1)
+        clock.now += 1
+        cache.set('b', 2)
+        clock.now += 1
+        cache.get('a')
+        clock.now += 1
+        cache.set('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+    def test_too_large(self):
+        cache = self.cache()
+        self.assertFalse(cache.set('auth0|1', {'data': 'x' * 512}))
+        self.assertIsNone(cache.get('auth0|1'))
+
+    def test_clear(self):
+        cache = self.cache()
+        cache.set('auth0|1', {})
+        cache.clear()
+        self.assertIsNone(cache.get('auth0|1'))
+
+    def test_layout_mismatch(self):
+        self.cache()
+        with self.assertRaises(ValueError):
+            SharedCache(self.path, slots=128, slot_size=512)
+
+    def test_shared_between_processes(self):
+        cache = self.cache()
+        process = multiprocessing.get_context('fork').Process(
+            target=fill, args=(self.path, 20))
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+        self.assertEqual([cache.get('user%s' % n) for n in range(20)],
+                         [{'user_id': 'auth0|%s' % n} for n in range(20)])
+
+
+class TestCachedUsers(CacheTestCase):
+
+    def setUp(self):
+        super(TestCachedUsers, self).setUp()
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           transport=self.emulator.transport(), cache=self.cache())
+        self.user_id = self.auth0.users.create(email=u'bon@äcdc.com').get_id()
+
+    def test_get_is_cached(self):
+        with trace() as calls:
+            self.auth0.users.get(self.user_id)
+            user = self.auth0.users.get(self.user_id)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(user.email, u'bon@äcdc.com')
+        self.assertTrue(user._fetched)
+
+    def test_other_instances_share_the_cache(self):
+        self.auth0.users.get(self.user_id)
+        other = self.auth0.with_token('456')
+        with trace() as calls:
+            other.users.get(self.user_id)
+        self.assertEqual(len(calls), 0)
+
+    def test_partial_gets_are_not_cached(self):
+        with trace() as calls:
+            self.auth0.users.get(self.user_id, fields='email')
+            self.auth0.users.get(self.user_id)
+        self.assertEqual(len(calls), 2)
+
+    def test_save_invalidates(self):
+        user = self.auth0.users.get(self.user_id)
+        user.email = u'brian@äcdc.com'
+        user.save()
+        self.assertEqual(self.auth0.users.get(self.user_id).email, u'brian@äcdc.com')
+
+    def test_delete_invalidates(self):
+        self.auth0.users.get(self.user_id)
+        self.auth0.users.delete(self.user_id)
+        with self.assertRaises(Auth0Error):
+            self.auth0.users.get(self.user_id)
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from auth0plus.exceptions import Auth0Error, UnimplementedException
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.connections import Connection, ConnectionIndex
+from auth0plus.management.instrumentation import trace
+from auth0plus.management.transports import InMemoryTransport
+from auth0plus.testing.emulator import Auth0Emulator, EmulatorResponse
+
+
+class Clock(object):
+    now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConnectionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.db = self.emulator.add_connection('db')
+        self.google = self.emulator.add_connection('google-oauth2', 'google-oauth2')
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           resolve_connections=True, transport=self.emulator.transport())
+
+
+class TestConnection(ConnectionTestCase):
+
+    def test_bound(self):
+        self.assertTrue(issubclass(self.auth0.connections, Connection))
+        self.assertIs(self.auth0.connections._connections, self.auth0.users._connections)
+
+    def test_get(self):
+        self.assertEqual(self.auth0.connections.get(self.db['id']).name, 'db')
+        self.assertEqual(self.auth0.connections.get(name='google-oauth2').id,
+                         self.google['id'])
+        with self.assertRaises(Connection.DoesNotExist):
+            self.auth0.connections.get(name='nope')
+
+    def test_all(self):
+        self.assertEqual(self.auth0.connections.all().count(), 2)
+        self.assertEqual([c.name for c in self.auth0.connections.all(strategy='auth0')], ['db'])
+
+    def test_create_save_delete(self):
+        connection = self.auth0.connections.create(name='passwordless', strategy='email')
+        self.assertTrue(connection.is_database)
+        connection.options = {'disable_signup': True}
+        connection.save()
+        self.assertEqual(self.emulator.connections[connection.id]['options'],
+                         {'disable_signup': True})
+        self.auth0.connections.delete(connection.id)
+        self.assertNotIn(connection.id, self.emulator.connections)
+
+
+class TestConnectionIndex(ConnectionTestCase):
+
+    def setUp(self):
+        super(TestConnectionIndex, self).setUp()
+        self.clock = Clock()
+        self.index = ConnectionIndex(self.auth0.connections, ttl=300, clock=self.clock)
+
+    def test_lookups_are_cached(self):
+        with trace() as calls:
+            self.assertEqual(self.index['db'].id, self.db['id'])
+            self.assertEqual(self.index['google-oauth2'].strategy, 'google-oauth2')
+            self.assertIn('db', self.index)
+        self.assertEqual(len(calls), 1)
+
+    def test_ttl(self):
+        self.index.get('db')
+        self.clock.now += 301
+        with trace() as calls:
+            self.index.get('db')
+        self.assertEqual(len(calls), 1)
+
+    def test_unknown_names_refresh_at_most_once_per_interval(self):
+        self.index.get('db')
+        with trace() as calls:
+            self.assertIsNone(self.index.get('new'))
+            self.emulator.add_connection('new')
+            self.assertIsNone(self.index.get('new'))
+            self.clock.now += 31
+            self.assertEqual(self.index['new'].name, 'new')
+        self.assertEqual(len(calls), 1)
+
+    def test_changes_invalidate(self):
+        index = self.auth0.users._connections
+        self.assertIsNone(index.get('new'))
+        self.auth0.connections.create(name='new', strategy='auth0')
+        self.assertEqual(index['new'].strategy, 'auth0')
+
+
+class TestUserConnections(ConnectionTestCase):
+
+    def test_fetched_users_use_their_identity_connection(self):
+        self.emulator._create_user({'email': 'axl@gnr.com', 'connection': 'google-oauth2'})
+        user = self.auth0.users.get(email='axl@gnr.com', connection='google-oauth2')
+        self.assertEqual(user._connection, 'google-oauth2')
+        self.assertEqual(user.get_connection().strategy, 'google-oauth2')
+        self.assertEqual(self.auth0.users(email='bon@acdc.com')._connection, 'db')
+
+    def test_saves_do_not_look_up_the_connection_again(self):
+        users = [self.auth0.users.create(email=u'user%s@äcdc.com' % n) for n in range(3)]
+        with trace() as calls:
+            for user in users:
+                user.email = user.email.replace('user', 'member')
+                user.save()
+        self.assertEqual(calls.count('GET', '/api/v2/connections'), 1)
+        self.assertEqual(calls.count('PATCH'), 3)
+
+    def test_social_users(self):
+        self.emulator._create_user({'email': 'axl@gnr.com', 'connection': 'google-oauth2'})
+        user = self.auth0.users.get(email='axl@gnr.com', connection='google-oauth2')
+        user.email_verified = True
+        user.save()
+        self.assertTrue(self.emulator.users[user.get_id()]['email_verified'])
+        user.password = 'SweetChildOMine'
+        with trace() as calls:
+            with self.assertRaises(UnimplementedException):
+                user.save()
+        self.assertEqual(calls.count('PATCH'), 0)
+
+    def test_with_token_shares_the_index(self):
+        user = self.auth0.users.create(email='bon@acdc.com')
+        user.get_connection()
+        auth0 = self.auth0.with_token('456')
+        self.assertIs(auth0.users._connections, self.auth0.users._connections)
+        user = auth0.users.get(user.get_id())
+        user.email = 'brian@acdc.com'
+        with trace() as calls:
+            user.save()
+        self.assertEqual(calls.count('GET', '/api/v2/connections'), 0)
+
+    def test_lookup_failures_fall_back_to_sending_the_connection(self):
+        def forbidden():
+            raise Auth0Error(403, 'insufficient_scope',
+                             'Insufficient scope, expected any of: read:connections')
+
+        auth0 = Auth0('example.com', '123', default_connection='db', resolve_connections=True,
+                      connection_index=ConnectionIndex(forbidden),
+                      transport=self.emulator.transport())
+        user = auth0.users.create(email='bon@acdc.com')
+        user.email = 'brian@acdc.com'
+        user.save()
+        self.assertEqual(self.emulator.users[user.get_id()]['email'], 'brian@acdc.com')
+
+    def test_lookup_failures_are_not_retried_every_save(self):
+        def handle(method, url, **kwargs):
+            if url.endswith('/connections'):
+                return EmulatorResponse(403, {
+                    'statusCode': 403, 'error': 'Forbidden', 'errorCode': 'insufficient_scope',
+                    'message': 'Insufficient scope, expected any of: read:connections'})
+            return self.emulator.handle(method, url, **kwargs)
+
+        clock = Clock()
+        auth0 = Auth0('example.com', '123', default_connection='db', resolve_connections=True,
+                      connection_index=ConnectionIndex(lambda: auth0.connections, clock=clock),
+                      transport=InMemoryTransport(handle))
+        user = auth0.users.create(email='bon@acdc.com')
+        with trace() as calls:
+            for n in range(3):
+                user.email = 'brian%s@acdc.com' % n
+                user.save()
+            self.assertEqual(calls.count('GET', '/api/v2/connections'), 1)
+            self.assertEqual(self.emulator.users[user.get_id()]['email'], 'brian2@acdc.com')
+            clock.now += 31
+            user.email = 'angus@acdc.com'
+            user.save()
+        self.assertEqual(calls.count('GET', '/api/v2/connections'), 2)
+
+
+class TestConnectionsNotResolved(unittest.TestCase):
+
+    def test_saves_do_not_list_connections_by_default(self):
+        emulator = Auth0Emulator()
+        auth0 = Auth0('example.com', '123', default_connection='db',
+                      transport=emulator.transport())
+        self.assertIsNone(auth0.users._connections)
+        user = auth0.users.create(email='bon@acdc.com', password='Highway')
+        user.email = 'brian@acdc.com'
+        with trace() as calls:
+            user.save()
+        self.assertEqual(calls.count('GET', '/api/v2/connections'), 0)
+        self.assertEqual(calls.count('PATCH'), 1)
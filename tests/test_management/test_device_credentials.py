@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import time
+import unittest
+
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.blacklists import Blacklist
+from auth0plus.management.device_credentials import DeviceCredential
+from auth0plus.management.transports import InMemoryTransport
+from auth0plus.testing.emulator import Auth0Emulator, EmulatorResponse
+
+
+class RevocationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', transport=self.emulator.transport())
+        for n in range(10):
+            self.emulator.add_device_credential('auth0|%s' % n)
+            self.emulator.add_device_credential('auth0|%s' % n, client_id='mobile')
+            self.emulator.add_device_credential('auth0|%s' % n, type='public_key')
+
+
+class TestDeviceCredential(RevocationTestCase):
+
+    def test_bound(self):
+        self.assertTrue(issubclass(self.auth0.device_credentials, DeviceCredential))
+        self.assertTrue(issubclass(self.auth0.blacklists, Blacklist))
+
+    def test_all(self):
+        credentials = self.auth0.device_credentials.all(user_id='auth0|1', type='refresh_token')
+        self.assertEqual(len(list(credentials)), 2)
+        self.assertEqual(len(self.auth0.device_credentials.all(per_page=7)[:]), 30)
+
+    def test_delete(self):
+        credential = self.auth0.device_credentials.all(user_id='auth0|1')[0]
+        credential.delete()
+        self.assertNotIn(credential.id, self.emulator.device_credentials)
+
+    def test_revoke(self):
+        user_ids = ['auth0|%s' % n for n in range(5)]
+        progress = []
+        results = list(self.auth0.device_credentials.revoke(
+            user_ids, workers=4, on_progress=progress.append))
+        self.assertEqual(len(results), 10)
+        self.assertFalse([result for result in results if result.error])
+        self.assertEqual(progress[-1].done, 5)  # users
+        # one listing per user and no count probes
+        self.assertEqual(self.emulator.requests.count(('GET', '/api/v2/device-credentials')), 5)
+        remaining = list(self.emulator.device_credentials.values())
+        self.assertEqual(len(remaining), 20)
+        self.assertFalse([c for c in remaining
+                          if c['type'] == 'refresh_token' and c['user_id'] in user_ids])
+
+    def test_revoke_for_a_client(self):
+        list(self.auth0.device_credentials.revoke(['auth0|1'], client_id='mobile'))
+        self.assertEqual(len(self.emulator.device_credentials), 29)
+
+    def test_revoke_is_concurrent(self):
+        self.emulator.latency = 0.02
+        started = time.time()
+        results = list(self.auth0.device_credentials.revoke(
+            ['auth0|%s' % n for n in range(10)], workers=10))
+        self.assertEqual(len(results), 20)
+        self.assertLess(time.time() - started, 30 * 0.02)  # 10 listings and 20 deletes
+
+    def test_revoke_backs_off_when_rate_limited(self):
+        rejected = []
+
+        def handle(method, url, **kwargs):
+            if method == 'DELETE' and len(rejected) < 3:
+                rejected.append(url)
+                return EmulatorResponse(429, {'statusCode': 429, 'error': 'Too Many Requests',
+                                              'message': 'Global limit has been reached',
+                                              'errorCode': 'too_many_requests'})
+            return self.emulator.handle(method, url, **kwargs)
+
+        auth0 = Auth0('example.com', '123', transport=InMemoryTransport(handle))
+        results = list(auth0.device_credentials.revoke(
+            ['auth0|%s' % n for n in range(10)], workers=1, backoff=0.001))
+        self.assertEqual(len(rejected), 3)
+        self.assertEqual(len(results), 20)
+        self.assertFalse([result for result in results if result.error])
+        self.assertEqual(len(self.emulator.device_credentials), 10)
+
+
+class TestBlacklist(RevocationTestCase):
+
+    def test_add(self):
+        self.auth0.blacklists.add('jti-1', aud='api')
+        self.auth0.blacklists.add('jti-2')
+        self.assertEqual([t.jti for t in self.auth0.blacklists.all(aud='api')], ['jti-1'])
+        self.assertEqual(len(self.auth0.blacklists.all()), 2)
+
+    def test_add_all(self):
+        results = list(self.auth0.blacklists.add_all(
+            ['jti-%s' % n for n in range(20)], aud='api', workers=4))
+        self.assertEqual(len(results), 20)
+        self.assertEqual(len(self.emulator.blacklist), 20)
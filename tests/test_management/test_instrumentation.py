@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from mock import Mock, patch
+
+from auth0plus.management import instrumentation
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.instrumentation import (
+    OpenTelemetryHook,
+    PageEvent,
+    PrometheusHook,
+    RequestEvent,
+    add_hook,
+    endpoint_template,
+    operation,
+    remove_hook,
+    trace)
+from auth0plus.management.queryset import QuerySet
+from auth0plus.management.rest import RestClient
+from auth0plus.management.users import User
+from auth0plus.testing.emulator import Auth0Emulator
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+try:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+except ImportError:  # pragma: no cover
+    TracerProvider = None
+
+URL = 'https://example.com/api/v2/users'
+
+
+class TestEndpointTemplate(unittest.TestCase):
+
+    def test_ids_replaced(self):
+        self.assertEqual(endpoint_template(URL + '/auth0%7C59125e'), '/api/v2/users/{id}')
+        self.assertEqual(endpoint_template(URL), '/api/v2/users')
+        self.assertEqual(
+            endpoint_template('https://example.com/api/v2/stats/active-users'),
+            '/api/v2/stats/active-users')
+
+
+class TestRestClientHooks(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator(rate_limit=(100, 60))
+        self.events = []
+        self.client = RestClient(
+            '123', session=self.emulator.session(), hooks=[self.events.append])
+
+    def test_request_event(self):
+        self.client.post(URL, {'email': 'bon@äcdc.com', 'connection': 'db'})
+        event = self.events[0]
+        self.assertEqual(event.method, 'POST')
+        self.assertEqual(event.endpoint, '/api/v2/users')
+        self.assertEqual(event.status_code, 201)
+        self.assertEqual(event.rate_limit_remaining, 99)
+        self.assertEqual(event.retries, 0)
+        self.assertTrue(event.bytes > 0)
+        self.assertTrue(event.latency >= 0)
+
+    def test_error_event(self):
+        self.client.transport.request = Mock(side_effect=ValueError)
+        with self.assertRaises(ValueError):
+            self.client.get(URL)
+        self.assertIsNone(self.events[0].status_code)
+        self.assertIsInstance(self.events[0].error, ValueError)
+
+    def test_broken_hook_does_not_break_request(self):
+        self.client.add_hook(Mock(side_effect=ValueError))
+        self.assertEqual(self.client.get(URL), [])
+
+    def test_global_hook(self):
+        events = []
+        add_hook(events.append)
+        self.addCleanup(remove_hook, events.append)
+        RestClient('123', session=self.emulator.session()).get(URL)
+        self.assertEqual(len(events), 1)
+
+    @patch('auth0plus.management.rest.time.sleep')
+    def test_retries(self, sleep):
+        self.emulator.rate_limit = (1, 60)
+        self.client.max_retries = 2
+        self.client.get(URL)
+        with self.assertRaises(Exception):
+            self.client.get(URL)
+        self.assertEqual(self.events[-1].retries, 2)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_queryset_page_events(self):
+        for n in range(3):
+            self.client.post(URL, {'email': 'user%s@äcdc.com' % n, 'connection': 'db'})
+
+        class EndPoint(object):
+            _endpoint = URL
+            _path = 'users'
+            _client = self.client
+
+            def __init__(self, **kwargs):
+                self.__dict__.update(kwargs)
+        del self.events[:]
+        list(QuerySet(EndPoint, per_page=2, include_totals=True))
+        pages = [e for e in self.events if e.kind == 'page']
+        self.assertEqual([(p.page, p.records) for p in pages], [(0, 2), (1, 1)])
+
+    def test_no_hooks_no_events(self):
+        with patch.object(instrumentation, 'RequestEvent') as event:
+            RestClient('123', session=self.emulator.session()).get(URL)
+        self.assertFalse(event.called)
+
+
+class TestTrace(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           session=self.emulator.session())
+
+    def tearDown(self):
+        User._default_connection = ''
+
+    def test_save_split(self):
+        user = self.auth0.users.create(email='bon@äcdc.com', password='HighwayToHell')
+        user.password = 'Jailbreak'
+        user.email = 'brian@äcdc.com'
+        user.username = 'brian'
+        with trace() as calls:
+            user.save()
+        self.assertEqual(calls.count('PATCH', '/api/v2/users/{id}'), 3)
+        self.assertEqual([op.name for op in calls.operations], ['User.save'])
+        self.assertEqual(len(calls.operations[0].calls), 3)
+        self.assertTrue(calls.operations[0].duration >= 0)
+
+    def test_nested_operations(self):
+        with trace() as calls:
+            self.auth0.users.get_or_create(email='bon@äcdc.com')
+        names = [(op.name, op.depth) for op in calls.operations]
+        self.assertEqual(names[:2], [('User.get_or_create', 0), ('User.get', 1)])
+        self.assertIn(('User.save', 2), names)
+        self.assertEqual(len(calls), 2)  # one probing GET and one POST
+        listing = calls.format()
+        self.assertIn('User.get_or_create', listing)
+        self.assertIn('    POST https://example.com/api/v2/users 201', listing)
+
+    def test_iteration(self):
+        for n in range(5):
+            self.auth0.users.create(email='user%s@äcdc.com' % n)
+        with trace() as calls:
+            list(self.auth0.users.query(per_page=2))
+        self.assertEqual([op.name for op in calls.operations], ['User.query'] * 3)
+        self.assertEqual(calls.count('GET'), 3)
+
+    def test_custom_operation(self):
+        with trace() as calls:
+            with operation('report'):
+                self.auth0.users.count()
+        self.assertEqual(calls.operations[0].name, 'report')
+        self.assertEqual(calls.calls[0].operation, 'User.count')
+
+    def test_inactive(self):
+        self.auth0.users.create(email='bon@äcdc.com')
+        with operation('ignored') as record:
+            self.assertIsNone(record)
+
+
+@unittest.skipIf(prometheus_client is None, 'prometheus_client is not installed')
+class TestPrometheusHook(unittest.TestCase):
+
+    def test_observe(self):
+        registry = prometheus_client.CollectorRegistry()
+        hook = PrometheusHook(registry=registry)
+        hook(RequestEvent('GET', URL + '/1', 200, 10, 0, 0.2, retries=1,
+                          rate_limit_remaining=5))
+        hook(PageEvent('users', 0, 50, 0, 0.3))
+        labels = {'method': 'GET', 'endpoint': '/api/v2/users/{id}', 'status': '200'}
+        self.assertEqual(
+            registry.get_sample_value('auth0plus_request_seconds_count', labels), 1)
+        self.assertEqual(
+            registry.get_sample_value('auth0plus_page_seconds_sum', {'path': 'users'}), 0.3)
+        self.assertEqual(registry.get_sample_value('auth0plus_rate_limit_remaining'), 5)
+
+
+@unittest.skipIf(TracerProvider is None, 'opentelemetry-sdk is not installed')
+class TestOpenTelemetryHook(unittest.TestCase):
+
+    def test_span(self):
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        hook = OpenTelemetryHook(provider.get_tracer('test'))
+        hook(RequestEvent('GET', URL, 404, 10, 1000.0, 0.25))
+        span = exporter.get_finished_spans()[0]
+        self.assertEqual(span.name, 'auth0 GET /api/v2/users')
+        self.assertEqual(span.attributes['http.status_code'], 404)
+        self.assertEqual(span.end_time - span.start_time, 250000000)
+        self.assertFalse(span.status.is_ok)
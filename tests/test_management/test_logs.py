@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.logs import FileCursor, Log, MemoryCursor
+from auth0plus.testing.emulator import Auth0Emulator
+
+
+class TestLog(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', transport=self.emulator.transport())
+        self.ids = [self.emulator.add_log('f' if n % 3 else 's', user_id='auth0|%s' % n)['_id']
+                    for n in range(10)]
+
+    def test_bound(self):
+        self.assertTrue(issubclass(self.auth0.logs, Log))
+        self.assertEqual(self.auth0.logs._endpoint, 'https://example.com/api/v2/logs')
+
+    def test_get(self):
+        log = self.auth0.logs.get(self.ids[3])
+        self.assertEqual(log.get_id(), self.ids[3])
+        self.assertEqual(log.user_id, 'auth0|3')
+
+    def test_query(self):
+        self.assertEqual(self.auth0.logs.count(q='type:s'), 4)
+        logs = self.auth0.logs.query(q='type:f', per_page=2)
+        self.assertEqual([log.user_id for log in logs[:3]], ['auth0|8', 'auth0|7', 'auth0|5'])
+
+    def test_after(self):
+        self.assertEqual([log.get_id() for log in self.auth0.logs.after(take=3)],
+                         self.ids[:3])
+        self.assertEqual([log.get_id() for log in self.auth0.logs.after(self.ids[7])],
+                         self.ids[8:])
+
+
+class Waits(object):
+
+    def __init__(self, emulator, arrivals):
+        self.emulator = emulator
+        self.arrivals = list(arrivals)
+        self.waits = []
+
+    def __call__(self, seconds):
+        self.waits.append(seconds)
+        if not self.arrivals:
+            return True  # stop
+        for n in range(self.arrivals.pop(0)):
+            self.emulator.add_log()
+        return False
+
+
+class TestLogTail(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', transport=self.emulator.transport())
+        for n in range(25):
+            self.emulator.add_log()
+
+    def ids(self, batches):
+        return [log.get_id() for batch in batches for log in batch]
+
+    def test_reads_everything_in_order(self):
+        batches = list(self.auth0.logs.tail(take=10).batches(follow=False))
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        self.assertEqual(self.ids(batches), [log['_id'] for log in self.emulator.logs])
+
+    def test_backoff_when_caught_up(self):
+        waits = Waits(self.emulator, [0, 0, 3, 0, 0, 0, 0, 0])
+        batches = []
+        tail = self.auth0.logs.tail(take=10, min_wait=1, max_wait=8, wait=waits)
+        tail.run(batches.append)
+        self.assertEqual(waits.waits, [1, 2, 4, 1, 2, 4, 8, 8, 8])
+        self.assertEqual(len(self.ids(batches)), 28)
+        self.assertEqual(len(set(self.ids(batches))), 28)
+
+    def test_resumes_without_gaps_or_duplicates(self):
+        cursor = MemoryCursor()
+        tail = self.auth0.logs.tail(cursor, take=10)
+        handled = []
+        for batch in tail.batches():
+            handled.append(batch)
+            if len(handled) == 2:
+                break  # abandoned before it was handled
+        handled.pop()
+        self.emulator.add_log()
+        handled.extend(self.auth0.logs.tail(cursor, take=10).batches(follow=False))
+        self.assertEqual(self.ids(handled), [log['_id'] for log in self.emulator.logs])
+
+    def test_stop(self):
+        tail = self.auth0.logs.tail(take=10)
+        batches = []
+
+        def handle(batch):
+            batches.append(batch)
+            tail.stop()
+
+        tail.run(handle)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(tail.cursor.get(), batches[0][-1].get_id())
+
+    def test_file_cursor(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        cursor = FileCursor(os.path.join(directory, 'logs.cursor'))
+        self.assertIsNone(cursor.get())
+        list(self.auth0.logs.tail(cursor, take=10).batches(follow=False))
+        self.assertEqual(FileCursor(cursor.path).get(), self.emulator.logs[-1]['_id'])
+        self.assertEqual(os.listdir(directory), ['logs.cursor'])
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from auth0plus.exceptions import InvalidQuery
+from auth0plus.management import lucene
+from auth0plus.management.users import User
+
+BON = {
+    'user_id': 'auth0|1',
+    'email': u'Bon@äcdc.com',
+    'blocked': False,
+    'logins_count': 5,
+    'updated_at': '2017-05-03T10:00:00.000Z',
+    'identities': [{'connection': 'db'}, {'connection': 'google-oauth2'}],
+    'app_metadata': {'plan': 'gold', 'tags': ['singer', 'scot']},
+}
+
+
+class TestLucene(unittest.TestCase):
+
+    def assertMatches(self, q, record=BON):
+        self.assertTrue(lucene.match(q, record), q)
+
+    def assertNotMatches(self, q, record=BON):
+        self.assertFalse(lucene.match(q, record), q)
+
+    def test_terms(self):
+        self.assertMatches(u'email:"bon@äcdc.com"')
+        self.assertMatches(u'email:bon@äcdc.com')
+        self.assertNotMatches(u'email:"bon@acdc.com"')
+        self.assertMatches('blocked:false')
+        self.assertMatches('logins_count:5')
+        self.assertMatches('app_metadata.tags:scot')
+        self.assertMatches('identities.connection:google-oauth2')
+
+    def test_wildcards(self):
+        self.assertMatches('email:*cdc.com')
+        self.assertMatches('email:b?n*')
+        self.assertNotMatches('email:"b?n*"')
+        self.assertMatches('identities.connection:goo*')
+
+    def test_ranges(self):
+        self.assertMatches('logins_count:[5 TO 10]')
+        self.assertNotMatches('logins_count:{5 TO 10]')
+        self.assertMatches('logins_count:[* TO 10}')
+        self.assertMatches('updated_at:[2017-05-01 TO 2017-05-03]')
+        self.assertNotMatches('updated_at:{2017-05-03 TO *]')
+        self.assertMatches('updated_at:[2017-05-03T09:00 TO *]')
+        self.assertMatches('updated_at:["2017-05-03T10:00:00.000Z" TO *]')
+
+    def test_operators(self):
+        self.assertMatches('email:x OR app_metadata.plan:gold')
+        self.assertMatches('email:x app_metadata.plan:gold')
+        self.assertNotMatches('email:x AND app_metadata.plan:gold')
+        self.assertMatches('NOT email:x && !blocked:true')
+        self.assertMatches('-email:x +app_metadata.plan:gold')
+        self.assertMatches('app_metadata.plan:(silver OR gold) AND (email:x OR blocked:false)')
+        self.assertNotMatches('email:b* AND NOT (app_metadata.plan:gold OR blocked:true)')
+        self.assertMatches('_exists_:app_metadata.plan')
+        self.assertNotMatches('_exists_:user_metadata')
+
+    def test_prohibited_and_required_clauses(self):
+        self.assertNotMatches('blocked:false -logins_count:5')
+        self.assertNotMatches('blocked:false NOT logins_count:5')
+        self.assertMatches('blocked:false -logins_count:6')
+        self.assertNotMatches('+email:x blocked:false')
+        self.assertMatches('+blocked:false email:x')
+        self.assertNotMatches('email:x OR NOT blocked:true')  # as email:x -blocked:true
+        users = [dict(BON, logins_count=n, blocked=n == 2) for n in range(4)]
+        self.assertEqual([u['logins_count'] for u in lucene.filter(
+            users, q='blocked:false -logins_count:1')], [0, 3])
+        self.assertEqual([u['logins_count'] for u in lucene.filter(
+            users, q='blocked:false NOT logins_count:1')], [0, 3])
+        self.assertEqual([u['logins_count'] for u in lucene.filter(
+            users, q='+logins_count:[1 TO 2] blocked:true')], [1, 2])
+
+    def test_and_binds_tighter_than_or(self):
+        self.assertMatches('email:x AND blocked:true OR logins_count:5')
+        self.assertNotMatches('email:x AND (blocked:true OR logins_count:5)')
+
+    def test_invalid(self):
+        for q in ['email:', '(email:x', 'bon', 'email:x AND', 'email:x)',
+                  'logins_count:[1 TO']:
+            with self.assertRaises(InvalidQuery):
+                lucene.compile(q)
+
+    def test_users_and_kwargs(self):
+        users = [User(**BON), User(user_id='auth0|2', email='angus@acdc.com')]
+        self.assertEqual(list(lucene.filter(users, email='bon*')), users[:1])
+        self.assertEqual(list(lucene.filter(users, q='NOT _exists_:blocked')), users[1:])
+        self.assertEqual(list(lucene.filter(users)), users)
+
+    def test_required(self):
+        query = lucene.compile('email:b* AND (blocked:false OR logins_count:5) AND user_id:1')
+        self.assertEqual([(term.field, term.value) for term in query.required()],
+                         [('email', 'b*'), ('user_id', '1')])
+        self.assertEqual(lucene.compile('email:b* OR user_id:1').required(), [])
+        query = lucene.compile('+email:b* blocked:false -user_id:1')
+        self.assertEqual([(term.field, term.value) for term in query.required()],
+                         [('email', 'b*')])
+
+    def test_compiled_queries_are_reused(self):
+        self.assertIs(lucene.compile('email:b*'), lucene.compile('email:b*'))
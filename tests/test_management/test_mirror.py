@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from auth0plus.exceptions import MultipleObjectsReturned
+from auth0plus.management import mirror
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.instrumentation import trace
+from auth0plus.management.mirror import UserMirror
+from auth0plus.testing.emulator import Auth0Emulator
+
+
+class Clock(object):
+    now = 1500000000.0
+
+    def __call__(self):
+        self.now += 1
+        return self.now
+
+
+class TestUserMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator(clock=Clock())
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           transport=self.emulator.transport())
+        for name in ['bon', 'brian', 'angus']:
+            self.auth0.users.create(email=u'%s@äcdc.com' % name,
+                                    app_metadata={'band': 'acdc'})
+        self.auth0.users.create(email=u'axl@gnr.com', connection='social',
+                                app_metadata={'band': 'gnr'})
+        self.mirror = UserMirror(self.auth0.users, per_page=2)
+        self.addCleanup(self.mirror.close)
+
+    def test_initial_load(self):
+        self.assertEqual(self.mirror.sync(), 4)
+        self.assertEqual(len(self.mirror), 4)
+        self.assertEqual(self.mirror.last_updated,
+                         max(user['updated_at'] for user in self.emulator.users.values()))
+
+    def test_incremental_pull(self):
+        self.mirror.sync()
+        user = self.auth0.users.get(email=u'bon@äcdc.com')
+        user.app_metadata = {'band': 'fraternity'}
+        user.save()
+        self.auth0.users.create(email=u'malcolm@äcdc.com')
+        self.assertEqual(self.mirror.sync(), 3)  # including axl, the last user synced
+        self.assertEqual(len(self.mirror), 5)
+        self.assertEqual(self.mirror.get(user.get_id()).app_metadata, {'band': 'fraternity'})
+
+    def test_windows(self):
+        self.addCleanup(setattr, mirror, 'SEARCH_WINDOW', mirror.SEARCH_WINDOW)
+        mirror.SEARCH_WINDOW = 3
+        self.assertEqual(self.mirror.sync(), 5)  # the last of each window is read again
+        self.assertEqual(len(self.mirror), 4)
+
+    def test_full_sync_drops_deleted_users(self):
+        self.mirror.sync()
+        user = self.auth0.users.get(email=u'angus@äcdc.com')
+        self.auth0.users.delete(user.get_id())
+        self.mirror.sync()
+        self.assertEqual(len(self.mirror), 4)
+        self.mirror.sync(full=True)
+        self.assertEqual(len(self.mirror), 3)
+
+    def test_reads_do_not_call_auth0(self):
+        self.mirror.sync()
+        with trace() as calls:
+            user = self.mirror.get(email=u'BON@äcdc.com')
+            self.assertEqual(self.mirror.count(connection='db'), 3)
+            self.assertEqual(
+                [u.email for u in self.mirror.query(email='b*', sort='email:1')],
+                [u'bon@äcdc.com', u'brian@äcdc.com'])
+            self.assertEqual(len(self.mirror.query(**{'app_metadata.band': 'gnr'})), 1)
+            self.assertEqual(self.mirror.count(**{'identities.connection': 'soc*'}), 1)
+        self.assertEqual(len(calls), 0)
+        self.assertIsInstance(user, self.auth0.users)
+        self.assertTrue(user._fetched)
+
+    def test_get(self):
+        self.mirror.sync()
+        with self.assertRaises(self.auth0.users.DoesNotExist):
+            self.mirror.get(email='malcolm@acdc.com')
+        with self.assertRaises(MultipleObjectsReturned):
+            self.mirror.get(connection='db')
+
+    def test_mirrored_users_save(self):
+        self.mirror.sync()
+        user = self.mirror.get(email=u'axl@gnr.com')
+        user.email_verified = True
+        user.save()
+        self.assertTrue(self.emulator.users[user.get_id()]['email_verified'])
+
+    def test_bad_sort(self):
+        with self.assertRaises(ValueError):
+            self.mirror.query(sort='app_metadata:1')
+
+    def test_resumes_from_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'users.db')
+        with UserMirror(self.auth0.users, path) as first:
+            first.sync()
+        with UserMirror(self.auth0.users, path) as second:
+            self.assertEqual(len(second), 4)
+            self.assertEqual(second.sync(), 1)
+
+    def test_lucene_queries(self):
+        self.mirror.sync()
+        self.assertEqual(
+            len(self.mirror.query(q='app_metadata.band:(gnr OR acdc) AND NOT email:b*')), 2)
+        self.assertEqual(self.mirror.count(q='email:*@äcdc.com AND app_metadata.band:acdc'), 3)
+        self.assertEqual(self.mirror.count(q='_exists_:app_metadata'), 4)
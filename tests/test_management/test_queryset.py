@@ -65,6 +65,7 @@ class TestQuerySet(unittest.TestCase):
     def test_init_with_include_totals(self):
         self.cls._client.get.return_value = [dict(f1)]
         qs = QuerySet(self.cls, per_page=50, include_totals=True)
+        qs._evaluate()
         self.assertEqual(qs._total, 3)
         self.assertEqual(qs._limit, 50)
         self.assertEqual(qs._len, 3)
@@ -73,11 +74,13 @@ class TestQuerySet(unittest.TestCase):
     def test_init_without_include_totals(self):
         self.cls._client.get.return_value = f2
         qs = QuerySet(self.cls, per_page=50, include_totals=False)
+        qs._evaluate()
         self.assertEqual(qs._total, -1)
 
     def test_when_total_exceeds_length(self):
         self.cls._client.get.return_value = f3a
         qs = QuerySet(self.cls, per_page=2, include_totals=True)
+        qs._evaluate()
         self.assertEqual(qs._total, 3)
         self.assertEqual(qs._len, 2)
         # the unconsumed response should have 2 records in it
@@ -97,6 +100,61 @@ class TestQuerySet(unittest.TestCase):
         # include_totals should be removed from any remaining response
         self.assertNotIn('include_totals', args[1].keys())
 
+    def test_lazy(self):
+        qs = QuerySet(self.cls, per_page=50)
+        self.assertFalse(self.cls._client.get.called)
+        qs = qs.filter(email='bon@äcdc.com').order_by('-created_at').per_page(10)
+        self.assertFalse(self.cls._client.get.called)
+        list(qs)
+        self.assertEqual(self.cls._client.get.call_count, 1)
+
+    def test_count_unevaluated_probes(self):
+        self.cls._client.get.return_value = [dict(f3a[0], users=[])]
+        qs = QuerySet(self.cls, per_page=50, include_totals=True)
+        self.assertEqual(qs.count(), 3)
+        args, kwargs = self.cls._client.get.call_args
+        self.assertEqual(args[1]['per_page'], 1)
+        self.assertFalse(qs._evaluated)
+
+    def test_bool(self):
+        self.cls._client.get.return_value = []
+        self.assertFalse(QuerySet(self.cls, per_page=50))
+        self.cls._client.get.return_value = [{'email': 'bon@äcdc.com'}]
+        self.assertTrue(QuerySet(self.cls, per_page=50))
+
+    def test_list(self):
+        self.cls._client.get.return_value = [dict(f1, users=list(f1['users']))]
+        qs = QuerySet(self.cls, per_page=50, include_totals=True)
+        self.assertEqual(len(list(qs)), 3)
+        self.assertEqual(self.cls._client.get.call_count, 1)
+        with self.assertRaises(TypeError):  # count() is the way to the total
+            len(qs)
+
+    def test_filter(self):
+        qs = QuerySet(self.cls, q='identities.connection:"db"')
+        self.assertEqual(
+            qs.filter(email='bon@äcdc.com')._params['q'],
+            'identities.connection:"db" AND email:"bon@äcdc.com"')
+        qs = QuerySet(self.cls, q='email:"a" OR email:"b"')
+        self.assertEqual(
+            qs.filter(name='Bon')._params['q'],
+            '(email:"a" OR email:"b") AND name:"Bon"')
+        self.assertEqual(QuerySet(self.cls).filter(name='Bon')._params['q'], 'name:"Bon"')
+
+    def test_filter_v1_unimplemented(self):
+        with self.assertRaises(UnimplementedException):
+            QuerySet(self.cls, search_engine='v1').filter(name='Bon')
+
+    def test_order_by(self):
+        qs = QuerySet(self.cls)
+        self.assertEqual(qs.order_by('email')._params['sort'], 'email:1')
+        self.assertEqual(qs.order_by('-created_at')._params['sort'], 'created_at:-1')
+
+    def test_per_page(self):
+        qs = QuerySet(self.cls, per_page=50).per_page(10)
+        self.assertEqual(qs._per_page, 10)
+        self.assertEqual(qs._params['per_page'], 10)
+
     def test__getitem__raises_typeerror(self):
         with self.assertRaises(TypeError):
             qs = QuerySet(self.cls, per_page=50)
@@ -121,6 +179,24 @@ class TestQuerySet(unittest.TestCase):
         qs = QuerySet(self.cls, include_totals=True)
         self.assertEqual(qs.count(), 3)
 
+    def test_count_probes_for_totals(self):
+        self.cls._client.get.return_value = list(f3a[0]['users'])
+        qs = QuerySet(self.cls, per_page=2)
+        qs._evaluate()
+        self.cls._client.get.return_value = [dict(f3a[0])]
+        self.assertEqual(qs.count(), 3)
+        args, kwargs = self.cls._client.get.call_args
+        self.assertEqual(args[1]['per_page'], 1)
+        self.assertTrue(args[1]['include_totals'])
+        # the probe record is never turned into an instance
+        self.assertEqual(qs._cached, [])
+
+    def test_slice_does_not_fetch_next_page(self):
+        self.cls._client.get.return_value = list(f3a[0]['users'])
+        qs = QuerySet(self.cls, per_page=2)
+        self.assertEqual(len(qs[:2]), 2)
+        self.assertEqual(self.cls._client.get.call_count, 1)
+
     def test_include_totals_unimplemented(self):
         self.cls._client.get.return_value = [{"email": "malcolm@äcdc.com"}]
         with self.assertRaises(UnimplementedException):
@@ -144,4 +220,111 @@ class TestQuerySet(unittest.TestCase):
             qs.next()
 
 
+class PagedClient(object):
+    """
+    Serve records a page at a time like the users endpoint, recording each request.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def get(self, url, params):
+        params = dict(params)
+        self.calls.append(params)
+        per_page = params.get('per_page') or len(self.records)
+        start = params.get('page', 0) * per_page
+        page = [dict(r) for r in self.records[start:start + per_page]]
+        if params.get('include_totals'):
+            return [{'start': start, 'limit': per_page, 'length': len(page),
+                     'total': len(self.records), 'users': page}]
+        return page
+
+
+class TestQuerySetPageSlicing(unittest.TestCase):
+
+    def setUp(self):
+        class EndPoint(object):
+            _endpoint = '/users'
+            _path = 'users'
+            _client = PagedClient([{'n': n} for n in range(250)])
+
+            def __init__(self, **kwargs):
+                self.__dict__.update(kwargs)
+        self.cls = EndPoint
+        self.client = EndPoint._client
+        self.qs = QuerySet(EndPoint, per_page=50, include_totals=True)
+
+    def test_list_without_totals_never_probes(self):
+        self.client.records = self.client.records[:5]
+        qs = QuerySet(self.cls, per_page=2, include_totals=False)
+        self.assertEqual([u.n for u in list(qs)], [0, 1, 2, 3, 4])
+        self.assertEqual([c.get('page', 0) for c in self.client.calls], [0, 1, 2])
+        self.assertFalse([c for c in self.client.calls if c.get('include_totals')])
+
+    def test_slice_fetches_covering_page(self):
+        self.assertEqual([u.n for u in self.qs[120:125]], [120, 121, 122, 123, 124])
+        self.assertEqual([c['page'] for c in self.client.calls], [2])
+        self.assertEqual(self.qs._cached, [])
+
+    def test_slice_across_pages(self):
+        self.assertEqual([u.n for u in self.qs[148:152]], [148, 149, 150, 151])
+        self.assertEqual([c['page'] for c in self.client.calls], [2, 3])
+
+    def test_negative_index(self):
+        self.assertEqual(self.qs[-1].n, 249)
+        # one probe for the total and one for the last page
+        self.assertEqual(len(self.client.calls), 2)
+        self.assertEqual(self.client.calls[0]['per_page'], 1)
+        self.assertEqual(self.client.calls[1]['page'], 4)
+
+    def test_negative_slice(self):
+        self.assertEqual([u.n for u in self.qs[-3:]], [247, 248, 249])
+        self.assertEqual([u.n for u in self.qs[-10::4]], [240, 244, 248])
+
+    def test_index_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.qs[250]
+        with self.assertRaises(IndexError):
+            self.qs[-251]
+
+    def test_start_page(self):
+        qs = QuerySet(self.cls, per_page=50, page=2, include_totals=True)
+        self.assertEqual(qs[0].n, 100)
+        self.assertEqual(qs[-1].n, 249)
+
+    def test_records_are_cached(self):
+        self.assertIs(self.qs[200], self.qs[200])
+        self.assertEqual(len(self.client.calls), 1)
+
+    def test_first_page_iterates(self):
+        self.assertEqual(self.qs[1].n, 1)
+        self.assertEqual(len(self.qs._cached), 2)
+        self.assertEqual(self.qs[60].n, 60)  # the next page is iterated into
+        self.assertEqual(len(self.qs._cached), 61)
+        self.assertEqual(len(self.client.calls), 2)
+
+    def test_iteration_reuses_fetched_pages(self):
+        self.qs[120]
+        self.assertEqual(len([u for u in self.qs]), 250)
+        self.assertEqual([c.get('page', 0) for c in self.client.calls], [2, 0, 1, 3, 4, 5])
+
+    def test_slices_reuse_the_current_page_and_iteration_their_records(self):
+        self.qs[9]
+        records = self.qs[45:205:40]
+        self.assertEqual([u.n for u in records], [45, 85, 125, 165])
+        self.assertEqual([c.get('page', 0) for c in self.client.calls], [0, 1, 2, 3])
+        self.assertEqual(len(list(self.qs)), 240)  # the rest after the first ten
+        self.assertEqual([c.get('page', 0) for c in self.client.calls], [0, 1, 2, 3, 4, 5])
+        self.assertTrue(all(self.qs._cached[n] is r for n, r in zip((45, 85, 125, 165), records)))
+        self.assertEqual((self.qs._pages, self.qs._random), ({}, {}))
+
+    def test_iteration_reuses_a_fetched_first_page(self):
+        qs = QuerySet(self.cls, per_page=50)
+        first = qs[0:200:50]
+        self.assertEqual([u.n for u in first], [0, 50, 100, 150])
+        self.assertEqual(len(list(qs)), 250)
+        self.assertEqual([c.get('page', 0) for c in self.client.calls], [0, 1, 2, 3, 4, 5])
+        self.assertIs(qs._cached[0], first[0])
+        self.assertIs(qs._cached[150], first[3])
 
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+
+from six.moves.urllib.parse import urlsplit
+
+from auth0plus.exceptions import Auth0Error
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.ratelimit import RateLimiter
+from auth0plus.management.registry import TenantRegistry
+from auth0plus.management.transports import InMemoryTransport, RequestsTransport
+from auth0plus.management.users import User
+from auth0plus.oauth import TokenManager
+from auth0plus.testing.emulator import Auth0Emulator, EmulatorResponse
+
+DOMAINS = ['acme.auth0.com', 'globex.auth0.com', 'initech.auth0.com']
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TenantTransport(InMemoryTransport):
+    """
+    Route each request to the emulator for its domain.
+    """
+
+    def __init__(self, emulators):
+        super(TenantTransport, self).__init__(self.handle)
+        self.emulators = emulators
+
+    def handle(self, method, url, **kwargs):
+        return self.emulators[urlsplit(url).netloc].handle(method, url, **kwargs)
+
+
+class TestTenantRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.emulators = dict((domain, Auth0Emulator()) for domain in DOMAINS)
+        self.tenants = TenantRegistry(transport=TenantTransport(self.emulators))
+        for domain in DOMAINS:
+            self.tenants.register(domain.split('.')[0], domain, client_id='abc',
+                                  client_secret='secret', default_connection='db')
+
+    def test_tenants_are_bound_separately(self):
+        acme, globex = self.tenants['acme'], self.tenants['globex']
+        self.assertIsNot(acme.users, globex.users)
+        self.assertIs(acme._client.transport, globex._client.transport)
+        self.assertEqual(User._client, None)
+        acme.users.create(email=u'bon@äcdc.com')
+        self.assertEqual(acme.users.count(), 1)
+        self.assertEqual(globex.users.count(), 0)
+
+    def test_concurrent_tenants(self):
+        def work(name, n):
+            self.tenants[name].users.get_or_create(email=u'user%s@%s.com' % (n, name))
+
+        threads = [threading.Thread(target=work, args=(name, n))
+                   for name in self.tenants for n in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for domain, emulator in self.emulators.items():
+            emails = sorted(user['email'] for user in emulator.users.values())
+            name = domain.split('.')[0]
+            self.assertEqual(emails, [u'user%s@%s.com' % (n, name) for n in range(5)])
+            self.assertEqual(len(emulator.tokens), 1)  # one token fetched per tenant
+
+    def test_registry(self):
+        self.assertEqual(sorted(self.tenants), ['acme', 'globex', 'initech'])
+        self.assertEqual(len(self.tenants), 3)
+        self.assertIn('acme', self.tenants)
+        self.tenants.unregister('acme')
+        self.assertIsNone(self.tenants.get('acme'))
+
+    def test_token_or_secret_required(self):
+        with self.assertRaises(ValueError):
+            self.tenants.register('acme', 'acme.auth0.com')
+
+    def test_fixed_token(self):
+        auth0 = self.tenants.register('acme', 'acme.auth0.com', token='123', max_retries=2)
+        self.assertEqual(auth0._client.headers['Authorization'], 'Bearer 123')
+        self.assertEqual(auth0._client.max_retries, 2)
+
+    def test_default_pool(self):
+        tenants = TenantRegistry(pool_maxsize=4)
+        self.addCleanup(tenants.close)
+        self.assertIsInstance(tenants.transport, RequestsTransport)
+        adapter = tenants.transport.session.get_adapter('https://acme.auth0.com')
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertTrue(adapter._pool_block)
+
+
+class TestTokenManager(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.clock = Clock()
+        self.tokens = TokenManager('example.com', 'abc', 'secret', clock=self.clock,
+                                   transport=self.emulator.transport())
+
+    def test_token_is_reused_until_it_nearly_expires(self):
+        token = self.tokens.token
+        self.clock.now += 86400 - 61
+        self.assertEqual(self.tokens.token, token)
+        self.clock.now += 2
+        self.assertNotEqual(self.tokens.token, token)
+
+    def test_revoked_token_is_replaced(self):
+        auth0 = Auth0('example.com', None, default_connection='db', tokens=self.tokens,
+                      transport=self.emulator.transport())
+        auth0.users.create(email=u'bon@äcdc.com')
+        self.emulator.tokens.clear()
+        self.emulator.tokens.add('another')  # the old token is no longer accepted
+        old = self.tokens.token
+        self.assertEqual(auth0.users.count(), 1)
+        self.assertNotEqual(self.tokens.token, old)
+        self.assertIn(self.tokens.token, self.emulator.tokens)
+
+    def test_rejected_new_token_raises(self):
+        auth0 = Auth0('example.com', None, tokens=self.tokens,
+                      transport=InMemoryTransport(lambda *args, **kwargs: EmulatorResponse(
+                          401, {'statusCode': 401, 'message': 'Invalid token'})))
+        with self.assertRaises(Auth0Error):
+            auth0.users.count()
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.limiter = RateLimiter(2, burst=3, clock=self.clock, sleep=self.clock.sleep)
+
+    def test_burst_then_rate(self):
+        for n in range(3):
+            self.limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        self.limiter.acquire()
+        self.limiter.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5])
+
+    def test_spent_limit_waits_for_reset(self):
+        self.limiter.update(EmulatorResponse(200, headers={
+            'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '0', 'Retry-After': '5'}))
+        self.limiter.acquire()
+        self.assertEqual(sum(self.clock.sleeps), 5)
+
+    def test_client_waits_on_limiter(self):
+        emulator = Auth0Emulator()
+        auth0 = Auth0('example.com', '123', rate_limiter=self.limiter,
+                      transport=emulator.transport())
+        for n in range(5):
+            auth0.users.count()
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5])
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import copy
+import pickle
+import unittest
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.rules import Rule
+from auth0plus.management.users import User
+from auth0plus.testing.emulator import Auth0Emulator
+
+
+class SerializationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           transport=self.emulator.transport())
+        self.user = self.auth0.users.create(email='bon@acdc.com', password='Highway',
+                                            user_metadata={'band': 'AC/DC'})
+
+
+class TestPickle(SerializationTestCase):
+
+    def test_bound_instances_pickle_as_their_endpoint_class(self):
+        user = pickle.loads(pickle.dumps(self.user))
+        self.assertIs(type(user), User)
+        self.assertTrue(user._fetched)
+        self.assertEqual(user.as_dict(), self.user.as_dict())
+        self.assertEqual(user._connection, 'db')
+        self.assertEqual(user.get_changed(), {})
+
+    def test_only_public_data_is_pickled(self):
+        self.user.password = 'HellsBells'
+        data = pickle.dumps(self.user, pickle.HIGHEST_PROTOCOL)
+        self.assertNotIn(b'HellsBells', data)
+        self.assertNotIn(b'_private_attrs', data)
+        self.assertNotIn(b'RestClient', data)
+        self.assertLess(len(data), len(pickle.dumps(self.user.__dict__, pickle.HIGHEST_PROTOCOL)))
+
+    def test_unsaved_changes_are_kept(self):
+        self.user.email = 'brian@acdc.com'
+        user = self.auth0.users.bind(pickle.loads(pickle.dumps(self.user)))
+        self.assertEqual(user.get_changed(), {'email': 'brian@acdc.com'})
+        user.save()
+        self.assertEqual(self.emulator.users[user.user_id]['email'], 'brian@acdc.com')
+
+    def test_bind(self):
+        user = self.auth0.users.bind(pickle.loads(pickle.dumps(self.user)))
+        self.assertIs(type(user), self.auth0.users)
+        with self.assertRaises(TypeError):
+            self.auth0.users.bind(Rule(name='nope'))
+
+    def test_unsaved_instances(self):
+        user = pickle.loads(pickle.dumps(self.auth0.users(email='angus@acdc.com')))
+        self.assertFalse(user._fetched)
+        self.assertEqual(self.auth0.users.bind(user).get_changed(), {'email': 'angus@acdc.com'})
+
+    def test_copies_stay_bound(self):
+        for duplicate in (copy.copy(self.user), copy.deepcopy(self.user)):
+            self.assertIs(type(duplicate), self.auth0.users)
+            self.assertEqual(duplicate.as_dict(), self.user.as_dict())
+
+
+class TestWire(SerializationTestCase):
+
+    def test_json(self):
+        self.user.email = 'brian@acdc.com'
+        data = self.user.to_wire()
+        self.assertNotIn(b'Highway', data)
+        user = self.auth0.users.from_wire(data)
+        self.assertIs(type(user), self.auth0.users)
+        self.assertEqual(user.as_dict(), self.user.as_dict())
+        self.assertEqual(user.get_changed(), {'email': 'brian@acdc.com'})
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.user.to_wire(format='xml')
+
+    @unittest.skipIf(msgpack is None, 'msgpack is not installed')
+    def test_msgpack(self):
+        data = self.user.to_wire(format='msgpack')
+        user = self.auth0.users.from_wire(data, format='msgpack')
+        self.assertEqual(user.as_dict(), self.user.as_dict())
+        self.assertLess(len(data), len(self.user.to_wire()))
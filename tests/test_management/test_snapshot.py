@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from auth0plus.exceptions import Auth0Error
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.clients import Client
+from auth0plus.management.instrumentation import trace
+from auth0plus.management.rules import Rule
+from auth0plus.management.snapshot import Snapshot
+from auth0plus.testing.emulator import Auth0Emulator
+
+
+class Clock(object):
+    now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConfigurationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.web = self.emulator.add_client('web', app_type='spa')
+        self.emulator.add_client('api')
+        self.roles = self.emulator.add_rule('add-roles')
+        self.emulator.add_rule('deny-blocked', enabled=False)
+        self.auth0 = Auth0('example.com', '123', transport=self.emulator.transport())
+
+
+class TestClientsAndRules(ConfigurationTestCase):
+
+    def test_bound(self):
+        self.assertTrue(issubclass(self.auth0.clients, Client))
+        self.assertTrue(issubclass(self.auth0.rules, Rule))
+
+    def test_clients(self):
+        self.assertEqual(self.auth0.clients.all().count(), 2)
+        self.assertEqual([c.name for c in self.auth0.clients.all(app_type='spa')], ['web'])
+        client = self.auth0.clients.get(self.web['client_id'])
+        client.callbacks = ['https://acdc.com/callback']
+        client.save()
+        self.assertEqual(self.emulator.applications[client.client_id]['callbacks'],
+                         ['https://acdc.com/callback'])
+        self.auth0.clients.delete(client.client_id)
+        self.assertNotIn(client.client_id, self.emulator.applications)
+
+    def test_rules(self):
+        self.assertEqual([r.name for r in self.auth0.rules.all(enabled=False)],
+                         ['deny-blocked'])
+        rule = self.auth0.rules.create(name='log', script='function () {}')
+        self.assertEqual(rule.order, 3)
+        with self.assertRaises(Auth0Error):
+            self.auth0.rules.get('rul_nope')
+
+
+class TestSnapshot(ConfigurationTestCase):
+
+    def setUp(self):
+        super(TestSnapshot, self).setUp()
+        self.clock = Clock()
+        self.snapshot = Snapshot(self.auth0.rules, max_age=300, clock=self.clock)
+
+    def test_refresh_is_conditional(self):
+        with trace() as calls:
+            self.assertTrue(self.snapshot.refresh())
+            self.assertFalse(self.snapshot.refresh())
+            self.clock.now += 301
+            self.assertFalse(self.snapshot.refresh())  # nothing changed
+            self.emulator.add_rule('new')
+            self.assertTrue(self.snapshot.refresh(max_age=0))
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(len(self.snapshot), 3)
+
+    def test_versions_are_content_hashes(self):
+        self.snapshot.refresh()
+        other = Snapshot(self.auth0.rules)
+        other.refresh()
+        self.assertEqual(self.snapshot.version, other.version)
+        self.assertEqual(self.snapshot.hash('add-roles'), other.hash('add-roles'))
+        self.emulator.rules[self.roles['id']]['script'] = 'changed'
+        other.refresh(max_age=0)
+        self.assertNotEqual(self.snapshot.version, other.version)
+        self.assertNotEqual(self.snapshot.hash('add-roles'), other.hash('add-roles'))
+
+    def test_diff(self):
+        self.snapshot.refresh()
+        with trace() as calls:
+            diff = self.snapshot.diff([
+                {'name': 'add-roles', 'enabled': True},
+                {'name': 'deny-blocked', 'enabled': True},
+                {'name': 'new', 'script': 'function () {}'},
+            ])
+        self.assertEqual(len(calls), 0)
+        self.assertEqual(diff.unchanged, ['add-roles'])
+        self.assertEqual(diff.changed, [('deny-blocked', {'enabled': (False, True)})])
+        self.assertEqual([r['name'] for r in diff.added], ['new'])
+        self.assertEqual(diff.removed, [])
+        self.assertTrue(diff)
+        diff = self.snapshot.diff({'add-roles': {'enabled': True}})
+        self.assertEqual(diff.removed, ['deny-blocked'])
+        self.assertFalse(self.snapshot.diff({'add-roles': {}}, partial=True))
+
+    def test_instances_can_be_saved(self):
+        self.snapshot.refresh()
+        rule = self.snapshot['deny-blocked']
+        rule.enabled = True
+        self.assertEqual(rule.get_changed(), {'enabled': True})
+        rule.save()
+        self.assertTrue(self.emulator.rules[rule.id]['enabled'])
+
+    def test_client_secrets_are_ignored_by_default(self):
+        self.emulator.applications[self.web['client_id']].update(
+            signing_keys=[{'cert': 'PEM'}],
+            jwt_configuration={'alg': 'RS256', 'secret_encoded': True})
+        snapshot = Snapshot(self.auth0.clients, key='name')
+        snapshot.refresh()
+        web = snapshot.get('web')
+        self.assertNotIn('client_secret', web)
+        self.assertNotIn('signing_keys', web)
+        self.assertEqual(web['jwt_configuration'], {'alg': 'RS256'})
+        snapshot = Snapshot(self.auth0.clients, ignore=())
+        snapshot.refresh()
+        self.assertIn('client_secret', snapshot.get(self.web['client_id']))
+
+    def test_clients_are_keyed_by_id(self):
+        self.emulator.add_client('web')
+        snapshot = Snapshot(self.auth0.clients)
+        snapshot.refresh()
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot[self.web['client_id']].app_type, 'spa')
+        with self.assertRaises(ValueError):
+            Snapshot(self.auth0.clients, key='name').refresh()
+
+
+class TestSnapshotFile(ConfigurationTestCase):
+
+    def setUp(self):
+        super(TestSnapshotFile, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'clients.json')
+        self.clock = Clock()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_kept_between_runs(self):
+        snapshot = Snapshot(self.auth0.clients, path=self.path, clock=self.clock)
+        snapshot.refresh()
+        with trace() as calls:
+            loaded = Snapshot(self.auth0.clients, path=self.path, clock=self.clock)
+            self.assertFalse(loaded.refresh())
+        self.assertEqual(len(calls), 0)
+        self.assertEqual(loaded.version, snapshot.version)
+        self.assertEqual(loaded.get(self.web['client_id']), snapshot.get(self.web['client_id']))
+        self.clock.now += 301
+        self.assertFalse(loaded.refresh())
+        self.assertEqual(loaded.fetched, self.clock.now)
+        with open(self.path) as fp:
+            self.assertNotIn(self.web['client_secret'], fp.read())
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+import calendar
+from datetime import date, timedelta
+import unittest
+
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.instrumentation import trace
+from auth0plus.management.stats import DailyStats, Series, Stat
+from auth0plus.testing.emulator import Auth0Emulator
+
+TODAY = date(2017, 6, 30)  # a friday
+
+
+class Clock(object):
+    now = calendar.timegm(TODAY.timetuple()) + 3600.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestStat(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.emulator = Auth0Emulator(clock=self.clock)
+        for n in range(1, 31):
+            self.emulator.add_daily_stats(date(2017, 6, n), logins=n, signups=n % 2)
+        self.auth0 = Auth0('example.com', '123', transport=self.emulator.transport())
+        self.history = DailyStats(self.auth0.stats, clock=self.clock)
+
+    def test_bound(self):
+        self.assertTrue(issubclass(self.auth0.stats, Stat))
+
+    def test_daily(self):
+        stats = self.auth0.stats.daily(date(2017, 6, 3), '20170605')
+        self.assertEqual([stat.logins for stat in stats], [3, 4, 5])
+
+    def test_active_users(self):
+        self.assertEqual(self.auth0.stats.active_users(), 0)
+        self.emulator._create_user({'email': 'bon@acdc.com', 'connection': 'db',
+                                    'last_login': '2017-06-29T10:00:00.000Z'})
+        self.assertEqual(self.auth0.stats.active_users(), 1)
+
+    def test_only_missing_days_are_fetched(self):
+        with trace() as calls:
+            logins = self.history.series('logins', date(2017, 6, 10), date(2017, 6, 20))
+            self.assertEqual(list(logins.values), [float(n) for n in range(10, 21)])
+            self.history.series('logins', date(2017, 6, 12), date(2017, 6, 18))
+            self.history.series('signups', date(2017, 6, 1), date(2017, 6, 25))
+        # the 10th to 20th, then the 1st to 9th and 21st to 25th in one call each
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(calls.count('GET', '/api/v2/stats/daily'), 3)
+
+    def test_unsettled_days_are_fetched_again(self):
+        self.history.series('logins', date(2017, 6, 1))
+        self.emulator.add_daily_stats(TODAY, logins=99)
+        with trace() as calls:
+            logins = self.history.series('logins', date(2017, 6, 1))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(logins.values[-2:].tolist(), [29.0, 99.0])
+
+    def test_days_without_stats_are_zero(self):
+        self.emulator.daily_stats.clear()
+        logins = self.history.series('logins', date(2017, 5, 1), date(2017, 5, 3))
+        self.assertEqual(logins.total(), 0)
+
+
+class TestSeries(unittest.TestCase):
+
+    def setUp(self):
+        start = date(2017, 5, 29)  # a monday
+        self.series = Series([start + timedelta(days=n) for n in range(10)], range(10))
+
+    def test_weekly(self):
+        weekly = self.series.weekly()
+        self.assertEqual(weekly.dates, [date(2017, 5, 29), date(2017, 6, 5)])
+        self.assertEqual(weekly.values.tolist(), [21.0, 24.0])
+
+    def test_monthly(self):
+        monthly = self.series.monthly()
+        self.assertEqual(monthly.dates, [date(2017, 5, 1), date(2017, 6, 1)])
+        self.assertEqual(monthly.values.tolist(), [3.0, 42.0])
+
+    def test_moving_average(self):
+        average = self.series.moving_average(3)
+        self.assertEqual(average.dates[0], date(2017, 5, 31))
+        self.assertEqual(average.values.tolist(), [float(n) for n in range(1, 9)])
+        self.assertEqual(self.series.mean(), 4.5)
+        with self.assertRaises(ValueError):
+            self.series.moving_average(0)
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import unittest
+
+from mock import patch
+
+from auth0plus.exceptions import Auth0Error
+from auth0plus.management import streaming
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.instrumentation import trace
+from auth0plus.management.rest import RestClient
+from auth0plus.management.streaming import RecordStream
+from auth0plus.management.transports import Urllib3Transport
+from auth0plus.management.users import User
+from auth0plus.testing.emulator import Auth0Emulator, EmulatorServer
+
+RECORDS = [
+    {'user_id': 'auth0|1', 'email': u'bon@äcdc.com', 'logins_count': 12345,
+     'app_metadata': {'roles': ['singer', 'writer'], 'score': 1.5}},
+    {'user_id': 'auth0|2', 'email': u'angus@äcdc.com', 'identities': [{'provider': 'auth0'}],
+     'blocked': False, 'nickname': 'quote " and brace } and bracket ]'},
+]
+
+
+class RecordStreamTests(object):
+
+    def stream(self, body, path='users', chunk_size=streaming.CHUNK_SIZE):
+        return RecordStream(io.BytesIO(body.encode('utf-8')), path, chunk_size)
+
+    def test_bare_list(self):
+        records = list(self.stream(json.dumps(RECORDS)))
+        self.assertEqual(records, RECORDS)
+
+    def test_summary(self):
+        body = json.dumps({'start': 0, 'limit': 50, 'users': RECORDS, 'total': 2})
+        stream = self.stream(body)
+        self.assertEqual(next(stream), RECORDS[0])
+        self.assertEqual(list(stream), RECORDS[1:])
+        self.assertEqual(stream.summary, {'start': 0, 'limit': 50, 'total': 2})
+
+    def test_empty(self):
+        self.assertEqual(list(self.stream('[]')), [])
+        stream = self.stream(' { "total" : 0 , "users" : [ ] } ')
+        self.assertEqual(list(stream), [])
+        self.assertEqual(stream.summary, {'total': 0})
+
+    def test_tiny_chunks(self):
+        body = json.dumps({'users': RECORDS, 'total': 12345}, indent=2)
+        stream = self.stream(body, chunk_size=1)
+        self.assertEqual(list(stream), RECORDS)
+        self.assertEqual(stream.summary, {'total': 12345})
+
+    def test_records_arrive_before_the_body_is_read(self):
+        body = json.dumps({'users': RECORDS * 1000, 'total': 2000}).encode('utf-8')
+        fp = io.BytesIO(body)
+        stream = RecordStream(fp, 'users', chunk_size=1024)
+        next(stream)
+        self.assertTrue(fp.tell() < len(body))
+
+
+@unittest.skipIf(streaming.ijson is None, 'ijson is not installed')
+class TestIjsonRecordStream(RecordStreamTests, unittest.TestCase):
+    pass
+
+
+class TestJsonRecordStream(RecordStreamTests, unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(streaming, 'ijson', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            list(self.stream('{"users": [{"user_id": "auth0|1"}, {"user_'))
+
+
+class TestRestClientStream(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.client = RestClient('123', transport=self.emulator.transport())
+        self.url = 'https://example.com/api/v2/users'
+        for n in range(3):
+            self.client.post(self.url, {'email': u'user%s@äcdc.com' % n, 'connection': 'db'})
+
+    def test_stream(self):
+        stream = self.client.stream(self.url, {'include_totals': True}, 'users')
+        self.assertEqual([user['email'] for user in stream],
+                         [u'user0@äcdc.com', u'user1@äcdc.com', u'user2@äcdc.com'])
+        self.assertEqual(stream.summary['total'], 3)
+
+    def test_error(self):
+        with self.assertRaises(Auth0Error):
+            self.client.stream(self.url, {'q': '(email:a'}, 'users')
+
+    def test_session(self):
+        client = RestClient('123', session=self.emulator.session())
+        self.assertEqual(len(list(client.stream(self.url, {}, 'users'))), 3)
+
+    def test_accept_encoding(self):
+        self.assertIn('gzip', self.client.headers['Accept-Encoding'])
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.server = EmulatorServer().start()
+        self.addCleanup(self.server.stop)
+        self.url = self.server.url + '/api/v2/users'
+        self.client = RestClient('123', transport=Urllib3Transport())
+        self.client.post(self.url, {'email': u'bon@äcdc.com', 'connection': 'db'})
+
+    def test_gzip_is_negotiated(self):
+        response = self.client._request('get', self.url)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(self.client.get(self.url)[0]['email'], u'bon@äcdc.com')
+
+    def test_gzip_stream(self):
+        stream = self.client.stream(self.url, {'include_totals': True}, 'users')
+        self.assertEqual([user['email'] for user in stream], [u'bon@äcdc.com'])
+        self.assertEqual(stream.summary['total'], 1)
+
+
+class TestStreamedQuerySet(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           transport=self.emulator.transport())
+        for n in range(5):
+            self.auth0.users.create(email=u'user%s@äcdc.com' % n, password='secret')
+
+    def tearDown(self):
+        User._default_connection = ''
+
+    def test_iterates_pages(self):
+        qs = self.auth0.users.query(per_page=2, include_totals=True).stream()
+        with trace() as calls:
+            emails = [user.email for user in qs]
+            self.assertEqual(qs.count(), 5)
+        self.assertEqual(len(emails), 5)
+        self.assertEqual(len(calls), 3)
+        self.assertTrue(all(user._fetched for user in qs._cached))
+
+    def test_page_events(self):
+        events = []
+        self.auth0.users._client.add_hook(events.append)
+        list(self.auth0.users.query(per_page=2, include_totals=True).stream())
+        pages = [event for event in events if event.kind == 'page']
+        self.assertEqual([(p.path, p.page, p.records) for p in pages],
+                         [('users', 0, 2), ('users', 1, 2), ('users', 2, 1)])
+
+    def test_slicing(self):
+        qs = self.auth0.users.query(per_page=2).stream()
+        with trace() as calls:
+            self.assertEqual(len(qs[:3]), 3)
+        self.assertEqual(len(calls), 2)
+
+    def test_count_without_per_page(self):
+        qs = self.auth0.users.query().stream()
+        self.assertEqual(qs.count(), 5)
+
+    def test_chaining_keeps_streaming(self):
+        qs = self.auth0.users.query(per_page=2).stream().filter(email='user1*')
+        self.assertTrue(qs._stream)
+        self.assertEqual([user.email for user in qs], [u'user1@äcdc.com'])
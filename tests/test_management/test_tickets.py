@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+
+from auth0plus.exceptions import Auth0Error
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.batch import run_batch
+from auth0plus.management.tickets import Ticket
+from auth0plus.management.transports import InMemoryTransport
+from auth0plus.testing.emulator import Auth0Emulator, EmulatorResponse
+
+
+class TestTicket(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           transport=self.emulator.transport())
+        self.users = [self.auth0.users.create(email='user%s@acdc.com' % n, password='Thunder')
+                      for n in range(5)]
+
+    def test_bound(self):
+        self.assertTrue(issubclass(self.auth0.tickets, Ticket))
+
+    def test_email_verification(self):
+        ticket = self.auth0.tickets.email_verification(
+            self.users[0].get_id(), result_url='https://acdc.com', ttl_sec=60)
+        self.assertIn('/lo/verify', ticket.ticket)
+        self.assertEqual(self.emulator.tickets[0]['result_url'], 'https://acdc.com')
+
+    def test_password_change(self):
+        ticket = self.auth0.tickets.password_change(email='user1@acdc.com',
+                                                    connection_id='con_1')
+        self.assertIn('/lo/reset', ticket.ticket)
+        self.assertNotIn('user_id', self.emulator.tickets[0])
+        with self.assertRaises(Auth0Error):
+            self.auth0.tickets.password_change('auth0|nope')
+
+    def test_batch(self):
+        user_ids = [user.get_id() for user in self.users] + ['auth0|nope']
+        results = list(self.auth0.tickets.password_changes(user_ids, workers=3,
+                                                           result_url='https://acdc.com'))
+        self.assertEqual(sorted(result.item for result in results), sorted(user_ids))
+        failed = [result for result in results if result.error]
+        self.assertEqual([result.item for result in failed], ['auth0|nope'])
+        self.assertEqual(len(self.emulator.tickets), 5)
+        self.assertTrue(all(t['result_url'] == 'https://acdc.com' for t in self.emulator.tickets))
+
+    def test_batch_backs_off_when_rate_limited(self):
+        lock = threading.Lock()
+        counter = iter(range(1000))
+        rejected = []
+
+        def handle(method, url, **kwargs):
+            with lock:  # reject every third ticket until ten have been rejected
+                reject = '/tickets/' in url and len(rejected) < 10 and next(counter) % 3 == 0
+                if reject:
+                    rejected.append(url)
+            if reject:
+                return EmulatorResponse(429, {'statusCode': 429, 'error': 'Too Many Requests',
+                                              'message': 'Global limit has been reached',
+                                              'errorCode': 'too_many_requests'})
+            return self.emulator.handle(method, url, **kwargs)
+
+        auth0 = Auth0('example.com', '123', transport=InMemoryTransport(handle))  # no retries
+        user_ids = [user.get_id() for user in self.users] * 4
+        results = list(auth0.tickets.email_verifications(user_ids, workers=4, backoff=0.001))
+        self.assertEqual(len(rejected), 10)
+        self.assertFalse([result.error for result in results if result.error])
+        self.assertEqual(len(self.emulator.tickets), 20)
+
+        del rejected[:]
+        counter = iter([0])
+        results = list(auth0.tickets.email_verifications(user_ids[:1], max_retries=0))
+        self.assertEqual(results[0].error.status_code, 429)
+
+
+class TestRunBatch(unittest.TestCase):
+
+    def test_results_are_yielded_as_they_finish(self):
+        results = list(run_batch(lambda n: time.sleep(n / 50.0) or n, [4, 1, 2, 0], workers=4))
+        self.assertEqual([result.value for result in results], [0, 1, 2, 4])
+
+    def test_concurrency_and_window_are_bounded(self):
+        lock = threading.Lock()
+        running, peak, read = [0], [0], []
+
+        def call(n):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return n
+
+        def items():
+            for n in range(30):
+                read.append(n)
+                yield n
+
+        batch = run_batch(call, items(), workers=3, window=5)
+        next(batch)
+        self.assertLessEqual(len(read), 6)
+        self.assertEqual(len(list(batch)), 29)
+        self.assertLessEqual(peak[0], 3)
+
+    def test_progress(self):
+        progress = []
+
+        def call(n):
+            if n % 2:
+                raise ValueError(n)
+            return n
+
+        results = list(run_batch(call, range(6), workers=2, on_progress=progress.append))
+        self.assertEqual(len(results), 6)
+        self.assertEqual((progress[-1].done, progress[-1].failed), (6, 3))
+        self.assertTrue(all(isinstance(r.error, ValueError) for r in results if r.item % 2))
+
+    def test_rate_limiter(self):
+        class Limiter(object):
+            acquired = 0
+
+            def acquire(self):
+                self.acquired += 1
+
+        limiter = Limiter()
+        list(run_batch(lambda n: n, range(7), rate_limiter=limiter))
+        self.assertEqual(limiter.acquired, 7)
+
+    def test_abandoned_batch_stops(self):
+        calls = []
+        batch = run_batch(calls.append, range(100), workers=2, window=4)
+        next(batch)
+        batch.close()
+        self.assertLessEqual(len(calls), 5)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import unittest
+
+from mock import Mock, patch
+
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.rest import RestClient
+from auth0plus.management.transports import (
+    HttpxTransport,
+    InMemoryTransport,
+    RequestsTransport,
+    Urllib3Transport)
+from auth0plus.management.users import User
+from auth0plus.oauth import get_token
+from auth0plus.testing.emulator import Auth0Emulator, EmulatorResponse, EmulatorServer
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class TestRequestsTransport(unittest.TestCase):
+
+    def test_request_drops_none_kwargs(self):
+        session = Mock()
+        RequestsTransport(session).request('GET', '/', params={'a': 1}, data=None)
+        session.get.assert_called_with('/', params={'a': 1})
+
+    def test_headers_are_session_headers(self):
+        session = Mock()
+        self.assertIs(RequestsTransport(session).headers, session.headers)
+
+
+class TestInMemoryTransport(unittest.TestCase):
+
+    def test_header_merging(self):
+        handler = Mock(return_value=EmulatorResponse(200, []))
+        client = RestClient('123', transport=InMemoryTransport(handler))
+        self.assertEqual(client.get('https://example.com/api/v2/users'), [])
+        headers = handler.call_args[1]['headers']
+        self.assertEqual(headers['Authorization'], 'Bearer 123')
+        self.assertNotIn('Content-Type', headers)  # removed for GETs
+
+    def test_endpoints_and_token(self):
+        emulator = Auth0Emulator()
+        token = get_token('example.com', 'abc', 'secret', transport=emulator.transport())
+        auth0 = Auth0('example.com', token['access_token'], default_connection='db',
+                      transport=emulator.transport())
+        self.addCleanup(setattr, User, '_default_connection', '')
+        auth0.users.create(email='bon@äcdc.com')
+        self.assertEqual(auth0.users.query(email='bon*').count(), 1)
+
+
+class HttpTransportTests(object):
+
+    def make_transport(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.server = EmulatorServer().start()
+        self.addCleanup(self.server.stop)
+        self.transport = self.make_transport()
+        self.addCleanup(self.transport.close)
+        self.client = RestClient('123', transport=self.transport)
+        self.url = self.server.url + '/api/v2/users'
+
+    def test_crud(self):
+        user = self.client.post(self.url, {'email': u'bon@äcdc.com', 'connection': 'db'})
+        self.client.patch('/'.join([self.url, user['user_id']]), {'nickname': 'bon'})
+        page = self.client.get(self.url, {'include_totals': True, 'per_page': 10})[0]
+        self.assertEqual(page['total'], 1)
+        self.assertEqual(page['users'][0]['nickname'], 'bon')
+        self.client.delete('/'.join([self.url, user['user_id']]))
+        self.assertEqual(self.client.get(self.url), [])
+
+    def test_error(self):
+        from auth0plus.exceptions import Auth0Error
+        with self.assertRaises(Auth0Error):
+            self.client.get(self.url + '/auth0|missing')
+
+
+class TestUrllib3Transport(HttpTransportTests, unittest.TestCase):
+
+    def make_transport(self):
+        return Urllib3Transport()
+
+    def test_multipart(self):
+        pool = Mock()
+        pool.request.return_value = Mock(status=202, headers={}, data=b'{}')
+        transport = Urllib3Transport(pool=pool)
+        transport.request('POST', 'https://example.com/api/v2/jobs/users-imports',
+                          data={'connection_id': 'db'},
+                          files={'users': io.BytesIO(json.dumps([]).encode('utf-8'))})
+        kwargs = pool.request.call_args[1]
+        self.assertTrue(kwargs['headers']['Content-Type'].startswith('multipart/form-data'))
+
+    def test_lowercase_rate_limit_headers(self):
+        pool = Mock()
+        pool.request.side_effect = [
+            Mock(status=429, headers={'retry-after': '0.01'}, data=b'{}'),
+            Mock(status=200, headers={'x-ratelimit-remaining': '7'}, data=b'[]')]
+        events = []
+        client = RestClient('123', max_retries=1, transport=Urllib3Transport(pool=pool),
+                            hooks=[events.append])
+        with patch('auth0plus.management.rest.time.sleep') as sleep:
+            self.assertEqual(client.get('https://example.com/api/v2/users'), [])
+        sleep.assert_called_once_with(0.01)
+        self.assertEqual(events[0].rate_limit_remaining, 7)
+        self.assertEqual(events[0].retries, 1)
+
+
+@unittest.skipIf(httpx is None, 'httpx is not installed')
+class TestHttpxTransport(HttpTransportTests, unittest.TestCase):
+
+    def make_transport(self):
+        return HttpxTransport()
+
+
+try:
+    import h2
+except ImportError:  # pragma: no cover
+    h2 = None
+
+
+@unittest.skipIf(httpx is None or h2 is None, 'httpx and h2 are not installed')
+class TestHttp2Transport(unittest.TestCase):
+
+    def setUp(self):
+        from auth0plus.management.transports import Http2Transport
+        from auth0plus.testing.emulator import EmulatorH2Server
+        self.emulator = Auth0Emulator(latency=0.05)
+        self.server = EmulatorH2Server(self.emulator).start()
+        self.addCleanup(self.server.stop)
+        self.transport = Http2Transport(max_streams=4, prior_knowledge=True)
+        self.addCleanup(self.transport.close)
+        self.client = RestClient('123', transport=self.transport)
+        self.url = self.server.url + '/api/v2/users'
+
+    def fan_out(self, calls):
+        import threading
+        results = []
+
+        def call():
+            results.append(self.client.get(self.url, {'include_totals': True}))
+        threads = [threading.Thread(target=call) for _ in range(calls)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_multiplexed_over_one_connection(self):
+        self.client.post(self.url, {'email': u'bon@äcdc.com', 'connection': 'db'})
+        results = self.fan_out(12)
+        self.assertEqual([r[0]['total'] for r in results], [1] * 12)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.streams, 13)
+        self.assertTrue(self.server.max_concurrent > 1)
+
+    def test_max_streams(self):
+        self.fan_out(12)
+        self.assertTrue(self.server.max_concurrent <= 4)
+
+    def test_auth0_http2(self):
+        auth0 = Auth0('example.com', '123', http2=True, max_streams=8)
+        self.assertEqual(auth0._client.transport.max_streams, 8)
+        self.addCleanup(setattr, User, '_default_connection', '')
@@ -64,8 +64,7 @@ class TestUser1(unittest.TestCase):
 class TestUserGetDoesNotExist(unittest.TestCase):
         def setUp(self):
             qs = mock.MagicMock()
-            qs.count.return_value = 0
-            qs.__getitem__.side_effect = IndexError()
+            qs.__getitem__.return_value = []
             patch1 = mock.patch(
                 'auth0plus.management.users.User.query',
                 return_value=qs)
@@ -79,8 +78,8 @@ class TestUserGetDoesNotExist(unittest.TestCase):
 
 class TestUserGetMultipleObjects(unittest.TestCase):
         def setUp(self):
-            qs = mock.Mock()
-            qs.count.return_value = 2
+            qs = mock.MagicMock()
+            qs.__getitem__.return_value = [User(user_id='1'), User(user_id='2')]
             patch1 = mock.patch(
                 'auth0plus.management.users.User.query',
                 return_value=qs)
@@ -91,6 +90,16 @@ class TestUserGetMultipleObjects(unittest.TestCase):
             with self.assertRaises(MultipleObjectsReturned):
                 User.get()
 
+        def test_get_probes_two_records(self):
+            try:
+                User.get(email='bon@äcdc.com')
+            except MultipleObjectsReturned:
+                pass
+            args, kwargs = self.query.call_args
+            self.assertEqual(kwargs['per_page'], 2)
+            self.assertFalse(kwargs['include_totals'])
+            self.assertFalse(self.query.return_value.count.called)
+
 
 class TestUserGetOrCreateDoesNotExist(unittest.TestCase):
     def setUp(self):
@@ -156,6 +165,8 @@ class TestUserSaveChanged(unittest.TestCase):
     def setUp(self):
         patch1 = mock.patch('auth0plus.management.users.User._client')
         self.client = patch1.start()
+        mock.patch.multiple(
+            User, _endpoint='https://example.com/api/v2/users', _timeout=10).start()
         self.usr = User(email='axl@äcdc.com', email_verified=True, user_id='1')
         self.usr._fetched = True
         self.usr._original.update(self.usr.as_dict())
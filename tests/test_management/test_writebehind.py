@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.instrumentation import trace
+from auth0plus.management.writebehind import WriteBehindQueue
+from auth0plus.testing.emulator import Auth0Emulator
+
+
+class TestWriteBehindQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           transport=self.emulator.transport())
+        self.users = [self.auth0.users.create(email=u'user%s@äcdc.com' % n,
+                                              app_metadata={'logins': 0})
+                      for n in range(3)]
+        self.errors = []
+        self.queue = WriteBehindQueue(
+            interval=None, on_error=lambda *args: self.errors.append(args))
+        self.addCleanup(self.queue.close)
+
+    def stored(self, user):
+        return self.emulator.users[user.get_id()]
+
+    def test_changes_are_merged(self):
+        user = self.users[0]
+        with trace() as calls:
+            for n in range(1, 31):
+                user.app_metadata = {'logins': n}
+                self.queue.save(user)
+            user.email_verified = True
+            self.queue.save(user)
+            self.assertEqual(len(calls), 0)
+            self.assertEqual(len(self.queue), 1)
+            self.queue.flush()
+        self.assertEqual(calls.count('PATCH'), 1)
+        self.assertEqual(self.stored(user)['app_metadata'], {'logins': 30})
+        self.assertTrue(self.stored(user)['email_verified'])
+        self.assertEqual(user.get_changed(), {})
+        self.assertEqual(len(self.queue), 0)
+
+    def test_split_patches(self):
+        user = self.users[0]
+        user.password = 'HighwayToHell'
+        self.queue.save(user)
+        user.email = u'bon@äcdc.com'
+        self.queue.save(user)
+        with self.assertRaises(AttributeError):
+            user.password
+        with trace() as calls:
+            self.queue.flush()
+        self.assertEqual(calls.count('PATCH'), 2)
+        self.assertEqual(self.stored(user)['email'], u'bon@äcdc.com')
+
+    def test_unsaved_users_are_created(self):
+        user = self.auth0.users(email=u'bon@äcdc.com')
+        self.queue.save(user)
+        self.assertTrue(user._fetched)
+        self.assertEqual(len(self.queue), 0)
+
+    def test_max_pending(self):
+        queue = WriteBehindQueue(interval=None, max_pending=3)
+        self.addCleanup(queue.close)
+        for user in self.users:
+            user.app_metadata = {'logins': 1}
+            queue.save(user)
+        queue.flush()  # only waits, the saves were already sent
+        self.assertEqual(len(queue), 0)
+        self.assertTrue(all(self.stored(user)['app_metadata'] == {'logins': 1}
+                            for user in self.users))
+
+    def test_interval(self):
+        queue = WriteBehindQueue(interval=0.01)
+        self.addCleanup(queue.close)
+        user = self.users[0]
+        user.app_metadata = {'logins': 1}
+        queue.save(user)
+        deadline = time.time() + 2
+        while self.stored(user)['app_metadata'] != {'logins': 1} and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.stored(user)['app_metadata'], {'logins': 1})
+
+    def test_error_callback(self):
+        user = self.users[0]
+        del self.emulator.users[user.get_id()]
+        user.app_metadata = {'logins': 1}
+        self.queue.save(user)
+        self.queue.flush()
+        (failed, changes, err), = self.errors
+        self.assertIs(failed, user)
+        self.assertEqual(changes, {'app_metadata': {'logins': 1}})
+        self.assertEqual(user.get_changed(), {'app_metadata': {'logins': 1}})
+
+    def test_close(self):
+        user = self.users[0]
+        user.app_metadata = {'logins': 1}
+        with WriteBehindQueue(interval=None) as queue:
+            queue.save(user)
+        self.assertEqual(self.stored(user)['app_metadata'], {'logins': 1})
+        with self.assertRaises(RuntimeError):
+            queue.save(user)
+
+    def test_one_save_per_user_in_flight(self):
+        release = threading.Event()
+        active = []
+        patch = self.auth0._client.patch
+
+        def slow_patch(*args, **kwargs):
+            active.append(args[0])
+            self.assertEqual(active.count(args[0]), 1)
+            release.wait(1)
+            try:
+                return patch(*args, **kwargs)
+            finally:
+                active.remove(args[0])
+        self.auth0._client.patch = slow_patch
+        user = self.users[0]
+        user.app_metadata = {'logins': 1}
+        self.queue.save(user)
+        self.queue.flush(wait=False)
+        user.app_metadata = {'logins': 2}
+        self.queue.save(user)
+        self.queue.flush(wait=False)
+        self.assertEqual(len(self.queue), 1)  # held until the first save finishes
+        release.set()
+        self.queue.flush()
+        self.assertEqual(self.errors, [])
+        self.assertEqual(self.stored(user)['app_metadata'], {'logins': 2})
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.users import User
+from auth0plus.testing import (
+    Auth0Emulator,
+    CallBudgetExceeded,
+    CallBudgetMixin,
+    assert_max_calls,
+    assert_num_calls)
+
+
+class TestCallBudget(CallBudgetMixin, unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           session=self.emulator.session())
+        self.ids = [self.auth0.users.create(email='user%s@äcdc.com' % n).get_id()
+                    for n in range(3)]
+
+    def tearDown(self):
+        User._default_connection = ''
+
+    def test_within_budget(self):
+        with assert_max_calls(1):
+            list(self.auth0.users.query())
+        with self.assertNumCalls(1, 'GET', '/api/v2/users'):
+            list(self.auth0.users.query())
+
+    def test_n_plus_one(self):
+        with self.assertRaises(CallBudgetExceeded) as err:
+            with self.assertMaxCalls(1, 'GET'):
+                for user_id in self.ids:
+                    self.auth0.users.get(user_id)
+        message = str(err.exception)
+        self.assertIn('3 GET calls were made, expected at most 1', message)
+        self.assertIn('3 x GET /api/v2/users/{id}', message)
+        self.assertIn('User.get', message)
+
+    def test_exact(self):
+        with self.assertRaises(CallBudgetExceeded):
+            with assert_num_calls(2):
+                self.auth0.users.get(self.ids[0])
+
+    def test_filtered_by_endpoint(self):
+        with assert_num_calls(0, endpoint='/api/v2/users/{id}'):
+            list(self.auth0.users.query())
+
+    def test_exception_in_block_propagates(self):
+        with self.assertRaises(ValueError):
+            with assert_max_calls(0):
+                self.auth0.users.get(self.ids[0])
+                raise ValueError
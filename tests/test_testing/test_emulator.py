@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import unittest
+
+from mock import Mock
+
+from auth0plus.exceptions import Auth0Error, MultipleObjectsReturned
+from auth0plus.management.auth0p import Auth0
+from auth0plus.management.rest import RestClient
+from auth0plus.management.users import User
+from auth0plus.oauth import get_token
+from auth0plus.testing.emulator import Auth0Emulator, EmulatorServer
+
+URL = 'https://example.com/api/v2/users'
+
+
+class EmulatorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.client = RestClient('123', session=self.emulator.session())
+
+    def tearDown(self):
+        User._default_connection = ''
+        User._default_client_id = ''
+
+    def create(self, count, connection='db'):
+        for n in range(count):
+            self.client.post(URL, {'email': u'user%02d@äcdc.com' % n, 'connection': connection,
+                                   'password': 'ChuckBerry'})
+
+
+class TestEmulatorUsers(EmulatorTestCase):
+
+    def test_paging_and_totals(self):
+        self.create(5)
+        page = self.client.get(URL, {'per_page': 2, 'page': 1, 'include_totals': True})[0]
+        self.assertEqual(page['total'], 5)
+        self.assertEqual(page['start'], 2)
+        self.assertEqual([u['email'] for u in page['users']],
+                         [u'user02@äcdc.com', u'user03@äcdc.com'])
+
+    def test_lucene_subset(self):
+        self.create(3)
+        self.create(1, connection='other')
+        self.assertEqual(len(self.client.get(URL, {'q': 'identities.connection:"db"'})), 3)
+        self.assertEqual(len(self.client.get(URL, {'q': u'email:user0*'})), 4)
+        found = self.client.get(URL, {'q': u'email:"user01@äcdc.com" OR email:user02*'})
+        self.assertEqual(len(found), 2)
+        found = self.client.get(
+            URL, {'q': u'identities.connection:"db" AND email:"user00@äcdc.com"'})
+        self.assertEqual(len(found), 1)
+
+    def test_fields_and_sort(self):
+        self.create(3)
+        users = self.client.get(URL, {'fields': 'email', 'sort': 'email:-1'})
+        self.assertEqual(users[0], {'email': u'user02@äcdc.com'})
+
+    def test_errors(self):
+        self.create(1)
+        with self.assertRaises(Auth0Error) as err:
+            self.create(1)
+        self.assertEqual(err.exception.message, 'The user already exists.')
+        with self.assertRaises(Auth0Error) as err:
+            self.client.get(URL + '/auth0|nope')
+        self.assertEqual(err.exception.status_code, 404)
+
+    def test_patch_rejects_password_and_email(self):
+        self.create(1)
+        user_id = self.client.get(URL)[0]['user_id']
+        with self.assertRaises(Auth0Error):
+            self.client.patch('/'.join([URL, user_id]), {'password': 'x', 'email': 'y'})
+
+    def test_rate_limit(self):
+        self.emulator.rate_limit = (2, 60)
+        response = self.emulator.handle('GET', URL)
+        self.assertEqual(response.headers['X-RateLimit-Remaining'], '1')
+        self.emulator.handle('GET', URL)
+        response = self.emulator.handle('GET', URL)
+        self.assertEqual(response.status_code, 429)
+
+    def test_latency(self):
+        self.emulator.sleep = Mock()
+        self.emulator.latency = 0.25
+        self.client.get(URL)
+        self.emulator.sleep.assert_called_with(0.25)
+
+    def test_token_and_authorization(self):
+        self.emulator.clients = {'abc': 'secret'}
+        session = self.emulator.session()
+        token = get_token('example.com', 'abc', 'secret', session=session)
+        with self.assertRaises(Auth0Error):
+            self.client.get(URL)  # the client's '123' jwt was never issued
+        self.assertEqual(
+            RestClient(token['access_token'], session=self.emulator.session()).get(URL), [])
+        with self.assertRaises(Auth0Error):
+            get_token('example.com', 'abc', 'wrong', session=session)
+
+
+class TestEmulatorJobs(EmulatorTestCase):
+
+    def test_import_and_get_job(self):
+        users = io.BytesIO(json.dumps([{'email': 'bon@äcdc.com'}]).encode('utf-8'))
+        job = self.client.file_post(
+            'https://example.com/api/v2/jobs/users-imports',
+            data={'connection_id': 'db'}, files={'users': users})
+        self.assertEqual(job['summary'], {'inserted': 1})
+        self.assertEqual(
+            self.client.get('https://example.com/api/v2/jobs/' + job['id'])[0]['status'],
+            'completed')
+
+    def test_verification_email(self):
+        self.create(1)
+        user_id = self.client.get(URL)[0]['user_id']
+        job = self.client.post('https://example.com/api/v2/jobs/verification-email',
+                               {'user_id': user_id})
+        self.assertEqual(job['type'], 'verification_email')
+
+
+class TestEmulatorLogs(EmulatorTestCase):
+
+    def test_checkpoints(self):
+        ids = [self.emulator.add_log()['log_id'] for n in range(5)]
+        url = 'https://example.com/api/v2/logs'
+        logs = self.client.get(url, {'from': ids[1], 'take': 2})
+        self.assertEqual([log['log_id'] for log in logs], ids[2:4])
+        self.assertEqual([log['log_id'] for log in self.client.get(url)], ids[::-1])
+        with self.assertRaises(Auth0Error) as err:
+            self.client.get(url, {'from': 'nope', 'take': 2})
+        self.assertEqual(err.exception.status_code, 400)
+
+
+class TestEmulatorEndpoints(EmulatorTestCase):
+
+    def setUp(self):
+        super(TestEmulatorEndpoints, self).setUp()
+        self.auth0 = Auth0('example.com', '123', default_connection='db',
+                           session=self.emulator.session())
+
+    def test_user_lifecycle(self):
+        user, created = self.auth0.users.get_or_create(
+            defaults={'password': 'Jailbreak'}, email=u'angus@äcdc.com')
+        self.assertTrue(created)
+        user.email = u'bon@äcdc.com'
+        user.password = 'HighwayToHell'
+        user.save()
+        self.assertEqual(self.auth0.users.get(user.get_id()).email, u'bon@äcdc.com')
+        user.delete()
+        self.assertEqual(self.auth0.users.count(), 0)
+
+    def test_queryset(self):
+        self.create(120)
+        qs = self.auth0.users.query(email='user*')
+        self.assertEqual(qs.count(), 120)
+        self.assertEqual(qs[-1].email, u'user119@äcdc.com')
+        self.assertEqual(len(list(self.auth0.users.query())), 120)
+        with self.assertRaises(MultipleObjectsReturned):
+            self.auth0.users.get(email='user1*')
+
+
+class TestEmulatorServer(unittest.TestCase):
+
+    def test_over_http(self):
+        with EmulatorServer() as server:
+            client = RestClient('123')
+            url = server.url + '/api/v2/users'
+            client.post(url, {'email': 'bon@äcdc.com', 'connection': 'db'})
+            page = client.get(url, {'include_totals': True})[0]
+            self.assertEqual(page['total'], 1)
+            token = get_token(server.url, 'abc', 'secret')
+            self.assertTrue(token['access_token'])
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+
+from mock import patch
+
+from auth0plus.exceptions import InvalidToken
+from auth0plus.testing.emulator import Auth0Emulator
+from auth0plus.testing.keys import TEST_KEYS
+from auth0plus.verify import JWKS, RSAPublicKey, RSAPublicNumbers, TokenVerifier
+
+AUDIENCE = 'https://api.example.com'
+
+
+class Clock(object):
+    now = 1500000000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenVerifier(unittest.TestCase):
+
+    def setUp(self):
+        self.emulator = Auth0Emulator()
+        self.clock = Clock()
+        self.verifier = TokenVerifier('example.com', AUDIENCE, leeway=10, clock=self.clock,
+                                      transport=self.emulator.transport())
+
+    def claims(self, **claims):
+        defaults = {'iss': 'https://example.com/', 'aud': AUDIENCE, 'sub': 'auth0|1',
+                    'iat': self.clock.now, 'exp': self.clock.now + 3600}
+        defaults.update(claims)
+        return defaults
+
+    def fetches(self):
+        return self.emulator.requests.count(('GET', '/.well-known/jwks.json'))
+
+    def test_verify(self):
+        claims = self.claims(aud=['other', AUDIENCE])
+        self.assertEqual(self.verifier.verify(self.emulator.sign(claims)), claims)
+
+    def test_claims_are_copies(self):
+        token = self.emulator.sign(self.claims())
+        self.verifier.verify(token)['sub'] = 'auth0|evil'
+        self.assertEqual(self.verifier.verify(token)['sub'], 'auth0|1')
+
+    def test_unreachable_keys(self):
+        def unreachable(*args, **kwargs):
+            raise IOError('Connection refused')
+
+        self.emulator.handle = unreachable
+        verifier = TokenVerifier('example.com', AUDIENCE, clock=self.clock,
+                                 transport=self.emulator.transport())
+        with self.assertRaises(InvalidToken):
+            verifier.verify(self.emulator.sign(self.claims()))
+
+    def test_stale_keys_are_used_while_unreachable(self):
+        self.verifier.verify(self.emulator.sign(self.claims()))
+        self.clock.now += 601
+        with patch.object(self.verifier.jwks._client, 'get',
+                          side_effect=IOError('Connection refused')) as get:
+            for n in range(3):
+                token = self.emulator.sign(self.claims(sub='auth0|%s' % n))
+                self.assertEqual(self.verifier.verify(token)['sub'], 'auth0|%s' % n)
+            self.assertEqual(get.call_count, 1)
+            with self.assertRaises(InvalidToken):
+                self.verifier.verify(TEST_KEYS[1].token(self.claims()))
+            self.assertEqual(get.call_count, 1)
+        self.clock.now += 31
+        self.verifier.verify(self.emulator.sign(self.claims(sub='auth0|back')))
+        self.assertEqual(self.fetches(), 2)
+
+    def test_least_recently_used_claims_are_evicted(self):
+        verifier = TokenVerifier('example.com', AUDIENCE, cache_size=2, clock=self.clock,
+                                 transport=self.emulator.transport())
+        first, second, third = [self.emulator.sign(self.claims(sub='auth0|%s' % n))
+                                for n in range(3)]
+        verifier.verify(first)
+        verifier.verify(second)
+        verifier.verify(first)
+        verifier.verify(third)
+        self.assertEqual(list(verifier._verified), [first, third])
+
+    def test_keys_and_claims_are_cached(self):
+        token = self.emulator.sign(self.claims())
+        for n in range(3):
+            self.verifier.verify(token)
+            self.verifier.verify(self.emulator.sign(self.claims(sub='auth0|x%s' % n)))
+        self.assertEqual(self.fetches(), 1)
+        self.assertEqual(len(self.verifier._verified), 4)
+
+    def test_rejected(self):
+        bad = [
+            self.emulator.sign(self.claims(iss='https://evil.com/')),
+            self.emulator.sign(self.claims(aud='other')),
+            self.emulator.sign(self.claims(exp=self.clock.now - 11)),
+            self.emulator.sign(self.claims(nbf=self.clock.now + 11)),
+            self.emulator.sign(self.claims(exp=None)),
+            TEST_KEYS[0].token(self.claims(), alg='HS256'),
+            TEST_KEYS[1].token(self.claims(), kid='emulator-1'),  # signed with another key
+            self.emulator.sign(self.claims())[:-4] + 'AAAA',
+            'not.a.token',
+            'nope',
+        ]
+        for token in bad:
+            with self.assertRaises(InvalidToken):
+                self.verifier.verify(token)
+
+    def test_memoized_claims_expire(self):
+        token = self.emulator.sign(self.claims())
+        self.verifier.verify(token)
+        self.clock.now += 3610
+        with self.assertRaises(InvalidToken):
+            self.verifier.verify(token)
+
+    def test_rotated_key_is_fetched(self):
+        self.verifier.verify(self.emulator.sign(self.claims()))
+        self.emulator.signing_keys.append(TEST_KEYS[1])
+        self.clock.now += 31
+        token = self.emulator.sign(self.claims(), key=TEST_KEYS[1])
+        self.assertEqual(self.verifier.verify(token)['sub'], 'auth0|1')
+        self.assertEqual(self.fetches(), 2)
+
+    def test_unknown_keys_refresh_at_most_once_per_interval(self):
+        self.verifier.verify(self.emulator.sign(self.claims()))
+        token = TEST_KEYS[1].token(self.claims())  # not published
+        for n in range(5):
+            with self.assertRaises(InvalidToken):
+                self.verifier.verify(token)
+        self.assertEqual(self.fetches(), 1)
+        self.clock.now += 31
+        for n in range(5):
+            with self.assertRaises(InvalidToken):
+                self.verifier.verify(token)
+        self.assertEqual(self.fetches(), 2)
+
+    def test_stale_keys_are_fetched_again(self):
+        self.verifier.verify(self.emulator.sign(self.claims()))
+        self.clock.now += 601
+        self.verifier.verify(self.emulator.sign(self.claims()))
+        self.assertEqual(self.fetches(), 2)
+
+    def test_single_flight(self):
+        jwks = JWKS('example.com', transport=self.emulator.transport())
+        self.emulator.latency = 0.05
+        threads = [threading.Thread(target=jwks.get, args=('emulator-1',)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.fetches(), 1)
+
+
+class TestRSAPublicKey(unittest.TestCase):
+
+    def setUp(self):
+        self.key = RSAPublicKey.from_jwk(TEST_KEYS[0].jwk())
+        self.signature = TEST_KEYS[0].sign(b'message')
+
+    def test_python_fallback(self):
+        self.assertTrue(self.key._verify_python(b'message', self.signature))
+        self.assertFalse(self.key._verify_python(b'massage', self.signature))
+
+    @unittest.skipIf(RSAPublicNumbers is None, 'cryptography is not installed')
+    def test_cryptography(self):
+        self.assertIsNotNone(self.key._key)
+        self.assertTrue(self.key.verify(b'message', self.signature))
+        self.assertFalse(self.key.verify(b'massage', self.signature))